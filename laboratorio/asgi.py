@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Bajo ASGI /eventos/ mantiene abiertas las conexiones SSE en el event loop;
+con el servidor WSGI los navegadores pasan a consultar /eventos/recientes/.
 """
 
 import os
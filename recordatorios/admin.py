@@ -1,5 +1,149 @@
-from django.contrib import admin
-from .models import TipoDocumento, Documento, RecordatorioRevision
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.db.models import Count, Q
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from .busqueda import buscar_documentos
+from .forms import ImportarCSVForm
+from .importacion import ImportadorDocumentos, ImportadorRecordatorios
+from .models import TipoDocumento, Documento, RecordatorioRevision, Recurrencia, TransicionRecordatorio
+from .paginacion import PaginadorEstimado
+from . import cacheo, operaciones, recurrencias
+
+
+class ImportarCSVMixin:
+    """Añade a la lista del admin una vista para importar un CSV por lotes
+
+    Su plantilla extiende la de RendimientoAdminMixin: va antes en las bases para
+    que se use la suya.
+    """
+    importador = None
+    change_list_template = 'admin/recordatorios/change_list_importar.html'
+    
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path('importar/', self.admin_site.admin_view(self.importar_csv), name='%s_%s_importar' % info),
+        ] + super().get_urls()
+    
+    def importar_csv(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = ImportarCSVForm(request.POST or None, request.FILES or None)
+        resultado = None
+        if request.method == 'POST' and form.is_valid():
+            archivo = io.TextIOWrapper(form.cleaned_data['archivo'].file, encoding='utf-8-sig', newline='')
+            dry_run = form.cleaned_data['dry_run']
+            resultado = self.importador(usuario=request.user, dry_run=dry_run).importar(archivo)
+            if not dry_run:
+                self.message_user(
+                    request,
+                    f'Importación terminada: {resultado.creados} creados, {resultado.actualizados} actualizados.'
+                )
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f'Importar {self.model._meta.verbose_name_plural}',
+            'form': form,
+            'resultado': resultado,
+            'columnas': ', '.join(self.importador.columnas),
+        }
+        return TemplateResponse(request, 'admin/recordatorios/importar_csv.html', context)
+
+
+class RecordatorioActionForm(ActionForm):
+    """Parámetros opcionales de las acciones en lote de recordatorios"""
+    revisor = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True).order_by('username'), required=False, label='Revisor'
+    )
+    prioridad = forms.ChoiceField(
+        choices=[('', '---------')] + RecordatorioRevision.PRIORIDAD_CHOICES, required=False, label='Prioridad'
+    )
+    dias = forms.IntegerField(required=False, label='Días')
+
+
+class ConteoCacheadoFilter(admin.SimpleListFilter):
+    """Filtro que muestra cuántas filas tiene cada opción
+
+    Los conteos salen de una sola consulta sobre toda la tabla (sin los demás
+    filtros) y se cachean hasta la próxima escritura del área.
+    """
+    areas_cache = []
+    
+    def condiciones(self):
+        """(valor, etiqueta, Q) de cada opción"""
+        raise NotImplementedError
+    
+    def conteos(self, model_admin, opciones):
+        modelo = model_admin.model
+        clave_cache = cacheo.clave(
+            'facetas_admin', self.areas_cache, modelo._meta.label, self.parameter_name, timezone.localdate()
+        )
+        return cacheo.obtener('facetas_admin', clave_cache, lambda: modelo._default_manager.aggregate(**{
+            f'n{i}': Count('pk', filter=condicion) for i, (valor, etiqueta, condicion) in enumerate(opciones)
+        }))
+    
+    def lookups(self, request, model_admin):
+        opciones = self.condiciones()
+        conteos = self.conteos(model_admin, opciones)
+        return [(valor, f'{etiqueta} ({conteos[f"n{i}"]})') for i, (valor, etiqueta, condicion) in enumerate(opciones)]
+    
+    def queryset(self, request, queryset):
+        for valor, etiqueta, condicion in self.condiciones():
+            if self.value() == valor:
+                return queryset.filter(condicion)
+        return queryset
+
+
+class EstadoFilter(ConteoCacheadoFilter):
+    title = 'estado'
+    parameter_name = 'estado'
+    
+    def condiciones(self):
+        return [(valor, etiqueta, Q(estado=valor)) for valor, etiqueta in self.estados]
+
+
+class EstadoDocumentoFilter(EstadoFilter):
+    estados = Documento.ESTADO_CHOICES
+    areas_cache = [cacheo.DOCUMENTOS]
+
+
+class EstadoRecordatorioFilter(EstadoFilter):
+    estados = RecordatorioRevision.ESTADO_CHOICES
+    areas_cache = [cacheo.RECORDATORIOS]
+
+
+class UrgenciaFilter(ConteoCacheadoFilter):
+    title = 'urgencia'
+    parameter_name = 'urgencia'
+    areas_cache = [cacheo.RECORDATORIOS]
+    
+    def condiciones(self):
+        etiquetas = dict(RecordatorioRevision.URGENCIA_CHOICES)
+        return [
+            (str(urgencia), etiquetas[urgencia], condicion)
+            for urgencia, condicion in RecordatorioRevision.objects.condiciones_urgencia().items()
+        ]
+
+
+class RendimientoAdminMixin:
+    """Listas del admin para tablas grandes
+
+    Total estimado y cacheado en lugar de COUNT(*) por página, sin el segundo
+    conteo de la tabla completa al filtrar, y la jerarquía de fechas sin
+    SELECT DISTINCT.
+    """
+    change_list_template = 'admin/recordatorios/change_list_rendimiento.html'
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+
 
 @admin.register(TipoDocumento)
 class TipoDocumentoAdmin(admin.ModelAdmin):
@@ -8,19 +152,111 @@ class TipoDocumentoAdmin(admin.ModelAdmin):
     search_fields = ['nombre', 'descripcion']
 
 @admin.register(Documento)
-class DocumentoAdmin(admin.ModelAdmin):
+class DocumentoAdmin(ImportarCSVMixin, RendimientoAdminMixin, admin.ModelAdmin):
+    importador = ImportadorDocumentos
     list_display = ['titulo', 'tipo', 'fecha_creacion', 'version', 'estado']
-    list_filter = ['tipo', 'estado', 'fecha_creacion']
+    list_select_related = ['tipo']
+    list_filter = ['tipo', EstadoDocumentoFilter, 'fecha_creacion']
     search_fields = ['titulo', 'codigo_documento', 'descripcion']
+    autocomplete_fields = ['creado_por']
     date_hierarchy = 'fecha_creacion'
+    
+    def get_search_results(self, request, queryset, search_term):
+        # El backend de búsqueda usa el índice de texto en lugar de icontains por columna;
+        # sin relevancia porque la lista del admin aplica su propio orden
+        return buscar_documentos(queryset, search_term, relevancia=False), False
+
 
 @admin.register(RecordatorioRevision)
-class RecordatorioRevisionAdmin(admin.ModelAdmin):
-    list_display = ['documento', 'fecha_revision', 'revisor', 'estado', 'fecha_proxima_revision']
-    list_filter = ['estado', 'fecha_revision', 'fecha_proxima_revision']
-    search_fields = ['documento__titulo', 'revisor__username', 'observaciones']
+class RecordatorioRevisionAdmin(ImportarCSVMixin, RendimientoAdminMixin, admin.ModelAdmin):
+    importador = ImportadorRecordatorios
+    list_display = ['documento', 'fecha_revision', 'revisor', 'estado', 'fecha_proxima_revision', 'urgencia']
+    list_select_related = ['documento', 'revisor']
+    list_filter = [EstadoRecordatorioFilter, UrgenciaFilter, 'recurrencia', 'fecha_revision', 'fecha_proxima_revision']
+    search_fields = ['documento__titulo', 'revisor__username']
+    autocomplete_fields = ['documento', 'revisor']
     date_hierarchy = 'fecha_revision'
     readonly_fields = ['fecha_creacion']
+    action_form = RecordatorioActionForm
+    actions = ['completar_seleccionados', 'reasignar_seleccionados', 'cambiar_prioridad_seleccionados',
+               'reprogramar_seleccionados']
+    
+    def aplicar_operacion(self, request, queryset, accion, campo=None):
+        parametros = {}
+        if campo:
+            try:
+                valor = self.action_form.base_fields[campo].clean(request.POST.get(campo))
+            except forms.ValidationError:
+                valor = None
+            if valor in (None, ''):
+                self.message_user(request, f'Indique {campo} para esta acción.', messages.WARNING)
+                return
+            parametros[campo] = valor
+        total = operaciones.aplicar(queryset, accion, **parametros)
+        self.message_user(request, f'{total} recordatorios actualizados.')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).con_urgencia()
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Documentos por el índice de búsqueda y revisor por prefijo, en lugar de icontains con JOIN
+        termino = search_term.strip()
+        if not termino:
+            return queryset, False
+        # Sin relevancia: dentro de documento__in el rango se descartaría
+        documentos = buscar_documentos(Documento.objects.all(), termino, relevancia=False).values('pk')
+        return queryset.filter(Q(documento__in=documentos) | Q(revisor__username__istartswith=termino)), False
+    
+    @admin.display(description='Urgencia', ordering='urgencia')
+    def urgencia(self, obj):
+        return obj.get_urgencia_display()
+    
+    @admin.action(description='Marcar como completados', permissions=['change'])
+    def completar_seleccionados(self, request, queryset):
+        self.aplicar_operacion(request, queryset, 'completar')
+    
+    @admin.action(description='Reasignar al revisor indicado', permissions=['change'])
+    def reasignar_seleccionados(self, request, queryset):
+        self.aplicar_operacion(request, queryset, 'reasignar', 'revisor')
+    
+    @admin.action(description='Cambiar a la prioridad indicada', permissions=['change'])
+    def cambiar_prioridad_seleccionados(self, request, queryset):
+        self.aplicar_operacion(request, queryset, 'prioridad', 'prioridad')
+    
+    @admin.action(description='Desplazar la próxima revisión los días indicados', permissions=['change'])
+    def reprogramar_seleccionados(self, request, queryset):
+        self.aplicar_operacion(request, queryset, 'reprogramar', 'dias')
+
+@admin.register(Recurrencia)
+class RecurrenciaAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'regla', 'intervalo', 'revisor', 'prioridad', 'activa']
+    # __str__ usa documento o tipo; Django sólo detecta las FK de list_display
+    list_select_related = ['documento', 'tipo', 'revisor']
+    list_filter = ['regla', 'activa', 'tipo']
+    search_fields = ['documento__titulo', 'documento__codigo_documento', 'tipo__nombre']
+    autocomplete_fields = ['documento', 'revisor']
+    actions = ['generar_seleccionadas']
+    
+    @admin.action(description='Generar recordatorios del próximo año', permissions=['change'])
+    def generar_seleccionadas(self, request, queryset):
+        total = recurrencias.generar_recordatorios(recurrencias=queryset)
+        self.message_user(request, f'{total} recordatorios generados.')
+
+@admin.register(TransicionRecordatorio)
+class TransicionRecordatorioAdmin(RendimientoAdminMixin, admin.ModelAdmin):
+    """Registro de sólo lectura; filtre un recordatorio con ?recordatorio_id=<id>"""
+    list_display = ['fecha', 'recordatorio_id', 'campo', 'valor_anterior', 'valor_nuevo', 'usuario', 'origen']
+    list_select_related = ['usuario']
+    list_filter = ['campo', 'origen']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 # Personalización del sitio de administración
 admin.site.site_header = 'Laboratorio de Pruebas Mecánicas'
@@ -0,0 +1,266 @@
+import bisect
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from . import cacheo
+from .models import AgregadoDiario, MarcaProceso, RecordatorioRevision, TipoDocumento, TransicionRecordatorio
+
+MARCA = 'analitica'
+# Solape con la ejecución anterior: transacciones largas y transiciones aún en el búfer de auditoría
+MARGEN = timedelta(minutes=10)
+DIAS_POR_CONSULTA = 31
+SEMANAS_POR_DEFECTO = 12
+# Límite superior en horas de cada cubeta del histograma; la última cubeta no tiene límite
+CUBETAS_HORAS = (1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 240, 336, 504, 720, 1080, 1440, 2160, 4320, 8760)
+# Los cancelados no vencen
+ESTADOS_CON_VENCIMIENTO = ['pendiente', 'en_proceso', 'completado']
+CONTADORES = ['vencimientos', 'a_tiempo', 'tarde', 'abiertos']
+
+
+def _inicio_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def _dia(fecha, zona):
+    # astimezone directo: timezone.localtime() busca la zona activa en cada llamada
+    return fecha.astimezone(zona).date()
+
+
+def _rangos(dias):
+    """Días consecutivos agrupados en rangos (inicio, fin) de a lo sumo DIAS_POR_CONSULTA"""
+    rangos = []
+    for dia in sorted(dias):
+        if rangos and dia == rangos[-1][1] + timedelta(days=1) and (dia - rangos[-1][0]).days < DIAS_POR_CONSULTA:
+            rangos[-1][1] = dia
+        else:
+            rangos.append([dia, dia])
+    return [tuple(rango) for rango in rangos]
+
+
+def _dimensiones(revisor_id, prioridad, tipo_id):
+    return (('total', ''), ('revisor', str(revisor_id)), ('prioridad', prioridad), ('tipo', str(tipo_id)))
+
+
+def histograma(horas):
+    """Cuentas por cubeta: ordena una vez y ubica cada límite por bisección, no cada valor"""
+    ordenadas = sorted(horas)
+    acumuladas = [bisect.bisect_right(ordenadas, limite) for limite in CUBETAS_HORAS] + [len(ordenadas)]
+    return [hasta - desde for desde, hasta in zip([0] + acumuladas, acumuladas)]
+
+
+def percentil(cuentas, p):
+    """Percentil ``p`` (0-100) en horas de un histograma, interpolado dentro de su cubeta"""
+    total = sum(cuentas)
+    if not total:
+        return None
+    objetivo = total * p / 100
+    limites = (0,) + CUBETAS_HORAS
+    acumulado = 0
+    for indice, cuenta in enumerate(cuentas):
+        if cuenta and acumulado + cuenta >= objetivo:
+            if indice == len(CUBETAS_HORAS):
+                return float(limites[indice])
+            inferior, superior = limites[indice], limites[indice + 1]
+            return inferior + (superior - inferior) * (objetivo - acumulado) / cuenta
+        acumulado += cuenta
+    return float(limites[-1])
+
+
+def calcular(dias):
+    """AgregadoDiario sin guardar de ``dias``, con dos lecturas en bloque por rango de días
+
+    Las filas se cuentan por combinación (día, revisor, prioridad, tipo) y sólo
+    después se reparten entre las dimensiones.
+    """
+    zona = timezone.get_current_timezone()
+    cuentas = Counter()
+    horas = defaultdict(list)
+    for inicio, fin in _rangos(dias):
+        desde, hasta = _inicio_dia(inicio), _inicio_dia(fin + timedelta(days=1))
+        vencimientos = RecordatorioRevision.objects.filter(
+            estado__in=ESTADOS_CON_VENCIMIENTO, fecha_proxima_revision__gte=desde, fecha_proxima_revision__lt=hasta,
+        ).order_by().values_list(
+            'revisor_id', 'prioridad', 'documento__tipo_id', 'estado', 'fecha_proxima_revision', 'fecha_completado'
+        )
+        cuentas.update(
+            (_dia(proxima, zona), revisor_id, prioridad, tipo_id,
+             'abiertos' if estado != 'completado' else 'tarde' if completado and completado > proxima else 'a_tiempo')
+            for revisor_id, prioridad, tipo_id, estado, proxima, completado in vencimientos.iterator(chunk_size=5000)
+        )
+        completados = RecordatorioRevision.objects.filter(
+            estado='completado', fecha_completado__gte=desde, fecha_completado__lt=hasta,
+        ).order_by().values_list('revisor_id', 'prioridad', 'documento__tipo_id', 'fecha_revision', 'fecha_completado')
+        for revisor_id, prioridad, tipo_id, revision, completado in completados.iterator(chunk_size=5000):
+            horas[(_dia(completado, zona), revisor_id, prioridad, tipo_id)].append(
+                max((completado - revision).total_seconds() / 3600, 0)
+            )
+
+    agregados = defaultdict(lambda: {'horas': [], **{contador: 0 for contador in CONTADORES}})
+    for (dia, revisor_id, prioridad, tipo_id, contador), cantidad in cuentas.items():
+        for dimension, valor in _dimensiones(revisor_id, prioridad, tipo_id):
+            agregados[(dia, dimension, valor)][contador] += cantidad
+    for (dia, revisor_id, prioridad, tipo_id), lista in horas.items():
+        for dimension, valor in _dimensiones(revisor_id, prioridad, tipo_id):
+            agregados[(dia, dimension, valor)]['horas'].extend(lista)
+
+    resultado = []
+    for (dia, dimension, valor), datos in agregados.items():
+        lista = datos.pop('horas')
+        datos['vencimientos'] = datos['a_tiempo'] + datos['tarde'] + datos['abiertos']
+        resultado.append(AgregadoDiario(
+            fecha=dia, dimension=dimension, valor=valor, completados=len(lista), horas_totales=sum(lista),
+            histograma=histograma(lista), **datos
+        ))
+    return resultado
+
+
+def todos_los_dias():
+    limites = RecordatorioRevision.objects.aggregate(
+        Min('fecha_proxima_revision'), Max('fecha_proxima_revision'), Min('fecha_completado'), Max('fecha_completado')
+    )
+    fechas = [timezone.localtime(fecha).date() for fecha in limites.values() if fecha is not None]
+    if not fechas:
+        return set()
+    primero, ultimo = min(fechas), max(fechas)
+    return {primero + timedelta(days=n) for n in range((ultimo - primero).days + 1)}
+
+
+def dias_cambiados(desde):
+    """Días con filas modificadas desde ``desde``: los de sus fechas actuales y, según
+    las transiciones auditadas, los de una fecha_proxima_revision anterior"""
+    zona = timezone.get_current_timezone()
+    dias = set()
+    filas = RecordatorioRevision.objects.filter(fecha_modificacion__gte=desde).order_by()
+    for fechas in filas.values_list('fecha_proxima_revision', 'fecha_completado').iterator(chunk_size=5000):
+        dias.update(_dia(fecha, zona) for fecha in fechas if fecha is not None)
+    anteriores = TransicionRecordatorio.objects.filter(
+        fecha__gte=desde, campo='fecha_proxima_revision', valor_anterior__isnull=False
+    ).values_list('valor_anterior', flat=True)
+    # Se guardan en hora local (auditoria._texto)
+    dias.update(datetime.fromisoformat(valor).date() for valor in anteriores)
+    return dias
+
+
+def actualizar(completo=False):
+    """Recalcula los agregados de los días afectados desde la marca anterior; devuelve cuántos días
+
+    Con ``completo`` (o sin marca) se rehacen todos: también corrige los días de recordatorios borrados.
+    """
+    ahora = timezone.now()
+    marca = MarcaProceso.objects.filter(clave=MARCA).first()
+    completo = completo or marca is None
+    dias = todos_los_dias() if completo else dias_cambiados(marca.fecha - MARGEN)
+    agregados = calcular(dias)
+    with transaction.atomic():
+        if completo:
+            AgregadoDiario.objects.all().delete()
+        else:
+            for inicio, fin in _rangos(dias):
+                AgregadoDiario.objects.filter(fecha__range=(inicio, fin)).delete()
+        AgregadoDiario.objects.bulk_create(agregados, batch_size=1000)
+        MarcaProceso.objects.update_or_create(clave=MARCA, defaults={'fecha': ahora})
+    cacheo.invalidar(cacheo.ANALITICA)
+    return len(dias)
+
+
+def periodo(parametros):
+    """(desde, hasta) de ?desde=&hasta= (AAAA-MM-DD); por defecto las últimas semanas completas y la actual"""
+    hoy = timezone.localdate()
+    try:
+        hasta = date.fromisoformat(parametros['hasta']) if parametros.get('hasta') else hoy
+        desde = (date.fromisoformat(parametros['desde']) if parametros.get('desde')
+                 else hasta - timedelta(days=hasta.weekday(), weeks=SEMANAS_POR_DEFECTO - 1))
+    except ValueError:
+        raise ValueError('Las fechas deben tener el formato AAAA-MM-DD')
+    if desde > hasta:
+        raise ValueError('"desde" no puede ser posterior a "hasta"')
+    return desde, hasta
+
+
+class _Acumulado:
+    def __init__(self):
+        self.vencimientos = self.vencidos = self.completados = 0
+        self.horas_totales = 0.0
+        self.histograma = [0] * (len(CUBETAS_HORAS) + 1)
+
+    def sumar(self, fila, hoy):
+        fecha, vencimientos, tarde, abiertos, completados, horas_totales, cuentas = fila
+        # La tasa de vencidos sólo mira días ya pasados; un abierto de hoy aún está a tiempo
+        if fecha < hoy:
+            self.vencimientos += vencimientos
+            self.vencidos += tarde + abiertos
+        self.completados += completados
+        self.horas_totales += horas_totales
+        for indice, cuenta in enumerate(cuentas):
+            self.histograma[indice] += cuenta
+
+    def publicar(self):
+        return {
+            'completados': self.completados,
+            'horas_media': round(self.horas_totales / self.completados, 1) if self.completados else None,
+            'horas_p50': _redondear(percentil(self.histograma, 50)),
+            'horas_p90': _redondear(percentil(self.histograma, 90)),
+            'vencimientos': self.vencimientos,
+            'vencidos': self.vencidos,
+            'tasa_vencidos': round(self.vencidos / self.vencimientos, 3) if self.vencimientos else None,
+        }
+
+
+def _redondear(valor):
+    return None if valor is None else round(valor, 1)
+
+
+def _calcular_informe(desde, hasta, hoy):
+    general = _Acumulado()
+    semanas = defaultdict(_Acumulado)
+    grupos = defaultdict(_Acumulado)
+    filas = AgregadoDiario.objects.filter(fecha__range=(desde, hasta)).values_list(
+        'dimension', 'valor', 'fecha', 'vencimientos', 'tarde', 'abiertos', 'completados', 'horas_totales', 'histograma'
+    )
+    for dimension, valor, *fila in filas:
+        if dimension == 'total':
+            general.sumar(fila, hoy)
+            semanas[fila[0] - timedelta(days=fila[0].weekday())].sumar(fila, hoy)
+        else:
+            grupos[(dimension, valor)].sumar(fila, hoy)
+
+    ids = {dimension: [int(valor) for d, valor in grupos if d == dimension] for dimension in ('revisor', 'tipo')}
+    nombres = {
+        ('revisor', str(usuario.pk)): usuario.get_full_name() or usuario.username
+        for usuario in User.objects.filter(pk__in=ids['revisor']).only('username', 'first_name', 'last_name')
+    }
+    nombres.update(
+        (('tipo', str(pk)), nombre)
+        for pk, nombre in TipoDocumento.objects.filter(pk__in=ids['tipo']).values_list('pk', 'nombre')
+    )
+    nombres.update((('prioridad', valor), etiqueta) for valor, etiqueta in RecordatorioRevision.PRIORIDAD_CHOICES)
+
+    def por_dimension(dimension, orden):
+        return sorted((
+            {'id': valor, 'nombre': nombres.get((d, valor), valor), **acumulado.publicar()}
+            for (d, valor), acumulado in grupos.items() if d == dimension
+        ), key=orden)
+
+    prioridades = [valor for valor, etiqueta in RecordatorioRevision.PRIORIDAD_CHOICES]
+    return {
+        'desde': desde,
+        'hasta': hasta,
+        'general': general.publicar(),
+        'semanas': [{'semana': semana, **semanas[semana].publicar()} for semana in sorted(semanas)],
+        'revisores': por_dimension('revisor', lambda fila: fila['nombre'].lower()),
+        'prioridades': por_dimension('prioridad', lambda fila: prioridades.index(fila['id'])),
+        'tipos': por_dimension('tipo', lambda fila: fila['nombre'].lower()),
+    }
+
+
+def informe(desde, hasta):
+    """Tiempo hasta completar y tasa de vencidos del periodo: total, por semana y por dimensión"""
+    hoy = timezone.localdate()
+    return cacheo.obtener(
+        'analitica', cacheo.clave('analitica', [cacheo.ANALITICA], desde, hasta, hoy),
+        lambda: _calcular_informe(desde, hasta, hoy)
+    )
@@ -0,0 +1,273 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date, quote_etag
+from django.views import View
+from . import analitica, cacheo
+from .filtros import filtrar_documentos, filtrar_recordatorios
+from .models import Documento, MarcaProceso, RecordatorioRevision, TipoDocumento
+from .paginacion import PaginadorCursor
+
+POR_PAGINA = 50
+MAXIMO_POR_PAGINA = 200
+# Vida de la fecha de primera publicación de cada ETag; si expira, la fecha avanza
+# y el cliente recibe un 200 de más, nunca un 304 indebido
+MARCA_SEGUNDOS = 24 * 3600
+
+
+def token_valido(request):
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(token) and any(constant_time_compare(token, valido) for valido in settings.API_TOKENS)
+
+
+def error(mensaje, status):
+    return JsonResponse({'error': mensaje}, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+class RecursoAPI(View):
+    """Recurso de sólo lectura: lista con cursor y detalle, con campos a elección
+
+    Las respuestas llevan ETag; un sondeo sin cambios recibe 304 sin consultar ni
+    serializar las filas. El ETag incluye la generación de las áreas de caché de
+    las tablas relacionadas, así que renombrar un tipo, documento o usuario lo cambia.
+    Last-Modified sale del mismo ETag (ver ultima_modificacion), no sólo de la
+    fecha de la fila, que no refleja esos cambios.
+    """
+    http_method_names = ['get', 'head', 'options']
+    model = None
+    # Nombre público -> ruta para values()
+    campos = {}
+    nombre_cache = None
+    areas_cache = []
+    # Áreas de las tablas relacionadas de las que se publican campos (nombres, usuarios)
+    areas_relacionadas = []
+
+    def dispatch(self, request, *args, **kwargs):
+        if not (request.user.is_authenticated or token_valido(request)):
+            return error('Autenticación requerida', 401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404 as e:
+            return error(str(e) or 'No encontrado', 404)
+        except ValueError as e:
+            return error(str(e), 400)
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def vigencia(self):
+        """Parte del ETag para campos que cambian con el tiempo aunque nadie escriba"""
+        return ''
+
+    def campos_solicitados(self):
+        solicitados = self.request.GET.get('campos')
+        if not solicitados:
+            return list(self.campos)
+        nombres = [nombre.strip() for nombre in solicitados.split(',') if nombre.strip()]
+        desconocidos = [nombre for nombre in nombres if nombre not in self.campos]
+        if desconocidos:
+            raise ValueError(f'Campos desconocidos: {", ".join(desconocidos)}')
+        return nombres
+
+    def filas(self, queryset, nombres, extras=()):
+        rutas = list(dict.fromkeys([self.campos[nombre] for nombre in nombres] + list(extras)))
+        return queryset.values(*rutas)
+
+    def publicar(self, fila, nombres):
+        return {nombre: fila[self.campos[nombre]] for nombre in nombres}
+
+    def responder(self, datos, etag, marca):
+        respuesta = JsonResponse(datos, encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False})
+        respuesta['ETag'] = etag
+        respuesta['Last-Modified'] = http_date(marca)
+        respuesta['Cache-Control'] = 'private, no-cache'
+        return respuesta
+
+    def etag(self, *partes):
+        generaciones = cacheo.generaciones(list(dict.fromkeys(self.areas_cache + self.areas_relacionadas)))
+        semilla = '|'.join(str(parte) for parte in [*partes, generaciones, self.vigencia()])
+        return quote_etag(hashlib.md5(semilla.encode()).hexdigest())
+
+    def ultima_modificacion(self, etag, ultima):
+        """Last-Modified de la versión ``etag``: cuándo se sirvió por primera vez
+
+        Cambia siempre que cambia el ETag, también por una tabla relacionada. Nunca
+        es anterior a ``ultima``, la fecha de modificación de las filas.
+        """
+        ahora = int(time.time())
+        clave_cache = f'api:marca:{etag}'
+        if not cache.add(clave_cache, ahora, MARCA_SEGUNDOS):
+            ahora = cache.get(clave_cache, ahora)
+        return max(ahora, int(ultima.timestamp())) if ultima else ahora
+
+    def condicional(self, etag, marca):
+        """Respuesta 304/412 si el ETag (o, sin If-None-Match, la fecha) del cliente sigue vigente"""
+        return get_conditional_response(self.request, etag=etag, last_modified=marca)
+
+    def get(self, request, pk=None):
+        if pk is not None:
+            return self.detalle(pk)
+        return self.lista()
+
+    def resumen(self, queryset):
+        """(total, última modificación) del filtro, cacheado hasta la próxima escritura"""
+        partes = [sorted((k, v) for k, v in self.request.GET.lists() if k not in ('cursor', 'campos', 'limite'))]
+        if 'vencidos' in self.request.GET or 'urgencia' in self.request.GET:
+            # El conjunto cambia con el tiempo aunque nadie escriba
+            partes.append(timezone.now().strftime('%Y%m%d%H%M'))
+        clave_cache = cacheo.clave(f'api:{self.nombre_cache}', self.areas_cache, *partes)
+        return cacheo.obtener(
+            f'api_{self.nombre_cache}', clave_cache,
+            lambda: tuple(queryset.order_by().aggregate(total=Count('pk'), ultima=Max('fecha_modificacion')).values())
+        )
+
+    def lista(self):
+        nombres = self.campos_solicitados()
+        limite = self.request.GET.get('limite') or str(POR_PAGINA)
+        if not limite.isdigit() or int(limite) < 1:
+            raise ValueError('El límite debe ser un entero mayor que cero')
+        limite = min(int(limite), MAXIMO_POR_PAGINA)
+        queryset = self.get_queryset()
+
+        total, ultima = self.resumen(queryset)
+        etag = self.etag(total, ultima, sorted(self.request.GET.lists()))
+        marca = self.ultima_modificacion(etag, ultima)
+        no_modificada = self.condicional(etag, marca)
+        if no_modificada is not None:
+            return no_modificada
+
+        paginador = PaginadorCursor(queryset, limite, contar_total=False)
+        # Las columnas del orden van en la fila para construir el cursor
+        paginador.queryset = self.filas(queryset, nombres, [campo for campo, desc in paginador.campos])
+        try:
+            pagina = paginador.pagina(self.request.GET.get('cursor'), self.request.GET)
+        except Http404 as e:
+            raise ValueError(str(e))
+        base = self.request.build_absolute_uri(self.request.path)
+        return self.responder({
+            'total': total,
+            'resultados': [self.publicar(fila, nombres) for fila in pagina.object_list],
+            'anterior': base + pagina.url_anterior if pagina.has_previous() else None,
+            'siguiente': base + pagina.url_siguiente if pagina.has_next() else None,
+        }, etag, marca)
+
+    def detalle(self, pk):
+        nombres = self.campos_solicitados()
+        fila = self.filas(self.get_queryset().filter(pk=pk), nombres, ['fecha_modificacion']).first()
+        if fila is None:
+            raise Http404('No encontrado')
+        ultima = fila['fecha_modificacion']
+        etag = self.etag(pk, ultima, nombres)
+        marca = self.ultima_modificacion(etag, ultima)
+        no_modificada = self.condicional(etag, marca)
+        if no_modificada is not None:
+            return no_modificada
+        return self.responder(self.publicar(fila, nombres), etag, marca)
+
+
+class TipoDocumentoAPI(RecursoAPI):
+    model = TipoDocumento
+    nombre_cache = 'tipos'
+    areas_cache = [cacheo.TIPOS]
+    campos = {
+        'id': 'id',
+        'nombre': 'nombre',
+        'descripcion': 'descripcion',
+        'activo': 'activo',
+        'fecha_modificacion': 'fecha_modificacion',
+    }
+
+    def get_queryset(self):
+        queryset = TipoDocumento.objects.all()
+        if self.request.GET.get('activo') in ('0', '1'):
+            queryset = queryset.filter(activo=self.request.GET['activo'] == '1')
+        return queryset
+
+
+class DocumentoAPI(RecursoAPI):
+    model = Documento
+    nombre_cache = 'documentos'
+    areas_cache = [cacheo.DOCUMENTOS, cacheo.TIPOS]
+    areas_relacionadas = [cacheo.USUARIOS]
+    campos = {
+        'id': 'id',
+        'codigo_documento': 'codigo_documento',
+        'titulo': 'titulo',
+        'descripcion': 'descripcion',
+        'tipo': 'tipo_id',
+        'tipo_nombre': 'tipo__nombre',
+        'version': 'version',
+        'estado': 'estado',
+        'creado_por': 'creado_por__username',
+        'fecha_creacion': 'fecha_creacion',
+        'fecha_modificacion': 'fecha_modificacion',
+    }
+
+    def get_queryset(self):
+        return filtrar_documentos(Documento.objects.all(), self.request.GET)
+
+
+class RecordatorioAPI(RecursoAPI):
+    model = RecordatorioRevision
+    nombre_cache = 'recordatorios'
+    areas_cache = [cacheo.RECORDATORIOS, cacheo.DOCUMENTOS]
+    areas_relacionadas = [cacheo.USUARIOS]
+    campos = {
+        'id': 'id',
+        'documento': 'documento_id',
+        'codigo_documento': 'documento__codigo_documento',
+        'titulo_documento': 'documento__titulo',
+        'fecha_revision': 'fecha_revision',
+        'fecha_proxima_revision': 'fecha_proxima_revision',
+        'revisor': 'revisor__username',
+        'estado': 'estado',
+        'prioridad': 'prioridad',
+        'observaciones': 'observaciones',
+        'hallazgos': 'hallazgos',
+        'acciones_correctivas': 'acciones_correctivas',
+        'fecha_completado': 'fecha_completado',
+        'recurrencia': 'recurrencia_id',
+        'urgencia': 'urgencia',
+        'fecha_modificacion': 'fecha_modificacion',
+    }
+
+    def get_queryset(self):
+        queryset = RecordatorioRevision.objects.con_urgencia().order_by('-fecha_revision')
+        return filtrar_recordatorios(queryset, self.request.GET)
+
+    def vigencia(self):
+        # La urgencia cambia al empezar cada día
+        return timezone.localdate().isoformat()
+
+
+class AnaliticaAPI(View):
+    """Informe de analitica.informe() para ?desde=&hasta=; cambia al actualizar los agregados"""
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request):
+        if not (request.user.is_authenticated or token_valido(request)):
+            return error('Autenticación requerida', 401)
+        try:
+            desde, hasta = analitica.periodo(request.GET)
+        except ValueError as e:
+            return error(str(e), 400)
+        marca = MarcaProceso.objects.filter(clave=analitica.MARCA).values_list('fecha', flat=True).first()
+        # El día actual separa los vencidos de los que aún están a tiempo
+        semilla = f'{marca}|{desde}|{hasta}|{timezone.localdate()}'
+        etag = quote_etag(hashlib.md5(semilla.encode()).hexdigest())
+        no_modificada = get_conditional_response(request, etag=etag)
+        if no_modificada is not None:
+            return no_modificada
+        respuesta = JsonResponse({'actualizado': marca, **analitica.informe(desde, hasta)},
+                                 encoder=DjangoJSONEncoder, json_dumps_params={'ensure_ascii': False})
+        respuesta['ETag'] = etag
+        respuesta['Cache-Control'] = 'private, no-cache'
+        return respuesta
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class RecordatoriosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recordatorios'
-    verbose_name = 'Sistema de Recordatorios'
\ No newline at end of file
+    verbose_name = 'Sistema de Recordatorios'
+    
+    def ready(self):
+        from . import consultas, signals  # noqa: F401
@@ -0,0 +1,230 @@
+import asyncio
+import atexit
+import logging
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection as conexion_por_defecto, transaction
+from django.utils import timezone
+from django.utils.decorators import sync_and_async_middleware
+from .models import TransicionRecordatorio
+
+logger = logging.getLogger(__name__)
+
+# Campos de RecordatorioRevision que se auditan y nombre con el que se registran
+CAMPOS = {
+    'estado': 'estado',
+    'prioridad': 'prioridad',
+    'revisor_id': 'revisor',
+    'fecha_revision': 'fecha_revision',
+    'fecha_proxima_revision': 'fecha_proxima_revision',
+}
+# Máximo de transiciones retenidas si la base no acepta escrituras; las que
+# excedan se descartan escribiéndolas completas en el log de errores
+MAXIMO_PENDIENTES = 100000
+
+_peticion_actual = ContextVar('auditoria_peticion', default=None)
+
+# Tuplas (recordatorio_id, campo, anterior, nuevo, origen, usuario_id, fecha) aún sin escribir
+_pendientes = []
+_cerrojo = threading.Lock()
+_despertar = threading.Event()
+_hilo = None
+# (año, mes) cuya partición ya existe, para no repetir el DDL en cada escritura
+_meses_con_particion = set()
+
+
+@sync_and_async_middleware
+def AuditoriaMiddleware(get_response):
+    """Deja la petición en curso a mano para atribuir las transiciones a su usuario"""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _peticion_actual.set(request)
+            try:
+                return await get_response(request)
+            finally:
+                _peticion_actual.reset(token)
+    else:
+        def middleware(request):
+            token = _peticion_actual.set(request)
+            try:
+                return get_response(request)
+            finally:
+                _peticion_actual.reset(token)
+    return middleware
+
+
+def usuario_actual():
+    """Id del usuario de la petición en curso; None fuera de una petición (comandos, programador)"""
+    request = _peticion_actual.get()
+    usuario = getattr(request, 'user', None)
+    if usuario is None or not usuario.is_authenticated:
+        return None
+    return usuario.pk
+
+
+def _texto(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, datetime):
+        return timezone.localtime(valor).isoformat()
+    return str(valor)
+
+
+def transiciones(origen, cambios):
+    """Tuplas a registrar de ``cambios`` = [(recordatorio_id, atributo, anterior, nuevo), ...]
+
+    Omite los que no cambian el valor. Usuario y fecha son los de la petición en curso.
+    """
+    usuario_id = usuario_actual()
+    ahora = timezone.now()
+    return [
+        (recordatorio_id, CAMPOS[atributo], _texto(anterior), _texto(nuevo), origen, usuario_id, ahora)
+        for recordatorio_id, atributo, anterior, nuevo in cambios
+        if anterior != nuevo
+    ]
+
+
+def registrar(filas):
+    """Encola las transiciones al confirmar la transacción; no escribe en la base
+
+    Las escribe en lote el hilo de auditoría o, sin hilo, el final de la petición.
+    """
+    if filas:
+        transaction.on_commit(lambda: _encolar(filas))
+
+
+def _encolar(filas):
+    with _cerrojo:
+        _pendientes.extend(filas)
+        lleno = len(_pendientes) >= settings.AUDITORIA_LOTE
+    if settings.AUDITORIA_HILO:
+        _iniciar_hilo()
+        if lleno:
+            _despertar.set()
+    elif lleno:
+        vaciar()
+
+
+def _en_bucle_de_eventos():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def vaciar():
+    """Escribe con bulk_create las transiciones pendientes; devuelve cuántas
+
+    Dentro de un bucle de eventos (vistas asíncronas, SSE) el ORM síncrono no está
+    permitido: las filas siguen en cola para el hilo o la siguiente petición.
+    """
+    global _pendientes
+    if _en_bucle_de_eventos():
+        return 0
+    with _cerrojo:
+        filas, _pendientes = _pendientes, []
+    if not filas:
+        return 0
+    try:
+        _particiones_para(filas)
+        TransicionRecordatorio.objects.bulk_create([
+            TransicionRecordatorio(recordatorio_id=recordatorio_id, campo=campo, valor_anterior=anterior,
+                                   valor_nuevo=nuevo, origen=origen, usuario_id=usuario_id, fecha=fecha)
+            for recordatorio_id, campo, anterior, nuevo, origen, usuario_id, fecha in filas
+        ], batch_size=settings.AUDITORIA_LOTE)
+    except Exception:
+        # Cualquier fallo devuelve las filas a la cola: no se pierden transiciones
+        logger.exception('No se pudieron escribir %s transiciones; se reintentará', len(filas))
+        with _cerrojo:
+            _pendientes[:0] = filas
+            exceso = len(_pendientes) - MAXIMO_PENDIENTES
+            descartadas = _pendientes[:exceso] if exceso > 0 else []
+            del _pendientes[:len(descartadas)]
+        if descartadas:
+            logger.error('Cola de auditoría llena: se descartan las %s transiciones más antiguas: %r',
+                         len(descartadas), descartadas)
+        return 0
+    return len(filas)
+
+
+def _particiones_para(filas):
+    """Crea a demanda las particiones de los meses de ``filas`` que aún no se han visto
+
+    Así no hace falta el programador para que las filas nuevas caigan en su mes.
+    Si el DDL falla (p. ej. la partición por defecto ya tiene filas de ese mes)
+    las filas van a la partición por defecto.
+    """
+    meses = {(fecha.year, fecha.month) for fecha in (timezone.localtime(fila[-1]) for fila in filas)}
+    meses -= _meses_con_particion
+    if not meses:
+        return
+    try:
+        with transaction.atomic():
+            crear_particiones(meses)
+    except DatabaseError:
+        logger.exception('No se pudieron crear las particiones de %s', sorted(meses))
+    else:
+        _meses_con_particion.update(meses)
+
+
+def _ejecutar_hilo():
+    while True:
+        _despertar.wait(settings.AUDITORIA_INTERVALO)
+        _despertar.clear()
+        close_old_connections()
+        vaciar()
+
+
+def _iniciar_hilo():
+    global _hilo
+    if _hilo is not None:
+        return
+    with _cerrojo:
+        if _hilo is None:
+            _hilo = threading.Thread(target=_ejecutar_hilo, name='auditoria', daemon=True)
+            _hilo.start()
+
+
+# Lo que quede en memoria al terminar el proceso (comandos, workers que se reciclan)
+atexit.register(vaciar)
+
+
+def _meses(desde, cantidad):
+    anio, mes = desde.year, desde.month
+    for _ in range(cantidad + 1):
+        yield anio, mes
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def crear_particiones(meses, conexion=None):
+    """En PostgreSQL crea, si no existen, las particiones de los ``meses`` = [(año, mes), ...]
+
+    En otras bases no hace nada.
+    """
+    conexion = conexion or conexion_por_defecto
+    if conexion.vendor != 'postgresql':
+        return
+    tabla = TransicionRecordatorio._meta.db_table
+    zona = timezone.get_current_timezone()
+    with conexion.cursor() as cursor:
+        for anio, mes in sorted(meses):
+            inicio = datetime(anio, mes, 1, tzinfo=zona)
+            fin = datetime(anio + 1, 1, 1, tzinfo=zona) if mes == 12 else datetime(anio, mes + 1, 1, tzinfo=zona)
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {tabla}_p{inicio:%Y%m} PARTITION OF {tabla} '
+                f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+            )
+
+
+def asegurar_particiones(meses=2, conexion=None):
+    """Particiones mensuales del mes actual y los ``meses`` siguientes
+
+    El programador las crea por adelantado; vaciar() crea las que falten al
+    escribir. Las filas fuera de rango van a la partición por defecto.
+    """
+    crear_particiones(list(_meses(timezone.localdate(), meses)), conexion)
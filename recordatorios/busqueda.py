@@ -0,0 +1,237 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from .models import Documento
+
+TABLA_FTS = 'recordatorios_documento_fts'
+TABLA_TSVECTOR = 'recordatorios_documento_busqueda'
+
+# Términos con forma de código (LAB-DOC-0, PRO-12) usan el índice único de codigo_documento
+PATRON_CODIGO = re.compile(r'^[\w.]+-[\w.-]*$')
+
+
+def normalizar(texto):
+    """Minúsculas sin acentos, dividido en palabras"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r'\w+', texto)
+
+
+def raiz(palabra):
+    """Stemmer ligero para español: quita plural y vocal final"""
+    if len(palabra) > 4 and palabra.endswith('es') and palabra[-3] not in 'aeiou':
+        palabra = palabra[:-2]
+    elif len(palabra) > 3 and palabra.endswith('s'):
+        palabra = palabra[:-1]
+    if len(palabra) > 3 and palabra[-1] in 'aoe':
+        palabra = palabra[:-1]
+    return palabra
+
+
+def texto_indexable(texto, stemming=True):
+    palabras = normalizar(texto or '')
+    if stemming:
+        palabras = [raiz(p) for p in palabras]
+    return ' '.join(palabras)
+
+
+class BusquedaBase:
+    """Interfaz de los backends de búsqueda de documentos"""
+
+    def buscar(self, queryset, termino, relevancia=True):
+        if PATRON_CODIGO.match(termino):
+            por_codigo = self.buscar_codigo(queryset, termino)
+            if por_codigo.exists():
+                return por_codigo
+        return self.buscar_texto(queryset, termino, relevancia)
+
+    def buscar_codigo(self, queryset, prefijo):
+        """Ruta rápida: prefijo exacto sobre codigo_documento"""
+        return queryset.filter(codigo_documento__startswith=prefijo).order_by('codigo_documento')
+
+    def buscar_texto(self, queryset, termino, relevancia=True):
+        """Con relevancia=False no se calcula el rango: más recientes primero
+
+        Así una página (p. ej. del autocompletado) no exige puntuar y ordenar
+        todas las coincidencias.
+        """
+        raise NotImplementedError
+
+    def indexar(self, documentos):
+        pass
+
+    def eliminar(self, ids):
+        pass
+
+    def reconstruir(self):
+        return 0
+
+
+class BusquedaIContains(BusquedaBase):
+    """Búsqueda sin índice para motores sin texto completo"""
+
+    def buscar_texto(self, queryset, termino, relevancia=True):
+        coincidencias = queryset.filter(
+            Q(titulo__icontains=termino) |
+            Q(codigo_documento__icontains=termino) |
+            Q(descripcion__icontains=termino)
+        )
+        return coincidencias if relevancia else coincidencias.order_by('-pk')
+
+
+class BusquedaSQLite(BusquedaBase):
+    """Tabla virtual FTS5 con rowid = id del documento"""
+
+    tamano_lote = 2000
+
+    def buscar_codigo(self, queryset, prefijo):
+        # LIKE en SQLite no usa el índice; un rango sobre la colación binaria sí
+        siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+        return queryset.filter(
+            codigo_documento__gte=prefijo, codigo_documento__lt=siguiente
+        ).order_by('codigo_documento')
+
+    def consulta(self, termino):
+        palabras = normalizar(termino)
+        return ' '.join(f'"{raiz(p)}"*' for p in palabras)
+
+    def buscar_texto(self, queryset, termino, relevancia=True):
+        consulta = self.consulta(termino)
+        if not consulta:
+            return queryset.none()
+        tabla = Documento._meta.db_table
+        coincidencias = RawSQL(f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s', [consulta])
+        if not relevancia:
+            return queryset.filter(pk__in=coincidencias).order_by('-pk')
+        rango = RawSQL(
+            f'SELECT bm25({TABLA_FTS}, 10.0, 10.0, 1.0) FROM {TABLA_FTS} '
+            f'WHERE {TABLA_FTS} MATCH %s AND rowid = {tabla}.id',
+            [consulta]
+        )
+        return queryset.filter(pk__in=coincidencias).annotate(rango=rango).order_by('rango', '-fecha_modificacion')
+
+    def filas(self, documentos):
+        return [
+            (pk, texto_indexable(titulo), texto_indexable(codigo, stemming=False), texto_indexable(descripcion))
+            for pk, titulo, codigo, descripcion in documentos
+        ]
+
+    def indexar(self, documentos):
+        filas = self.filas((d.pk, d.titulo, d.codigo_documento, d.descripcion) for d in documentos)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {TABLA_FTS} WHERE rowid = %s', [(fila[0],) for fila in filas])
+            cursor.executemany(
+                f'INSERT INTO {TABLA_FTS} (rowid, titulo, codigo_documento, descripcion) VALUES (%s, %s, %s, %s)',
+                filas
+            )
+
+    def eliminar(self, ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {TABLA_FTS} WHERE rowid = %s', [(pk,) for pk in ids])
+
+    def reconstruir(self):
+        documentos = Documento.objects.order_by().values_list(
+            'pk', 'titulo', 'codigo_documento', 'descripcion'
+        ).iterator(chunk_size=self.tamano_lote)
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_FTS}')
+            lote = []
+            for documento in documentos:
+                lote.append(documento)
+                if len(lote) >= self.tamano_lote:
+                    total += self._insertar(cursor, lote)
+                    lote = []
+            total += self._insertar(cursor, lote)
+            cursor.execute(f"INSERT INTO {TABLA_FTS} ({TABLA_FTS}) VALUES ('optimize')")
+        return total
+
+    def _insertar(self, cursor, lote):
+        cursor.executemany(
+            f'INSERT INTO {TABLA_FTS} (rowid, titulo, codigo_documento, descripcion) VALUES (%s, %s, %s, %s)',
+            self.filas(lote)
+        )
+        return len(lote)
+
+
+class BusquedaPostgres(BusquedaBase):
+    """Columna tsvector con índice GIN y configuración 'spanish'"""
+
+    def vector_sql(self):
+        return (
+            "setweight(to_tsvector('simple', codigo_documento), 'A') || "
+            "setweight(to_tsvector('spanish', titulo), 'A') || "
+            "setweight(to_tsvector('spanish', descripcion), 'B')"
+        )
+
+    def consulta(self, termino):
+        palabras = re.findall(r'\w+', termino)
+        return ' & '.join(f'{p}:*' for p in palabras)
+
+    def buscar_texto(self, queryset, termino, relevancia=True):
+        consulta = self.consulta(termino)
+        if not consulta:
+            return queryset.none()
+        tabla = Documento._meta.db_table
+        coincidencias = RawSQL(
+            f"SELECT documento_id FROM {TABLA_TSVECTOR} WHERE vector @@ to_tsquery('spanish', %s)",
+            [consulta]
+        )
+        if not relevancia:
+            return queryset.filter(pk__in=coincidencias).order_by('-pk')
+        rango = RawSQL(
+            f"SELECT ts_rank(vector, to_tsquery('spanish', %s)) FROM {TABLA_TSVECTOR} "
+            f"WHERE documento_id = {tabla}.id",
+            [consulta]
+        )
+        return queryset.filter(pk__in=coincidencias).annotate(rango=rango).order_by('-rango', '-fecha_modificacion')
+
+    def indexar(self, documentos):
+        self._insertar([d.pk for d in documentos])
+
+    def eliminar(self, ids):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABLA_TSVECTOR} WHERE documento_id = ANY(%s)', [list(ids)])
+
+    def reconstruir(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {TABLA_TSVECTOR}')
+        return self._insertar(None)
+
+    def _insertar(self, ids):
+        tabla = Documento._meta.db_table
+        sql = f'INSERT INTO {TABLA_TSVECTOR} (documento_id, vector) SELECT id, {self.vector_sql()} FROM {tabla}'
+        params = []
+        if ids is not None:
+            sql += ' WHERE id = ANY(%s)'
+            params.append(list(ids))
+        sql += ' ON CONFLICT (documento_id) DO UPDATE SET vector = EXCLUDED.vector'
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+
+BACKENDS = {
+    'sqlite': BusquedaSQLite,
+    'postgresql': BusquedaPostgres,
+}
+
+
+def obtener_backend():
+    """Backend configurado en BUSQUEDA_DOCUMENTOS_BACKEND o el del motor de base de datos"""
+    ruta = getattr(settings, 'BUSQUEDA_DOCUMENTOS_BACKEND', None)
+    if ruta:
+        return import_string(ruta)()
+    return BACKENDS.get(connection.vendor, BusquedaIContains)()
+
+
+def buscar_documentos(queryset, termino, relevancia=True):
+    termino = termino.strip()
+    if not termino:
+        return queryset
+    return obtener_backend().buscar(queryset, termino, relevancia)
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from .models import TipoDocumento
+
+# Generaciones: cada escritura incrementa la de su área y las claves que la
+# incluyen dejan de usarse, sin tener que buscar ni borrar entradas.
+TIPOS = 'tipos'
+DOCUMENTOS = 'documentos'
+RECORDATORIOS = 'recordatorios'
+# Nombres de usuario publicados por la API (creado_por, revisor)
+USUARIOS = 'usuarios'
+# Agregados de analitica.py: cambian sólo al ejecutar actualizar_analitica
+ANALITICA = 'analitica'
+
+AREAS = [TIPOS, DOCUMENTOS, RECORDATORIOS, USUARIOS, ANALITICA]
+
+
+def _clave_generacion(area):
+    return f'gen:{area}'
+
+
+def generaciones(areas):
+    """Generación actual de cada área, leídas en una sola operación"""
+    claves = [_clave_generacion(area) for area in areas]
+    valores = cache.get_many(claves)
+    for clave_area in claves:
+        if clave_area not in valores:
+            cache.add(clave_area, 1, None)
+            valores[clave_area] = cache.get(clave_area, 1)
+    return [valores[clave_area] for clave_area in claves]
+
+
+def invalidar(*areas):
+    def incrementar_areas():
+        for area in areas:
+            _incrementar(_clave_generacion(area), inicial=1)
+    incrementar_areas()
+    # Otra vez al confirmar: una lectura concurrente pudo cachear datos previos al COMMIT
+    transaction.on_commit(incrementar_areas)
+
+
+def _incrementar(clave, inicial=0):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # La clave no existe (o expiró): add evita pisar a otro proceso
+        if not cache.add(clave, inicial + 1, None):
+            cache.incr(clave)
+
+
+def clave(prefijo, areas, *partes):
+    """Clave de caché que cambia cuando cambia la generación de ``areas``"""
+    version = '.'.join(str(generacion) for generacion in generaciones(areas))
+    resumen = hashlib.md5('|'.join(str(parte) for parte in partes).encode()).hexdigest()
+    return f'{prefijo}:{version}:{resumen}'
+
+
+# Contadores de aciertos/fallos por nombre, compartidos por todos los procesos
+# que usan el mismo backend de caché
+
+def _contador(tipo, nombre):
+    return f'metricas:{tipo}:{nombre}'
+
+
+def registrar(nombre, acierto):
+    _incrementar(_contador('aciertos' if acierto else 'fallos', nombre))
+
+
+def metricas(nombres):
+    claves = {(tipo, nombre): _contador(tipo, nombre) for nombre in nombres for tipo in ('aciertos', 'fallos')}
+    valores = cache.get_many(list(claves.values()))
+    return {par: valores.get(clave_contador, 0) for par, clave_contador in claves.items()}
+
+
+NOMBRES = ['tipos_activos', 'fragmento_documentos', 'fragmento_recordatorios', 'detalle_documento', 'detalle_recordatorio',
+            'facetas_admin', 'analitica']
+
+
+def obtener(nombre, clave_cache, calcular, timeout=None):
+    """Devuelve el valor cacheado o lo calcula y lo guarda, contando aciertos y fallos"""
+    valor = cache.get(clave_cache)
+    registrar(nombre, valor is not None)
+    if valor is None:
+        valor = calcular()
+        cache.set(clave_cache, valor, settings.CACHE_SEGUNDOS if timeout is None else timeout)
+    return valor
+
+
+def tipos_activos():
+    return obtener(
+        'tipos_activos', clave('tipos', [TIPOS]), lambda: list(TipoDocumento.objects.filter(activo=True))
+    )
+
+
+class CacheListaMixin:
+    """Cachea el HTML de la lista por filtros; en un acierto no se consulta la lista
+
+    El fragmento no lleva nada propio del usuario (ni el token CSRF): lo que
+    depende de la sesión queda en la plantilla exterior.
+    """
+    nombre_cache = None
+    areas_cache = []
+    plantilla_fragmento = None
+
+    def get_contexto_exterior(self):
+        return {}
+
+    def obtener_fragmento(self, request):
+        filtros = sorted(request.GET.lists())
+        clave_cache = clave(self.nombre_cache, self.areas_cache, filtros)
+
+        def renderizar():
+            self.object_list = self.get_queryset()
+            return render_to_string(self.plantilla_fragmento, self.get_context_data(), request)
+
+        return obtener(self.nombre_cache, clave_cache, renderizar)
+
+    def get(self, request, *args, **kwargs):
+        # Queryset vacío (sin consulta) para get_template_names en un acierto
+        self.object_list = self.model._default_manager.none()
+        fragmento = self.obtener_fragmento(request)
+        return self.render_to_response({'view': self, 'fragmento': fragmento, **self.get_contexto_exterior()})
+
+
+class CacheListaAsyncMixin(CacheListaMixin):
+    """Variante para ASGI: no ocupa un hilo mientras espera a la caché o a la base
+
+    Debe ir antes de LoginRequiredMixin; el fragmento y el contexto exterior
+    se piden a la vez.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        if not await sync_to_async(lambda: request.user.is_authenticated)():
+            return self.handle_no_permission()
+        handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+        return await handler(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.model._default_manager.none()
+        fragmento, exterior = await asyncio.gather(
+            sync_to_async(self.obtener_fragmento)(request),
+            sync_to_async(self.get_contexto_exterior)(),
+        )
+        return self.render_to_response({'view': self, 'fragmento': fragmento, **exterior})
+
+
+class CacheDetalleMixin:
+    """Cachea título y cuerpo renderizados de una vista de detalle por pk"""
+    nombre_cache = None
+    areas_cache = []
+    plantilla_fragmento = None
+
+    def get(self, request, *args, **kwargs):
+        clave_cache = clave(self.nombre_cache, self.areas_cache, self.kwargs.get(self.pk_url_kwarg))
+
+        def renderizar():
+            self.object = self.get_object()
+            contexto = self.get_context_data(object=self.object)
+            return {
+                'titulo': self.titulo_cache(self.object),
+                'html': render_to_string(self.plantilla_fragmento, contexto, request),
+            }
+
+        fragmento = obtener(self.nombre_cache, clave_cache, renderizar)
+        return self.render_to_response({'view': self, 'fragmento': fragmento})
+
+    def titulo_cache(self, objeto):
+        return str(objeto)
@@ -0,0 +1,178 @@
+import secrets
+import time
+from datetime import timezone as zona_horaria
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
+from .models import RecordatorioRevision, TokenCalendario
+
+# Los recordatorios abiertos son los que aparecen en el calendario
+ESTADOS = ['pendiente', 'en_proceso']
+FEED_SEGUNDOS = 24 * 3600
+TIPO_CONTENIDO = 'text/calendar; charset=utf-8'
+LOTE = 500
+PRIORIDADES = dict(RecordatorioRevision.PRIORIDAD_CHOICES)
+
+# Versión de cada calendario: momento de su último cambio, en la caché compartida.
+# Un cambio sin revisores conocidos (importaciones, recurrencias) cambia la de todos.
+_TODOS = 'todos'
+
+
+def _clave_version(revisor_id):
+    return f'calendario:version:{revisor_id}'
+
+
+def invalidar(revisores=None):
+    """Marca como cambiados los calendarios de ``revisores`` (ids) o, sin ellos, todos"""
+    claves = [_clave_version(_TODOS)] if revisores is None else [_clave_version(pk) for pk in set(revisores)]
+    if not claves:
+        return
+
+    def marcar():
+        ahora = time.time()
+        cache.set_many({clave: ahora for clave in claves}, None)
+    marcar()
+    # Otra vez al confirmar: una petición concurrente pudo generar el calendario previo al COMMIT
+    transaction.on_commit(marcar)
+
+
+def version(revisor_id):
+    """Momento (epoch) del último cambio que afecta al calendario del revisor"""
+    claves = [_clave_version(_TODOS), _clave_version(revisor_id)]
+    valores = cache.get_many(claves)
+    for clave in claves:
+        if clave not in valores:
+            # Expulsada de la caché: se da por cambiado (add para no pisar a otro proceso)
+            ahora = time.time()
+            cache.add(clave, ahora, None)
+            valores[clave] = cache.get(clave, ahora)
+    return max(valores.values())
+
+
+def token_de(usuario_id):
+    token, creado = TokenCalendario.objects.get_or_create(
+        usuario_id=usuario_id, defaults={'token': secrets.token_urlsafe(32)}
+    )
+    return token.token
+
+
+# Formato iCalendar (RFC 5545)
+
+def _escapar(texto):
+    return (texto.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _linea(contenido):
+    """Línea de contenido plegada a 75 octetos, sin partir caracteres UTF-8"""
+    partes = []
+    actual, octetos = '', 0
+    for caracter in contenido:
+        largo = len(caracter.encode())
+        if octetos + largo > (75 if not partes else 74):
+            partes.append(actual)
+            actual, octetos = '', 0
+        actual += caracter
+        octetos += largo
+    partes.append(actual)
+    return '\r\n '.join(partes) + '\r\n'
+
+
+def _fecha_utc(fecha):
+    return fecha.astimezone(zona_horaria.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _evento(fila, dominio, zona):
+    dia = fila['fecha_proxima_revision'].astimezone(zona).date()
+    url = settings.SITIO_URL + reverse('recordatorio_detalle', args=[fila['pk']])
+    prioridad = PRIORIDADES.get(fila['prioridad'], fila['prioridad'])
+    return ''.join([
+        'BEGIN:VEVENT\r\n',
+        _linea(f'UID:recordatorio-{fila["pk"]}@{dominio}'),
+        f'DTSTAMP:{_fecha_utc(fila["fecha_modificacion"])}\r\n',
+        f'DTSTART;VALUE=DATE:{dia:%Y%m%d}\r\n',
+        _linea('SUMMARY:' + _escapar(f'Revisión: {fila["documento__titulo"]} ({fila["documento__codigo_documento"]})')),
+        _linea('DESCRIPTION:' + _escapar(f'Prioridad: {prioridad}\n{url}')),
+        _linea(f'URL:{url}'),
+        'TRANSP:TRANSPARENT\r\n',
+        'END:VEVENT\r\n',
+    ])
+
+
+def generar(revisor_id):
+    """Líneas del calendario leídas con values() por lotes, sin instanciar modelos"""
+    dominio = settings.SITIO_URL.split('://')[-1].split('/')[0]
+    zona = timezone.get_current_timezone()
+    yield ('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Laboratorio//Recordatorios//ES\r\n'
+           'CALSCALE:GREGORIAN\r\nX-WR-CALNAME:Recordatorios de revisión\r\n')
+    filas = RecordatorioRevision.objects.filter(
+        revisor_id=revisor_id, estado__in=ESTADOS, fecha_proxima_revision__isnull=False
+    ).order_by('fecha_proxima_revision', 'pk').values(
+        'pk', 'fecha_proxima_revision', 'fecha_modificacion', 'prioridad',
+        'documento__titulo', 'documento__codigo_documento',
+    )
+    for fila in filas.iterator(chunk_size=LOTE):
+        yield _evento(fila, dominio, zona)
+    yield 'END:VCALENDAR\r\n'
+
+
+def _generar_y_guardar(revisor_id, clave_cache):
+    # Sólo se guarda si el cliente recibió el calendario completo
+    partes = []
+    for parte in generar(revisor_id):
+        partes.append(parte.encode())
+        yield partes[-1]
+    cache.set(clave_cache, b''.join(partes), FEED_SEGUNDOS)
+
+
+@require_safe
+def feed(request, token):
+    """Calendario .ics de los recordatorios abiertos del dueño del token, sin sesión
+
+    Un sondeo sin cambios cuesta una consulta (el token) y responde 304.
+    """
+    revisor_id = TokenCalendario.objects.filter(
+        token=token, usuario__is_active=True
+    ).values_list('usuario_id', flat=True).first()
+    if revisor_id is None:
+        raise Http404('Calendario no encontrado')
+    marca = version(revisor_id)
+    etag = quote_etag(f'{revisor_id}-{int(marca * 1000)}')
+    no_modificada = get_conditional_response(request, etag=etag, last_modified=int(marca))
+    if no_modificada is not None:
+        return no_modificada
+
+    clave_cache = f'calendario:feed:{revisor_id}:{marca}'
+    contenido = cache.get(clave_cache)
+    if contenido is not None:
+        respuesta = HttpResponse(contenido, content_type=TIPO_CONTENIDO)
+    else:
+        respuesta = StreamingHttpResponse(_generar_y_guardar(revisor_id, clave_cache), content_type=TIPO_CONTENIDO)
+    respuesta['ETag'] = etag
+    respuesta['Last-Modified'] = http_date(marca)
+    respuesta['Cache-Control'] = 'private, no-cache'
+    respuesta['Content-Disposition'] = 'inline; filename="recordatorios.ics"'
+    return respuesta
+
+
+@login_required
+def enlace(request):
+    """Dirección del calendario del usuario; POST genera un token nuevo e invalida el anterior"""
+    if request.method == 'POST':
+        TokenCalendario.objects.update_or_create(
+            usuario=request.user, defaults={'token': secrets.token_urlsafe(32)}
+        )
+        messages.success(request, 'Se generó una dirección nueva; la anterior dejó de funcionar.')
+        return redirect('calendario')
+    url = request.build_absolute_uri(reverse('calendario_feed', args=[token_de(request.user.pk)]))
+    return render(request, 'recordatorios/calendario.html', {'url': url})
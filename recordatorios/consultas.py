@@ -0,0 +1,127 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+# Registro de la petición en curso; las ContextVar pasan a los hilos de sync_to_async
+_registro_actual = ContextVar('registro_consultas', default=None)
+
+_LISTA_PARAMETROS = re.compile(r'\((?:%s, )+%s\)')
+_NUMEROS = re.compile(r'\b\d+\b')
+
+
+def huella(sql):
+    """SQL normalizado: las consultas que sólo cambian en parámetros comparten huella"""
+    sql = _LISTA_PARAMETROS.sub('(%s, ...)', sql)
+    return _NUMEROS.sub('N', sql)
+
+
+class RegistroConsultas:
+    """Cuenta consultas, tiempo total y huellas repetidas mientras está activo"""
+
+    def __init__(self):
+        self.total = 0
+        self.tiempo = 0.0
+        self.huellas = Counter()
+
+    def __enter__(self):
+        self._token = _registro_actual.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _registro_actual.reset(self._token)
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo += time.perf_counter() - inicio
+            self.total += 1
+            self.huellas[huella(sql)] += 1
+
+    def repetidas(self, umbral=None):
+        """Huellas ejecutadas al menos ``umbral`` veces: probables bucles N+1"""
+        umbral = umbral or settings.CONSULTAS_UMBRAL_REPETIDAS
+        return [(sql, veces) for sql, veces in self.huellas.most_common() if veces >= umbral]
+
+
+def _envolver(execute, sql, params, many, context):
+    registro = _registro_actual.get()
+    if registro is None:
+        return execute(sql, params, many, context)
+    return registro(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrumentar(sender, connection, **kwargs):
+    # Se instala en todas las conexiones; sin registro activo sólo cuesta un ContextVar.get()
+    if _envolver not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_envolver)
+
+
+def _anotar(request, respuesta, registro):
+    respuesta.consultas = registro
+    milisegundos = registro.tiempo * 1000
+    if settings.CONSULTAS_CABECERAS:
+        respuesta['X-Consultas'] = str(registro.total)
+        respuesta['Server-Timing'] = f'db;dur={milisegundos:.1f};desc="{registro.total} consultas"'
+    repetidas = registro.repetidas()
+    for sql, veces in repetidas:
+        logger.warning('Posible N+1 en %s %s: %s veces: %s', request.method, request.path, veces, sql[:300])
+    logger.debug('%s %s: %s consultas en %.1f ms', request.method, request.path, registro.total, milisegundos)
+    return respuesta
+
+
+@sync_and_async_middleware
+def ConsultasMiddleware(get_response):
+    """Cuenta las consultas de cada petición y avisa de las repetidas (N+1)
+
+    Añade X-Consultas y Server-Timing (visible en las herramientas del
+    navegador) y deja el registro en ``respuesta.consultas`` para los tests.
+    Las respuestas en streaming sólo cuentan lo ejecutado antes de empezar a enviar.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with RegistroConsultas() as registro:
+                respuesta = await get_response(request)
+            return _anotar(request, respuesta, registro)
+    else:
+        def middleware(request):
+            with RegistroConsultas() as registro:
+                respuesta = get_response(request)
+            return _anotar(request, respuesta, registro)
+    return middleware
+
+
+class PresupuestoConsultasMixin:
+    """Para TestCase: comprueba el número de consultas de una petición del cliente de test"""
+
+    def assertPresupuesto(self, url, maximo, metodo='get', estado=None, **kwargs):
+        """Sin ``estado`` exige una respuesta 2xx/3xx: un 404 o un 500 también gastan pocas consultas"""
+        respuesta = getattr(self.client, metodo)(url, **kwargs)
+        if estado is None:
+            self.assertTrue(200 <= respuesta.status_code < 400, f'{url}: respuesta {respuesta.status_code}')
+        else:
+            self.assertEqual(respuesta.status_code, estado, f'{url}: respuesta {respuesta.status_code}')
+        registro = respuesta.consultas
+        if respuesta.streaming:
+            # Las filas de una exportación se consultan mientras se envía
+            with registro:
+                b''.join(respuesta.streaming_content)
+        self.assertLessEqual(
+            registro.total, maximo,
+            f'{url}: {registro.total} consultas, presupuesto {maximo}\n' +
+            '\n'.join(f'{veces} x {sql}' for sql, veces in registro.huellas.most_common(5))
+        )
+        self.assertEqual(registro.repetidas(), [], f'{url}: consultas repetidas (N+1)')
+        return respuesta
@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.models import Count, F
+from .models import Documento, RecordatorioRevision, TipoDocumento, EstadisticaDashboard
+
+TOTAL_DOCUMENTOS = 'total_documentos'
+DOCUMENTOS_ACTIVOS = 'documentos_activos'
+TOTAL_RECORDATORIOS = 'total_recordatorios'
+RECORDATORIOS_PENDIENTES = 'recordatorios_pendientes'
+
+CONTADORES_GENERALES = [
+    TOTAL_DOCUMENTOS,
+    DOCUMENTOS_ACTIVOS,
+    TOTAL_RECORDATORIOS,
+    RECORDATORIOS_PENDIENTES,
+]
+
+
+def clave_tipo(tipo_id):
+    """Clave del contador de documentos de un tipo"""
+    return f'tipo:{tipo_id}'
+
+
+def incrementar(clave, delta, tipo_id=None):
+    """Suma ``delta`` al contador ``clave`` con un UPDATE atómico"""
+    if not delta:
+        return
+    actualizados = EstadisticaDashboard.objects.filter(clave=clave).update(valor=F('valor') + delta)
+    # Sin fila general la tabla no está inicializada: obtener_estadisticas la
+    # reconstruye entera en lugar de partir de un contador parcial.
+    if not actualizados and delta > 0 and tipo_id is not None:
+        # Un decremento sin fila (p. ej. durante el borrado en cascada de un
+        # tipo) se ignora; la reconstrucción corrige cualquier desviación.
+        EstadisticaDashboard.objects.get_or_create(clave=clave, defaults={'tipo_id': tipo_id, 'valor': 0})
+        EstadisticaDashboard.objects.filter(clave=clave).update(valor=F('valor') + delta)
+
+
+def calcular_estadisticas():
+    """Calcula todos los contadores directamente sobre las tablas"""
+    valores = {
+        TOTAL_DOCUMENTOS: Documento.objects.count(),
+        DOCUMENTOS_ACTIVOS: Documento.objects.filter(estado='aprobado').count(),
+        TOTAL_RECORDATORIOS: RecordatorioRevision.objects.count(),
+        RECORDATORIOS_PENDIENTES: RecordatorioRevision.objects.filter(estado='pendiente').count(),
+    }
+    por_tipo = TipoDocumento.objects.annotate(total_documentos=Count('documento')).values_list('pk', 'total_documentos')
+    return valores, dict(por_tipo)
+
+
+@transaction.atomic
+def reconstruir_estadisticas():
+    """Reemplaza la tabla resumen con los valores actuales"""
+    valores, por_tipo = calcular_estadisticas()
+    filas = [EstadisticaDashboard(clave=clave, valor=valor) for clave, valor in valores.items()]
+    filas += [
+        EstadisticaDashboard(clave=clave_tipo(tipo_id), tipo_id=tipo_id, valor=total)
+        for tipo_id, total in por_tipo.items()
+    ]
+    EstadisticaDashboard.objects.all().delete()
+    EstadisticaDashboard.objects.bulk_create(filas)
+    return valores, por_tipo
+
+
+def obtener_estadisticas():
+    """Lee los contadores del dashboard con una sola consulta"""
+    filas = list(EstadisticaDashboard.objects.select_related('tipo'))
+    if not set(CONTADORES_GENERALES) <= {fila.clave for fila in filas}:
+        reconstruir_estadisticas()
+        filas = list(EstadisticaDashboard.objects.select_related('tipo'))
+
+    estadisticas = {clave: 0 for clave in CONTADORES_GENERALES}
+    documentos_por_tipo = []
+    for fila in filas:
+        if fila.tipo is None:
+            estadisticas[fila.clave] = fila.valor
+        elif fila.valor > 0:
+            fila.tipo.total_documentos = fila.valor
+            documentos_por_tipo.append(fila.tipo)
+
+    documentos_por_tipo.sort(key=lambda tipo: tipo.nombre)
+    estadisticas['documentos_por_tipo'] = documentos_por_tipo
+    return estadisticas
@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+
+TAMANO_LOTE = 2000
+
+# (columna, campo) — las columnas coinciden con las de importar_csv
+COLUMNAS_DOCUMENTOS = [
+    ('codigo_documento', 'codigo_documento'),
+    ('titulo', 'titulo'),
+    ('descripcion', 'descripcion'),
+    ('tipo', 'tipo__nombre'),
+    ('version', 'version'),
+    ('estado', 'estado'),
+    ('creado_por', 'creado_por__username'),
+    ('fecha_creacion', 'fecha_creacion'),
+    ('fecha_modificacion', 'fecha_modificacion'),
+]
+
+COLUMNAS_RECORDATORIOS = [
+    ('codigo_documento', 'documento__codigo_documento'),
+    ('titulo_documento', 'documento__titulo'),
+    ('fecha_revision', 'fecha_revision'),
+    ('fecha_proxima_revision', 'fecha_proxima_revision'),
+    ('revisor', 'revisor__username'),
+    ('estado', 'estado'),
+    ('prioridad', 'prioridad'),
+    ('observaciones', 'observaciones'),
+    ('hallazgos', 'hallazgos'),
+    ('acciones_correctivas', 'acciones_correctivas'),
+    ('fecha_completado', 'fecha_completado'),
+]
+
+
+def _filas(queryset, columnas):
+    campos = [campo for nombre, campo in columnas]
+    # values_list + iterator: sin instancias de modelo ni caché del queryset
+    return queryset.values_list(*campos).iterator(chunk_size=TAMANO_LOTE)
+
+
+def _fecha_csv(valor, zona):
+    if isinstance(valor, datetime):
+        # Mismo formato que acepta importar_csv, en hora local
+        return valor.astimezone(zona).isoformat(' ', 'minutes')[:16]
+    return valor
+
+
+def generar_csv(queryset, columnas):
+    """Produce el CSV en bloques de TAMANO_LOTE filas"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow([nombre for nombre, campo in columnas])
+    # La cabecera sale antes de ejecutar la consulta
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    zona = timezone.get_current_timezone()
+    pendientes = 0
+    for fila in _filas(queryset, columnas):
+        escritor.writerow([_fecha_csv(valor, zona) for valor in fila])
+        pendientes += 1
+        if pendientes >= TAMANO_LOTE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendientes = 0
+    if pendientes:
+        yield buffer.getvalue()
+
+
+def generar_json(queryset, columnas):
+    """Produce un arreglo JSON de objetos en bloques de TAMANO_LOTE filas"""
+    nombres = [nombre for nombre, campo in columnas]
+    codificador = DjangoJSONEncoder(ensure_ascii=False)
+    yield '['
+    bloque = []
+    separador = ''
+    for fila in _filas(queryset, columnas):
+        bloque.append(separador + codificador.encode(dict(zip(nombres, fila))))
+        separador = ','
+        if len(bloque) >= TAMANO_LOTE:
+            yield ''.join(bloque)
+            bloque = []
+    bloque.append(']')
+    yield ''.join(bloque)
+
+
+FORMATOS = {
+    'csv': (generar_csv, 'text/csv; charset=utf-8'),
+    'json': (generar_json, 'application/json'),
+}
+
+
+def respuesta_exportacion(queryset, columnas, formato, nombre):
+    if formato not in FORMATOS:
+        raise Http404('Formato de exportación no soportado')
+    generador, content_type = FORMATOS[formato]
+    respuesta = StreamingHttpResponse(generador(queryset, columnas), content_type=content_type)
+    fecha = timezone.localdate().strftime('%Y%m%d')
+    respuesta['Content-Disposition'] = f'attachment; filename="{nombre}_{fecha}.{formato}"'
+    return respuesta
+
+
+class ExportacionMixin:
+    """Exporta en streaming el queryset filtrado de una ListView"""
+    columnas_exportacion = []
+    nombre_exportacion = 'exportacion'
+
+    def get(self, request, *args, **kwargs):
+        return respuesta_exportacion(
+            self.get_queryset(),
+            self.columnas_exportacion,
+            request.GET.get('formato', 'csv'),
+            self.nombre_exportacion,
+        )
@@ -0,0 +1,55 @@
+from django.utils import timezone
+from .busqueda import buscar_documentos
+
+
+def _entero(valor):
+    return int(valor) if valor and valor.isdigit() else None
+
+
+def filtrar_documentos(queryset, parametros):
+    """Filtros de la lista de documentos (vista HTML, exportación y API)"""
+    # Filtro por búsqueda
+    search = parametros.get('search')
+    if search:
+        queryset = buscar_documentos(queryset, search)
+    
+    # Filtro por tipo
+    tipo = _entero(parametros.get('tipo'))
+    if tipo:
+        queryset = queryset.filter(tipo_id=tipo)
+    
+    # Filtro por estado
+    estado = parametros.get('estado')
+    if estado:
+        queryset = queryset.filter(estado=estado)
+    
+    return queryset
+
+
+def filtrar_recordatorios(queryset, parametros):
+    """Filtros de la lista de recordatorios (vista HTML, exportación, lote y API)"""
+    estado = parametros.get('estado')
+    if estado:
+        queryset = queryset.filter(estado=estado)
+    
+    prioridad = parametros.get('prioridad')
+    if prioridad:
+        queryset = queryset.filter(prioridad=prioridad)
+    
+    documento = _entero(parametros.get('documento'))
+    if documento:
+        queryset = queryset.filter(documento_id=documento)
+    
+    # Urgencia (0 vencido, 1 próximo a vencer, 2 al día, 3 sin fecha) como rango de fechas
+    urgencia = parametros.get('urgencia')
+    if urgencia and urgencia.isdigit() and int(urgencia) in dict(queryset.model.URGENCIA_CHOICES):
+        queryset = queryset.filtrar_urgencia(int(urgencia))
+    
+    # Filtro especial para vencidos
+    if parametros.get('vencidos') == '1':
+        queryset = queryset.filter(
+            fecha_proxima_revision__lt=timezone.now(),
+            estado='pendiente'
+        )
+    
+    return queryset
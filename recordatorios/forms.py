@@ -1,8 +1,11 @@
 from django import forms
+from django.db import transaction
+from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import Documento, RecordatorioRevision, TipoDocumento
+from . import versiones
 
 class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={
@@ -87,6 +90,45 @@ class DocumentoForm(forms.ModelForm):
                 'class': 'form-select'
             }),
         }
+    
+    def __init__(self, *args, usuario=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.usuario = usuario
+        # Estado previo a la edición, para documentos que aún no tienen historial
+        self.estado_anterior = versiones.estado(self.instance) if self.instance.pk else None
+    
+    def save(self, commit=True):
+        if not commit:
+            return super().save(commit)
+        with transaction.atomic():
+            documento = super().save(commit)
+            versiones.registrar(documento, self.usuario, self.estado_anterior)
+        return documento
+
+def documentos_seleccionables():
+    """Documentos que se pueden asignar a un recordatorio (formulario y autocompletado)"""
+    return Documento.objects.filter(estado='aprobado')
+
+class SelectRemoto(forms.Select):
+    """Select que sólo renderiza la opción elegida; las demás las pide custom.js a ``url``"""
+    
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+    
+    def get_context(self, name, value, attrs):
+        contexto = super().get_context(name, value, attrs)
+        contexto['widget']['attrs']['data-autocompletar'] = reverse(self.url)
+        return contexto
+    
+    def optgroups(self, name, value, attrs=None):
+        elegidos = [v for v in value if v not in (None, '')]
+        opciones = [self.create_option(name, '', self.choices.field.empty_label or '', not elegidos, 0)]
+        if elegidos:
+            for indice, objeto in enumerate(self.choices.queryset.filter(pk__in=elegidos), start=1):
+                opcion = self.choices.choice(objeto)
+                opciones.append(self.create_option(name, opcion[0], opcion[1], True, indice))
+        return [(None, opciones, 0)]
 
 class RecordatorioRevisionForm(forms.ModelForm):
     class Meta:
@@ -96,7 +138,7 @@ class RecordatorioRevisionForm(forms.ModelForm):
             'estado', 'prioridad', 'observaciones', 'hallazgos', 'acciones_correctivas'
         ]
         widgets = {
-            'documento': forms.Select(attrs={
+            'documento': SelectRemoto('documento_autocompletar', attrs={
                 'class': 'form-select'
             }),
             'fecha_revision': forms.DateTimeInput(attrs={
@@ -132,8 +174,48 @@ class RecordatorioRevisionForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['documento'].queryset = Documento.objects.filter(estado='aprobado')
+        if 'documento' in self.fields:
+            self.fields['documento'].queryset = documentos_seleccionables()
         
         # Establecer fecha actual como predeterminada
         if not self.instance.pk:
-            self.fields['fecha_revision'].initial = timezone.now()
\ No newline at end of file
+            self.fields['fecha_revision'].initial = timezone.now()
+
+class ImportarCSVForm(forms.Form):
+    archivo = forms.FileField(label='Archivo CSV', help_text='Codificado en UTF-8, con fila de cabecera.')
+    dry_run = forms.BooleanField(label='Sólo validar (no guarda cambios)', required=False)
+
+class OperacionLoteForm(forms.Form):
+    """Parámetros de las operaciones en lote sobre recordatorios"""
+    ACCION_CHOICES = [
+        ('completar', 'Marcar como completados'),
+        ('reasignar', 'Reasignar revisor'),
+        ('prioridad', 'Cambiar prioridad'),
+        ('reprogramar', 'Desplazar próxima revisión'),
+    ]
+    
+    accion = forms.ChoiceField(choices=ACCION_CHOICES, label='Acción', widget=forms.Select(attrs={'class': 'form-select'}))
+    seleccion = forms.ModelMultipleChoiceField(
+        queryset=RecordatorioRevision.objects.all(), required=False, widget=forms.MultipleHiddenInput
+    )
+    todos = forms.BooleanField(required=False, label='Aplicar a todos los resultados del filtro')
+    revisor = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True).order_by('username'), required=False, label='Revisor',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    prioridad = forms.ChoiceField(
+        choices=[('', '---------')] + RecordatorioRevision.PRIORIDAD_CHOICES, required=False, label='Prioridad',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    dias = forms.IntegerField(required=False, label='Días', widget=forms.NumberInput(attrs={'class': 'form-control'}))
+    
+    REQUERIDOS = {'reasignar': 'revisor', 'prioridad': 'prioridad', 'reprogramar': 'dias'}
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        campo = self.REQUERIDOS.get(cleaned_data.get('accion'))
+        if campo and cleaned_data.get(campo) in (None, ''):
+            self.add_error(campo, 'Este campo es obligatorio para la acción elegida.')
+        if not cleaned_data.get('todos') and not cleaned_data.get('seleccion'):
+            raise forms.ValidationError('Seleccione al menos un recordatorio.')
+        return cleaned_data
@@ -0,0 +1,221 @@
+import csv
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from . import cacheo, calendario
+from .busqueda import obtener_backend
+from .estadisticas import reconstruir_estadisticas
+from .forms import DocumentoForm, RecordatorioRevisionForm
+from .models import Documento, RecordatorioRevision, TipoDocumento, CambioProgramacion
+
+TAMANO_LOTE = 500
+
+
+class DocumentoImportForm(DocumentoForm):
+    """Reglas de DocumentoForm sin consultas por fila: tipo y unicidad se resuelven por lote"""
+
+    class Meta(DocumentoForm.Meta):
+        fields = ['titulo', 'codigo_documento', 'descripcion', 'version', 'estado']
+
+    def validate_unique(self):
+        pass
+
+
+class RecordatorioImportForm(RecordatorioRevisionForm):
+    """Reglas de RecordatorioRevisionForm con el documento resuelto por lote"""
+
+    class Meta(RecordatorioRevisionForm.Meta):
+        fields = [
+            'fecha_revision', 'fecha_proxima_revision', 'estado', 'prioridad',
+            'observaciones', 'hallazgos', 'acciones_correctivas'
+        ]
+
+
+class ResultadoImportacion:
+    def __init__(self):
+        self.validos = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.errores = []
+
+    def error(self, fila, mensaje):
+        self.errores.append((fila, mensaje))
+
+    @property
+    def total_errores(self):
+        return len(self.errores)
+
+
+def _errores_formulario(form):
+    return '; '.join(f'{campo}: {" ".join(mensajes)}' for campo, mensajes in form.errors.items())
+
+
+def _lotes(filas, tamano):
+    # La fila 1 es la cabecera del CSV
+    numeradas = enumerate(filas, start=2)
+    while True:
+        lote = list(islice(numeradas, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+class ImportadorCSV:
+    """Lee el CSV en lotes, valida cada fila y escribe con bulk_create/bulk_update"""
+
+    columnas = []
+    valores_por_defecto = {}
+
+    def __init__(self, usuario=None, dry_run=False, tamano_lote=TAMANO_LOTE):
+        self.usuario = usuario
+        self.dry_run = dry_run
+        self.tamano_lote = tamano_lote
+        self.resultado = ResultadoImportacion()
+        # Búsquedas en memoria construidas una sola vez por importación
+        self.tipos = {nombre.lower(): pk for pk, nombre in TipoDocumento.objects.values_list('pk', 'nombre')}
+        self.usuarios = dict(User.objects.values_list('username', 'pk'))
+
+    def importar(self, archivo):
+        lector = csv.DictReader(archivo)
+        for lote in _lotes(lector, self.tamano_lote):
+            self.procesar_lote(lote)
+        if not self.dry_run:
+            self.finalizar()
+        return self.resultado
+
+    def procesar_lote(self, lote):
+        raise NotImplementedError
+
+    def finalizar(self):
+        # bulk_create no dispara señales: recalcular contadores del dashboard
+        reconstruir_estadisticas()
+        cacheo.invalidar(cacheo.DOCUMENTOS, cacheo.RECORDATORIOS)
+        calendario.invalidar()
+
+    def limpiar(self, fila):
+        fila = {clave.strip(): (valor or '').strip() for clave, valor in fila.items() if clave}
+        for campo, valor in self.valores_por_defecto.items():
+            if not fila.get(campo):
+                fila[campo] = valor
+        return fila
+
+    def resolver_usuario(self, username):
+        """Devuelve (id, error); sin username se usa el usuario que importa"""
+        if not username:
+            if self.usuario is None:
+                return None, 'Falta el usuario'
+            return self.usuario.pk, None
+        pk = self.usuarios.get(username)
+        if pk is None:
+            return None, f'Usuario inexistente: {username}'
+        return pk, None
+
+
+class ImportadorDocumentos(ImportadorCSV):
+    """Crea o actualiza documentos por codigo_documento"""
+    columnas = ['codigo_documento', 'titulo', 'descripcion', 'tipo', 'version', 'estado', 'creado_por']
+    valores_por_defecto = {'version': '1.0', 'estado': 'borrador'}
+
+    def procesar_lote(self, lote):
+        validos = {}
+        for numero, fila in lote:
+            fila = self.limpiar(fila)
+            form = DocumentoImportForm(data=fila)
+            if not form.is_valid():
+                self.resultado.error(numero, _errores_formulario(form))
+                continue
+            tipo_id = self.tipos.get(fila.get('tipo', '').lower())
+            if tipo_id is None:
+                self.resultado.error(numero, f'Tipo de documento inexistente: {fila.get("tipo", "")}')
+                continue
+            creado_por_id, error = self.resolver_usuario(fila.get('creado_por'))
+            if error:
+                self.resultado.error(numero, error)
+                continue
+            documento = form.save(commit=False)
+            documento.tipo_id = tipo_id
+            documento.creado_por_id = creado_por_id
+            # Un código repetido en el archivo se trata como actualización: gana la última fila
+            validos[documento.codigo_documento] = documento
+
+        self.resultado.validos += len(validos)
+        if self.dry_run or not validos:
+            return
+
+        existentes = dict(
+            Documento.objects.filter(codigo_documento__in=validos).values_list('codigo_documento', 'pk')
+        )
+        nuevos = [doc for codigo, doc in validos.items() if codigo not in existentes]
+        actualizar = []
+        ahora = timezone.now()
+        for codigo, pk in existentes.items():
+            documento = validos[codigo]
+            documento.pk = pk
+            documento.fecha_modificacion = ahora
+            actualizar.append(documento)
+
+        with transaction.atomic():
+            Documento.objects.bulk_create(nuevos)
+            Documento.objects.bulk_update(
+                actualizar, ['titulo', 'descripcion', 'tipo', 'version', 'estado', 'fecha_modificacion']
+            )
+            obtener_backend().indexar(nuevos + actualizar)
+        self.resultado.creados += len(nuevos)
+        self.resultado.actualizados += len(actualizar)
+
+
+class ImportadorRecordatorios(ImportadorCSV):
+    """Crea recordatorios sobre documentos aprobados"""
+    columnas = [
+        'codigo_documento', 'fecha_revision', 'fecha_proxima_revision', 'revisor', 'estado',
+        'prioridad', 'observaciones', 'hallazgos', 'acciones_correctivas'
+    ]
+    valores_por_defecto = {'estado': 'pendiente', 'prioridad': 'media'}
+
+    def procesar_lote(self, lote):
+        filas = [(numero, self.limpiar(fila)) for numero, fila in lote]
+        # Misma regla que el formulario: sólo documentos aprobados
+        codigos = {fila.get('codigo_documento') for numero, fila in filas}
+        documentos = dict(
+            Documento.objects.filter(codigo_documento__in=codigos, estado='aprobado')
+            .values_list('codigo_documento', 'pk')
+        )
+
+        nuevos = []
+        for numero, fila in filas:
+            form = RecordatorioImportForm(data=fila)
+            if not form.is_valid():
+                self.resultado.error(numero, _errores_formulario(form))
+                continue
+            documento_id = documentos.get(fila.get('codigo_documento'))
+            if documento_id is None:
+                self.resultado.error(numero, f'Documento inexistente o no aprobado: {fila.get("codigo_documento", "")}')
+                continue
+            revisor_id, error = self.resolver_usuario(fila.get('revisor'))
+            if error:
+                self.resultado.error(numero, error)
+                continue
+            recordatorio = form.save(commit=False)
+            recordatorio.documento_id = documento_id
+            recordatorio.revisor_id = revisor_id
+            nuevos.append(recordatorio)
+
+        self.resultado.validos += len(nuevos)
+        if self.dry_run or not nuevos:
+            return
+
+        with transaction.atomic():
+            RecordatorioRevision.objects.bulk_create(nuevos)
+            CambioProgramacion.objects.bulk_create([
+                CambioProgramacion(recordatorio_id=r.pk, fecha_proxima_revision=r.fecha_proxima_revision)
+                for r in nuevos if r.estado == 'pendiente' and r.pk and r.fecha_proxima_revision
+            ])
+        self.resultado.creados += len(nuevos)
+
+
+IMPORTADORES = {
+    'documentos': ImportadorDocumentos,
+    'recordatorios': ImportadorRecordatorios,
+}
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from recordatorios.analitica import actualizar
+
+
+class Command(BaseCommand):
+    help = ('Actualiza los agregados diarios de la analítica con los recordatorios modificados '
+            'desde la ejecución anterior (pensado para cron, p. ej. cada 15 minutos)')
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true',
+                            help='Recalcula todos los días; corrige también los recordatorios borrados')
+    
+    def handle(self, *args, **options):
+        dias = actualizar(completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(f'Días recalculados: {dias}'))
@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from recordatorios.busqueda import obtener_backend
+
+ORIGEN = 'origen_sqlite'
+
+
+@contextmanager
+def sin_fechas_automaticas(modelo):
+    """Conserva las fechas originales: bulk_create aplicaría auto_now y auto_now_add"""
+    campos = [c for c in modelo._meta.concrete_fields if getattr(c, 'auto_now', False) or getattr(c, 'auto_now_add', False)]
+    previos = [(c, c.auto_now, c.auto_now_add) for c in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in previos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+def modelos_a_copiar():
+    """Modelos concretos y tablas intermedias M2M
+
+    El orden no importa: Django crea las claves foráneas diferibles y se
+    comprueban al confirmar la transacción de la copia.
+    """
+    return [m for m in apps.get_models(include_auto_created=True) if m._meta.managed and not m._meta.proxy]
+
+
+class Command(BaseCommand):
+    help = ('Copia por lotes una base SQLite existente en la base configurada (p. ej. PostgreSQL '
+            'con DATABASE_URL). La base destino debe estar migrada; su contenido se reemplaza.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('origen', nargs='?', default=str(settings.BASE_DIR / 'db.sqlite3'),
+                            help='Archivo SQLite de origen')
+        parser.add_argument('--destino', default=DEFAULT_DB_ALIAS, help='Alias de la base destino')
+        parser.add_argument('--lote', type=int, default=2000, help='Filas por INSERT')
+        parser.add_argument('--noinput', action='store_false', dest='interactive')
+
+    def handle(self, *args, **options):
+        origen = Path(options['origen'])
+        if not origen.exists():
+            raise CommandError(f'No existe {origen}')
+        destino = connections[options['destino']]
+        if destino.vendor == 'sqlite' and Path(destino.settings_dict['NAME']).resolve() == origen.resolve():
+            raise CommandError('El origen y el destino son la misma base')
+        if options['interactive']:
+            respuesta = input(f'Se borrarán los datos de "{options["destino"]}" ({destino.vendor}). ¿Continuar? [s/N] ')
+            if respuesta.lower() not in ('s', 'si', 'sí'):
+                raise CommandError('Copia cancelada')
+
+        connections.settings[ORIGEN] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ''},
+            # Sólo lectura: tampoco se cambia el journal_mode del archivo original
+            ORIGEN: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': f'file:{origen.resolve()}?mode=ro',
+                     'OPTIONS': {'uri': True}},
+        })[ORIGEN]
+        tablas_origen = set(connections[ORIGEN].introspection.table_names())
+        modelos = modelos_a_copiar()
+        lote = options['lote']
+
+        try:
+            with transaction.atomic(using=destino.alias):
+                tablas = [m._meta.db_table for m in modelos]
+                with destino.cursor() as cursor:
+                    for sql in destino.ops.sql_flush(no_style(), tablas, allow_cascade=True):
+                        cursor.execute(sql)
+
+                for modelo in modelos:
+                    if modelo._meta.db_table not in tablas_origen:
+                        self.stdout.write(f'  {modelo._meta.label}: sin tabla en el origen, se omite')
+                        continue
+                    total = 0
+                    filas = modelo._base_manager.using(ORIGEN).order_by('pk').iterator(chunk_size=lote)
+                    with sin_fechas_automaticas(modelo):
+                        pendientes = []
+                        for objeto in filas:
+                            pendientes.append(objeto)
+                            if len(pendientes) >= lote:
+                                total += len(modelo._base_manager.using(destino.alias).bulk_create(pendientes))
+                                pendientes = []
+                        total += len(modelo._base_manager.using(destino.alias).bulk_create(pendientes))
+                    self.stdout.write(f'  {modelo._meta.label}: {total}')
+
+                # Las secuencias de PostgreSQL siguen en 1 tras insertar con pk explícito
+                with destino.cursor() as cursor:
+                    for sql in destino.ops.sequence_reset_sql(no_style(), modelos):
+                        cursor.execute(sql)
+        finally:
+            connections[ORIGEN].close()
+
+        if destino.alias == DEFAULT_DB_ALIAS:
+            total = obtener_backend().reconstruir()
+            self.stdout.write(f'Índice de búsqueda reconstruido: {total} documentos.')
+        self.stdout.write(self.style.SUCCESS('Copia terminada.'))
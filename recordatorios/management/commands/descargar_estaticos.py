@@ -0,0 +1,55 @@
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+CDN = 'https://cdn.jsdelivr.net/npm/'
+# Versiones fijas: cambiar una versión es descargar de nuevo y confirmar los archivos
+BOOTSTRAP = 'bootstrap@5.3.8/dist/'
+ICONOS = 'bootstrap-icons@1.11.3/font/'
+
+# Ruta bajo static/vendor/ -> ruta en el CDN. Los .map se incluyen porque collectstatic
+# reescribe las referencias sourceMappingURL y falla si el archivo no existe.
+ARCHIVOS = {
+    'bootstrap/css/bootstrap.min.css': BOOTSTRAP + 'css/bootstrap.min.css',
+    'bootstrap/css/bootstrap.min.css.map': BOOTSTRAP + 'css/bootstrap.min.css.map',
+    'bootstrap/js/bootstrap.bundle.min.js': BOOTSTRAP + 'js/bootstrap.bundle.min.js',
+    'bootstrap/js/bootstrap.bundle.min.js.map': BOOTSTRAP + 'js/bootstrap.bundle.min.js.map',
+    'bootstrap-icons/bootstrap-icons.min.css': ICONOS + 'bootstrap-icons.min.css',
+    'bootstrap-icons/fonts/bootstrap-icons.woff': ICONOS + 'fonts/bootstrap-icons.woff',
+    'bootstrap-icons/fonts/bootstrap-icons.woff2': ICONOS + 'fonts/bootstrap-icons.woff2',
+}
+
+
+class Command(BaseCommand):
+    help = ('Descarga Bootstrap y Bootstrap Icons a static/vendor/ para servirlos desde el propio '
+            'servidor (la red del laboratorio no llega al CDN). Ejecútelo en un equipo con acceso '
+            'a Internet y confirme los archivos en el repositorio')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comprobar', action='store_true',
+                            help='No descarga; falla si falta algún archivo (p. ej. antes de collectstatic)')
+        parser.add_argument('--forzar', action='store_true', help='Descarga también los que ya existen')
+
+    def handle(self, *args, **options):
+        destino = Path(settings.BASE_DIR) / 'static' / 'vendor'
+        faltan = [ruta for ruta in ARCHIVOS if not (destino / ruta).exists()]
+        if options['comprobar']:
+            if faltan:
+                raise CommandError(f'Faltan en {destino}: {", ".join(faltan)}. '
+                                   'Ejecute manage.py descargar_estaticos')
+            self.stdout.write(self.style.SUCCESS(f'{len(ARCHIVOS)} archivos presentes'))
+            return
+
+        for ruta in ARCHIVOS if options['forzar'] else faltan:
+            archivo = destino / ruta
+            archivo.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                with urlopen(CDN + ARCHIVOS[ruta], timeout=30) as respuesta:
+                    contenido = respuesta.read()
+            except OSError as error:
+                raise CommandError(f'No se pudo descargar {ARCHIVOS[ruta]}: {error}')
+            archivo.write_bytes(contenido)
+            self.stdout.write(f'{ruta}: {len(contenido) // 1024} KB')
+        self.stdout.write(self.style.SUCCESS(f'Archivos en {destino}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from recordatorios.notificaciones import enviar_resumenes, TAMANO_LOTE
+
+
+class Command(BaseCommand):
+    help = 'Envía a cada revisor un resumen con sus recordatorios vencidos y próximos a vencer'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                            help='Correos enviados por cada llamada a send_messages')
+    
+    def handle(self, *args, **options):
+        enviados = enviar_resumenes(tamano_lote=options['lote'])
+        self.stdout.write(self.style.SUCCESS(f'Resúmenes enviados: {enviados}'))
@@ -0,0 +1,121 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from recordatorios import cacheo, calendario, versiones
+from recordatorios.busqueda import obtener_backend
+from recordatorios.estadisticas import reconstruir_estadisticas
+from recordatorios.models import Documento, RecordatorioRevision, TipoDocumento, VersionDocumento
+from recordatorios.recurrencias import encolar_cambios
+
+PALABRAS = [
+    'ensayo', 'tracción', 'dureza', 'fatiga', 'impacto', 'calibración', 'máquina', 'universal', 'probeta',
+    'extensómetro', 'procedimiento', 'verificación', 'incertidumbre', 'Charpy', 'Rockwell', 'Vickers',
+    'Brinell', 'soldadura', 'acero', 'aluminio', 'compresión', 'flexión', 'muestreo', 'registro',
+]
+ESTADOS_DOCUMENTO = (['aprobado', 'revision', 'borrador', 'obsoleto'], [70, 10, 12, 8])
+ESTADOS_RECORDATORIO = (['pendiente', 'completado', 'en_proceso', 'cancelado'], [55, 35, 7, 3])
+PRIORIDADES = (['baja', 'media', 'alta', 'critica'], [30, 45, 20, 5])
+INTERVALOS = ([30, 90, 180, 365], [15, 40, 30, 15])
+
+
+class Command(BaseCommand):
+    help = ('Genera datos sintéticos con bulk_create para pruebas de carga: usuarios, tipos, '
+            'documentos y recordatorios con vencimientos sesgados hacia las próximas semanas')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=50)
+        parser.add_argument('--tipos', type=int, default=12)
+        parser.add_argument('--documentos', type=int, default=10000)
+        parser.add_argument('--recordatorios', type=int, default=100000)
+        parser.add_argument('--lote', type=int, default=5000, help='Filas por bulk_create')
+        parser.add_argument('--semilla', type=int, default=None, help='Semilla para repetir los mismos datos')
+        parser.add_argument('--prefijo', default='SIN', help='Prefijo de códigos y usuarios generados')
+
+    def lotes(self, total, lote):
+        for desde in range(0, total, lote):
+            yield range(desde, min(desde + lote, total))
+
+    def handle(self, *args, **options):
+        azar = random.Random(options['semilla'])
+        prefijo = options['prefijo']
+        lote = options['lote']
+        if Documento.objects.filter(codigo_documento__startswith=f'{prefijo}-').exists():
+            raise CommandError(f'Ya hay documentos con el prefijo {prefijo}; use otro --prefijo')
+
+        # Una sola derivación de la contraseña: PBKDF2 por usuario tardaría minutos
+        clave = make_password('benchmark')
+        usuarios = User.objects.bulk_create([
+            User(username=f'{prefijo.lower()}{i}', password=clave, first_name='Usuario', last_name=str(i))
+            for i in range(options['usuarios'])
+        ])
+        usuarios = [u.pk for u in usuarios]
+        tipos = TipoDocumento.objects.bulk_create([
+            TipoDocumento(nombre=f'{prefijo} Tipo {i}') for i in range(options['tipos'])
+        ])
+        tipos = [t.pk for t in tipos]
+        # Pocos tipos concentran la mayoría de documentos
+        pesos_tipo = [1 / (i + 1) for i in range(len(tipos))]
+        self.stdout.write(f'{len(usuarios)} usuarios y {len(tipos)} tipos')
+
+        documentos = []
+        for rango in self.lotes(options['documentos'], lote):
+            creados = Documento.objects.bulk_create([
+                Documento(
+                    titulo=' '.join(azar.choices(PALABRAS, k=azar.randint(3, 7))).capitalize(),
+                    codigo_documento=f'{prefijo}-{i:07d}',
+                    descripcion=' '.join(azar.choices(PALABRAS, k=azar.randint(0, 30))),
+                    tipo_id=azar.choices(tipos, pesos_tipo)[0],
+                    version=f'{azar.randint(1, 5)}.{azar.randint(0, 9)}',
+                    estado=azar.choices(*ESTADOS_DOCUMENTO)[0],
+                    creado_por_id=azar.choice(usuarios),
+                )
+                for i in rango
+            ])
+            # Versión 1 del historial, como la que registra DocumentoForm al crear
+            VersionDocumento.objects.bulk_create([
+                VersionDocumento(
+                    documento_id=d.pk, numero=1, version=d.version, completa=True,
+                    datos=versiones.comprimir(versiones.estado(d)), usuario_id=d.creado_por_id,
+                )
+                for d in creados
+            ])
+            documentos.extend(d.pk for d in creados)
+            self.stdout.write(f'  documentos: {len(documentos)}')
+
+        ahora = timezone.now()
+        total = 0
+        for rango in self.lotes(options['recordatorios'], lote):
+            nuevos = []
+            for _ in rango:
+                # Moda a ~2 semanas, cola larga hacia el año y ~15 % ya vencidos
+                proxima = ahora + timedelta(days=azar.triangular(-120, 365, 14), minutes=azar.randint(0, 1439))
+                estado = azar.choices(*ESTADOS_RECORDATORIO)[0]
+                nuevos.append(RecordatorioRevision(
+                    documento_id=azar.choice(documentos),
+                    revisor_id=azar.choice(usuarios),
+                    fecha_revision=proxima - timedelta(days=azar.choices(*INTERVALOS)[0]),
+                    fecha_proxima_revision=proxima,
+                    estado=estado,
+                    prioridad=azar.choices(*PRIORIDADES)[0],
+                    fecha_completado=min(proxima, ahora) if estado == 'completado' else None,
+                ))
+            with transaction.atomic():
+                creados = RecordatorioRevision.objects.bulk_create(nuevos)
+                ids = [r.pk for r in creados if r.pk]
+                if ids:
+                    encolar_cambios(min(ids), max(ids))
+            total += len(creados)
+            self.stdout.write(f'  recordatorios: {total}')
+
+        reconstruir_estadisticas()
+        obtener_backend().reconstruir()
+        cacheo.invalidar(*cacheo.AREAS)
+        calendario.invalidar()
+        self.stdout.write(self.style.SUCCESS(
+            f'Generados {len(documentos)} documentos y {total} recordatorios (contraseña de los usuarios: benchmark)'
+        ))
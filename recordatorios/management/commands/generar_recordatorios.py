@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from recordatorios.recurrencias import generar_recordatorios, HORIZONTE_DIAS, TAMANO_LOTE
+
+
+class Command(BaseCommand):
+    help = 'Genera los recordatorios de las recurrencias activas dentro del horizonte (ejecutar a diario)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--horizonte', type=int, default=HORIZONTE_DIAS,
+                            help='Días hacia adelante a materializar')
+        parser.add_argument('--maximo', type=int, default=None,
+                            help='Máximo de revisiones futuras por documento')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE,
+                            help='Recordatorios por cada bulk_create')
+    
+    def handle(self, *args, **options):
+        total = generar_recordatorios(
+            horizonte=timedelta(days=options['horizonte']),
+            maximo=options['maximo'],
+            tamano_lote=options['lote'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Recordatorios generados: {total}'))
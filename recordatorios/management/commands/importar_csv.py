@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from recordatorios.importacion import IMPORTADORES, TAMANO_LOTE
+
+
+class Command(BaseCommand):
+    help = 'Importa documentos o recordatorios desde un archivo CSV por lotes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('modelo', choices=sorted(IMPORTADORES), help='Qué se importa')
+        parser.add_argument('archivo', help='Ruta del archivo CSV (UTF-8, con cabecera)')
+        parser.add_argument('--usuario', help='Usuario asignado cuando la fila no indica creado_por/revisor')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por transacción')
+        parser.add_argument('--dry-run', action='store_true', help='Sólo valida y reporta errores')
+    
+    def handle(self, *args, **options):
+        usuario = None
+        if options['usuario']:
+            try:
+                usuario = User.objects.get(username=options['usuario'])
+            except User.DoesNotExist:
+                raise CommandError(f'Usuario inexistente: {options["usuario"]}')
+        
+        importador = IMPORTADORES[options['modelo']](
+            usuario=usuario, dry_run=options['dry_run'], tamano_lote=options['lote']
+        )
+        try:
+            with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+                resultado = importador.importar(archivo)
+        except OSError as e:
+            raise CommandError(f'No se pudo leer el archivo: {e}')
+        
+        for fila, mensaje in resultado.errores:
+            self.stderr.write(f'Fila {fila}: {mensaje}')
+        
+        if options['dry_run']:
+            self.stdout.write(f'Validación: {resultado.validos} filas válidas, {resultado.total_errores} con errores.')
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Importación terminada: {resultado.creados} creados, {resultado.actualizados} actualizados, '
+                f'{resultado.total_errores} filas con errores.'
+            ))
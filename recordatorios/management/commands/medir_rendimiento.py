@@ -0,0 +1,63 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from recordatorios import rendimiento
+from recordatorios.models import Documento, RecordatorioRevision, TipoDocumento
+
+
+class Command(BaseCommand):
+    help = ('Mide con el cliente de test cada ruta de recordatorios/urls.py y las listas del admin '
+            'sobre la base configurada (p. ej. tras generar_datos) y guarda consultas y percentiles en JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones por ruta con la caché caliente')
+        parser.add_argument('--usuario', help='Superusuario con el que se navega (por defecto el primero)')
+        parser.add_argument('--salida', default='rendimiento.json', help='Archivo JSON de resultados')
+        parser.add_argument('--comparar', help='JSON de una ejecución anterior (p. ej. de otro commit)')
+        parser.add_argument('--umbral', type=float, default=1.2, help='Empeoramiento del p50 que se reporta')
+        parser.add_argument('--ruta', action='append', dest='rutas', help='Medir sólo estas rutas (por nombre)')
+
+    def handle(self, *args, **options):
+        usuarios = User.objects.filter(is_superuser=True, is_active=True).order_by('pk')
+        if options['usuario']:
+            usuarios = usuarios.filter(username=options['usuario'])
+        usuario = usuarios.first()
+        recordatorio = RecordatorioRevision.objects.filter(estado='pendiente').order_by('pk').first()
+        if usuario is None or recordatorio is None:
+            raise CommandError('Hace falta un superusuario y al menos un recordatorio pendiente (ver generar_datos)')
+        documento = Documento.objects.get(pk=recordatorio.documento_id)
+        tipo = TipoDocumento.objects.get(pk=documento.tipo_id)
+
+        cliente = Client()
+        cliente.force_login(usuario)
+        rutas = rendimiento.peticiones(tipo, documento, recordatorio) + rendimiento.changelists()
+        if options['rutas']:
+            rutas = [ruta for ruta in rutas if ruta[0] in options['rutas']]
+
+        resultados = {}
+        self.stdout.write(f'{"ruta":<45} {"estado":>6} {"consultas":>9} {"fría":>8} {"p50":>8} {"p99":>8}')
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for nombre, metodo, url, datos in rutas:
+                medida = rendimiento.medir(cliente, metodo, url, datos, options['repeticiones'],
+                                           escritura=nombre in rendimiento.ESCRITURAS)
+                resultados[nombre] = {'url': url, **medida}
+                linea = (
+                    f'{nombre:<45} {medida["estado"]:>6} {medida["consultas"]:>9} {medida["fria_ms"]:>8.1f} '
+                    f'{medida["p50_ms"]:>8.1f} {medida["p99_ms"]:>8.1f}'
+                )
+                # Un 4xx/5xx mide la página de error, no la ruta
+                self.stdout.write(linea if medida['estado'] < 400 else self.style.WARNING(linea))
+
+        informe = rendimiento.informe(resultados, options['repeticiones'])
+        with open(options['salida'], 'w', encoding='utf-8') as archivo:
+            json.dump(informe, archivo, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f'Resultados en {options["salida"]}'))
+
+        if options['comparar']:
+            regresiones = rendimiento.comparar(rendimiento.cargar(options['comparar']), informe, options['umbral'])
+            for regresion in regresiones:
+                self.stdout.write(self.style.WARNING(regresion))
+            if not regresiones:
+                self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la ejecución anterior'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from recordatorios.programador import Programador
+
+
+class Command(BaseCommand):
+    help = 'Proceso continuo que emite avisos de recordatorios próximos a vencer y vencidos'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000,
+                            help='Recordatorios cargados en memoria por cada tipo de aviso')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos máximos entre consultas de cambios')
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Emite los avisos pendientes y termina (útil con cron)')
+    
+    def handle(self, *args, **options):
+        programador = Programador(lote=options['lote'], intervalo=options['intervalo'])
+        if options['una_vez']:
+            total = programador.ejecutar_pendientes()
+            self.stdout.write(self.style.SUCCESS(f'Avisos emitidos: {total}'))
+            return
+        
+        self.stdout.write('Programador de recordatorios en ejecución (Ctrl+C para detener)...')
+        try:
+            programador.ejecutar()
+        except KeyboardInterrupt:
+            self.stdout.write('Programador detenido.')
@@ -0,0 +1,108 @@
+import http.cookiejar
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+RUTAS = ['/', '/documentos/', '/recordatorios/']
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+class Command(BaseCommand):
+    help = ('Prueba de carga contra un servidor en marcha (WSGI o ASGI): latencia p50/p99 y '
+            'peticiones por segundo, opcionalmente con conexiones SSE abiertas')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='URL base, p. ej. http://localhost:8000')
+        parser.add_argument('--usuario', required=True)
+        parser.add_argument('--clave', required=True)
+        parser.add_argument('--ruta', action='append', dest='rutas',
+                            help=f'Ruta a pedir (repetible; por defecto {", ".join(RUTAS)})')
+        parser.add_argument('--concurrencia', type=int, default=20, help='Clientes simultáneos')
+        parser.add_argument('--duracion', type=float, default=30, help='Segundos de prueba')
+        parser.add_argument('--eventos', type=int, default=0,
+                            help='Conexiones SSE a /eventos/ abiertas durante la prueba')
+
+    def iniciar_sesion(self, base, usuario, clave):
+        cookies = http.cookiejar.CookieJar()
+        cliente = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+        html = cliente.open(f'{base}/login/').read().decode()
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html)
+        if not token:
+            raise CommandError('No se encontró el formulario de acceso')
+        datos = urllib.parse.urlencode({
+            'username': usuario, 'password': clave, 'csrfmiddlewaretoken': token.group(1),
+        }).encode()
+        respuesta = cliente.open(urllib.request.Request(f'{base}/login/', datos, headers={'Referer': f'{base}/login/'}))
+        if respuesta.geturl().rstrip('/').endswith('/login'):
+            raise CommandError('Usuario o contraseña incorrectos')
+        return [f'{c.name}={c.value}' for c in cookies]
+
+    def handle(self, *args, **options):
+        base = options['url'].rstrip('/')
+        rutas = options['rutas'] or RUTAS
+        cabeceras = {'Cookie': '; '.join(self.iniciar_sesion(base, options['usuario'], options['clave']))}
+        fin = time.monotonic() + options['duracion']
+        latencias = {ruta: [] for ruta in rutas}
+        errores = []
+        abiertas = []
+
+        def escuchar():
+            try:
+                with urllib.request.urlopen(urllib.request.Request(f'{base}/eventos/', headers=cabeceras),
+                                            timeout=options['duracion'] + 30) as respuesta:
+                    abiertas.append(respuesta.status)
+                    while time.monotonic() < fin and respuesta.readline():
+                        pass
+            except (urllib.error.URLError, OSError) as e:
+                errores.append(f'SSE: {e}')
+
+        def cliente(indice):
+            peticion = indice
+            while time.monotonic() < fin:
+                ruta = rutas[peticion % len(rutas)]
+                peticion += 1
+                inicio = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(urllib.request.Request(base + ruta, headers=cabeceras), timeout=60) as r:
+                        r.read()
+                except (urllib.error.URLError, OSError) as e:
+                    errores.append(f'{ruta}: {e}')
+                    continue
+                latencias[ruta].append(time.perf_counter() - inicio)
+
+        oyentes = [threading.Thread(target=escuchar, daemon=True) for _ in range(options['eventos'])]
+        for hilo in oyentes:
+            hilo.start()
+        inicio = time.monotonic()
+        hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(options['concurrencia'])]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.monotonic() - inicio
+
+        todas = [valor for valores in latencias.values() for valor in valores]
+        self.stdout.write(f'{"ruta":<30} {"peticiones":>10} {"p50 ms":>8} {"p99 ms":>8}')
+        for ruta, valores in list(latencias.items()) + [('total', todas)]:
+            self.stdout.write(
+                f'{ruta:<30} {len(valores):>10} {percentil(valores, 50) * 1000:>8.1f} {percentil(valores, 99) * 1000:>8.1f}'
+            )
+        self.stdout.write(f'Peticiones/s: {len(todas) / transcurrido:.1f}')
+        if options['eventos']:
+            self.stdout.write(f'Conexiones SSE abiertas: {abiertas.count(200)} de {options["eventos"]}')
+        if errores:
+            self.stdout.write(self.style.WARNING(f'{len(errores)} errores; el primero: {errores[0]}'))
+        if todas:
+            self.stdout.write(f'Media: {statistics.mean(todas) * 1000:.1f} ms')
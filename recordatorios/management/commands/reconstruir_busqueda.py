@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from recordatorios.busqueda import obtener_backend
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo de documentos'
+    
+    def handle(self, *args, **options):
+        backend = obtener_backend()
+        total = backend.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice reconstruido con {backend.__class__.__name__}: {total} documentos.'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from recordatorios.estadisticas import reconstruir_estadisticas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula la tabla resumen de estadísticas del dashboard'
+    
+    def handle(self, *args, **options):
+        valores, por_tipo = reconstruir_estadisticas()
+        for clave, valor in valores.items():
+            self.stdout.write(f'{clave}: {valor}')
+        self.stdout.write(f'Tipos de documento: {len(por_tipo)}')
+        self.stdout.write(self.style.SUCCESS('Estadísticas reconstruidas correctamente.'))
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def llenar_estadisticas(apps, schema_editor):
+    # Copia congelada de estadisticas.reconstruir_estadisticas sobre los modelos históricos
+    alias = schema_editor.connection.alias
+    Documento = apps.get_model('recordatorios', 'Documento')
+    RecordatorioRevision = apps.get_model('recordatorios', 'RecordatorioRevision')
+    TipoDocumento = apps.get_model('recordatorios', 'TipoDocumento')
+    EstadisticaDashboard = apps.get_model('recordatorios', 'EstadisticaDashboard')
+
+    documentos = Documento.objects.using(alias)
+    recordatorios = RecordatorioRevision.objects.using(alias)
+    valores = {
+        'total_documentos': documentos.count(),
+        'documentos_activos': documentos.filter(estado='aprobado').count(),
+        'total_recordatorios': recordatorios.count(),
+        'recordatorios_pendientes': recordatorios.filter(estado='pendiente').count(),
+    }
+    por_tipo = TipoDocumento.objects.using(alias).annotate(
+        total_documentos=models.Count('documento')
+    ).values_list('pk', 'total_documentos')
+    filas = [EstadisticaDashboard(clave=clave, valor=valor) for clave, valor in valores.items()]
+    filas += [
+        EstadisticaDashboard(clave=f'tipo:{tipo_id}', tipo_id=tipo_id, valor=total)
+        for tipo_id, total in por_tipo
+    ]
+    EstadisticaDashboard.objects.using(alias).bulk_create(filas)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticaDashboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=50, unique=True, verbose_name='Clave')),
+                ('valor', models.IntegerField(default=0, verbose_name='Valor')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('tipo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='recordatorios.tipodocumento', verbose_name='Tipo de Documento')),
+            ],
+            options={
+                'verbose_name': 'Estadística del Dashboard',
+                'verbose_name_plural': 'Estadísticas del Dashboard',
+                'ordering': ['clave'],
+            },
+        ),
+        migrations.RunPython(llenar_estadisticas, migrations.RunPython.noop),
+    ]
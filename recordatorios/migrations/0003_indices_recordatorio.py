@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0002_estadisticadashboard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(fields=['estado', 'fecha_proxima_revision'], name='recordatorio_estado_prox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(condition=models.Q(('estado', 'pendiente')), fields=['fecha_proxima_revision'], name='recordatorio_pendiente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(fields=['estado', 'prioridad', '-fecha_revision'], name='recordatorio_est_prio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(fields=['-fecha_revision'], name='recordatorio_fecha_rev_idx'),
+        ),
+    ]
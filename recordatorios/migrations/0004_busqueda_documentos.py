@@ -0,0 +1,96 @@
+import re
+import unicodedata
+
+from django.db import migrations
+
+TABLA_FTS = 'recordatorios_documento_fts'
+TABLA_TSVECTOR = 'recordatorios_documento_busqueda'
+LOTE = 2000
+
+
+# Copia congelada de la normalización de recordatorios/busqueda.py: la migración
+# no debe cambiar si más adelante cambia el código de la aplicación
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', (texto or '').lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.findall(r'\w+', texto)
+
+
+def _raiz(palabra):
+    if len(palabra) > 4 and palabra.endswith('es') and palabra[-3] not in 'aeiou':
+        palabra = palabra[:-2]
+    elif len(palabra) > 3 and palabra.endswith('s'):
+        palabra = palabra[:-1]
+    if len(palabra) > 3 and palabra[-1] in 'aoe':
+        palabra = palabra[:-1]
+    return palabra
+
+
+def _indexable(texto, stemming=True):
+    palabras = _normalizar(texto)
+    return ' '.join(_raiz(p) for p in palabras) if stemming else ' '.join(palabras)
+
+
+def _llenar_fts(apps, schema_editor):
+    Documento = apps.get_model('recordatorios', 'Documento')
+    conexion = schema_editor.connection
+    documentos = Documento.objects.using(conexion.alias).order_by().values_list(
+        'pk', 'titulo', 'codigo_documento', 'descripcion'
+    ).iterator(chunk_size=LOTE)
+    sql = f'INSERT INTO {TABLA_FTS} (rowid, titulo, codigo_documento, descripcion) VALUES (%s, %s, %s, %s)'
+    with conexion.cursor() as cursor:
+        lote = []
+        for pk, titulo, codigo, descripcion in documentos:
+            lote.append((pk, _indexable(titulo), _indexable(codigo, stemming=False), _indexable(descripcion)))
+            if len(lote) >= LOTE:
+                cursor.executemany(sql, lote)
+                lote = []
+        cursor.executemany(sql, lote)
+
+
+def crear_indice_busqueda(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5("
+            "titulo, codigo_documento, descripcion, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        _llenar_fts(apps, schema_editor)
+    elif vendor == 'postgresql':
+        tabla = apps.get_model('recordatorios', 'Documento')._meta.db_table
+        schema_editor.execute(
+            f"CREATE TABLE {TABLA_TSVECTOR} ("
+            f"documento_id bigint PRIMARY KEY REFERENCES {tabla} (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "vector tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX recordatorios_documento_busqueda_gin ON {TABLA_TSVECTOR} USING gin (vector)"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {TABLA_TSVECTOR} (documento_id, vector) SELECT id, "
+            "setweight(to_tsvector('simple', codigo_documento), 'A') || "
+            "setweight(to_tsvector('spanish', titulo), 'A') || "
+            "setweight(to_tsvector('spanish', descripcion), 'B') "
+            f"FROM {tabla}"
+        )
+
+
+def eliminar_indice_busqueda(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLA_FTS}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLA_TSVECTOR}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0003_indices_recordatorio'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice_busqueda, eliminar_indice_busqueda),
+    ]
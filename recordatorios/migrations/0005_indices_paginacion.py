@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0004_busqueda_documentos'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recordatoriorevision',
+            name='recordatorio_fecha_rev_idx',
+        ),
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['-fecha_modificacion', 'id'], name='documento_modificacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(fields=['-fecha_revision', 'id'], name='recordatorio_fecha_rev_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0005_indices_paginacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioProgramacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recordatorio_id', models.BigIntegerField(verbose_name='Recordatorio')),
+                ('fecha_proxima_revision', models.DateTimeField(verbose_name='Próxima Revisión')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+            ],
+            options={
+                'verbose_name': 'Cambio de Programación',
+                'verbose_name_plural': 'Cambios de Programación',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EventoRecordatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('proximo', 'Próximo a vencer'), ('vencido', 'Vencido')], max_length=20, verbose_name='Tipo')),
+                ('fecha_proxima_revision', models.DateTimeField(verbose_name='Próxima Revisión')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('recordatorio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eventos', to='recordatorios.recordatoriorevision', verbose_name='Recordatorio')),
+            ],
+            options={
+                'verbose_name': 'Evento de Recordatorio',
+                'verbose_name_plural': 'Eventos de Recordatorio',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventorecordatorio',
+            constraint=models.UniqueConstraint(fields=('recordatorio', 'tipo', 'fecha_proxima_revision'), name='evento_recordatorio_unico'),
+        ),
+    ]
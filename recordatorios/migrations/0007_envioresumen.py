@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recordatorios', '0006_programador'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnvioResumen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('total_recordatorios', models.PositiveIntegerField(default=0, verbose_name='Total de Recordatorios')),
+                ('fecha_envio', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Envío')),
+                ('revisor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Revisor')),
+            ],
+            options={
+                'verbose_name': 'Envío de Resumen',
+                'verbose_name_plural': 'Envíos de Resumen',
+                'ordering': ['-fecha_envio'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='envioresumen',
+            constraint=models.UniqueConstraint(fields=('revisor', 'fecha'), name='envio_resumen_unico'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recordatorios', '0007_envioresumen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recurrencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('regla', models.CharField(choices=[('dias', 'Cada N días'), ('mes', 'Día de la semana cada N meses')], default='dias', max_length=10, verbose_name='Regla')),
+                ('intervalo', models.PositiveIntegerField(default=90, help_text='Días o meses según la regla', verbose_name='Intervalo')),
+                ('dia_semana', models.PositiveSmallIntegerField(blank=True, choices=[(0, 'Lunes'), (1, 'Martes'), (2, 'Miércoles'), (3, 'Jueves'), (4, 'Viernes'), (5, 'Sábado'), (6, 'Domingo')], null=True, verbose_name='Día de la Semana')),
+                ('semana', models.SmallIntegerField(blank=True, choices=[(1, 'Primer'), (2, 'Segundo'), (3, 'Tercer'), (4, 'Cuarto'), (-1, 'Último')], null=True, verbose_name='Semana del Mes')),
+                ('fecha_inicio', models.DateTimeField(default=django.utils.timezone.now, help_text='Fija la hora y el primer período de la regla', verbose_name='Fecha de Inicio')),
+                ('prioridad', models.CharField(choices=[('baja', 'Baja'), ('media', 'Media'), ('alta', 'Alta'), ('critica', 'Crítica')], default='media', max_length=20, verbose_name='Prioridad')),
+                ('activa', models.BooleanField(default=True, verbose_name='Activa')),
+            ],
+            options={
+                'verbose_name': 'Recurrencia',
+                'verbose_name_plural': 'Recurrencias',
+                'ordering': ['tipo', 'documento'],
+            },
+        ),
+        migrations.AddField(
+            model_name='recurrencia',
+            name='documento',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurrencias', to='recordatorios.documento', verbose_name='Documento'),
+        ),
+        migrations.AddField(
+            model_name='recurrencia',
+            name='revisor',
+            field=models.ForeignKey(blank=True, help_text='Por defecto, el creador del documento', null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Revisor'),
+        ),
+        migrations.AddField(
+            model_name='recurrencia',
+            name='tipo',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurrencias', to='recordatorios.tipodocumento', verbose_name='Tipo de Documento'),
+        ),
+        migrations.AddField(
+            model_name='recordatoriorevision',
+            name='recurrencia',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recordatorios', to='recordatorios.recurrencia', verbose_name='Recurrencia'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurrencia',
+            constraint=models.CheckConstraint(check=models.Q(models.Q(('documento__isnull', False), ('tipo__isnull', True)), models.Q(('documento__isnull', True), ('tipo__isnull', False)), _connector='OR'), name='recurrencia_documento_o_tipo'),
+        ),
+        migrations.AddConstraint(
+            model_name='recordatoriorevision',
+            constraint=models.UniqueConstraint(fields=('recurrencia', 'documento', 'fecha_revision'), name='recordatorio_recurrencia_unico'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:21
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+
+def completar_fecha_modificacion(apps, schema_editor):
+    # Las filas existentes toman la última fecha conocida en lugar de la de la migración
+    RecordatorioRevision = apps.get_model('recordatorios', 'RecordatorioRevision')
+    RecordatorioRevision.objects.update(fecha_modificacion=Coalesce(F('fecha_completado'), F('fecha_creacion')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0008_recurrencias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordatoriorevision',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, verbose_name='Fecha de Modificación'),
+        ),
+        migrations.AddField(
+            model_name='tipodocumento',
+            name='fecha_modificacion',
+            field=models.DateTimeField(auto_now=True, verbose_name='Fecha de Modificación'),
+        ),
+        migrations.RunPython(completar_fecha_modificacion, migrations.RunPython.noop),
+    ]
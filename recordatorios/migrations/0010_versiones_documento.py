@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recordatorios', '0009_fecha_modificacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionDocumento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveIntegerField(verbose_name='Número')),
+                ('version', models.CharField(max_length=10, verbose_name='Versión')),
+                ('completa', models.BooleanField(default=False, verbose_name='Instantánea completa')),
+                ('datos', models.BinaryField(verbose_name='Datos')),
+                ('fecha', models.DateTimeField(auto_now_add=True, verbose_name='Fecha')),
+                ('documento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versiones', to='recordatorios.documento', verbose_name='Documento')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Versión de Documento',
+                'verbose_name_plural': 'Versiones de Documento',
+                'ordering': ['documento', '-numero'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='versiondocumento',
+            constraint=models.UniqueConstraint(fields=('documento', 'numero'), name='version_documento_unica'),
+        ),
+    ]
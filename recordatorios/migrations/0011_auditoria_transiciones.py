@@ -0,0 +1,80 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:04
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def particionar(apps, schema_editor):
+    """En PostgreSQL rehace la tabla (aún vacía) particionada por mes de fecha"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    tabla = 'recordatorios_transicionrecordatorio'
+    schema_editor.execute(f'DROP TABLE {tabla}')
+    # La clave primaria de una tabla particionada debe incluir la columna de partición;
+    # bigserial porque las columnas identity en tablas particionadas requieren PostgreSQL 17
+    schema_editor.execute(
+        f'CREATE TABLE {tabla} ('
+        'id bigserial NOT NULL, '
+        'recordatorio_id bigint NOT NULL, '
+        'campo varchar(30) NOT NULL, '
+        'valor_anterior varchar(100) NULL, '
+        'valor_nuevo varchar(100) NULL, '
+        'origen varchar(20) NOT NULL, '
+        'fecha timestamp with time zone NOT NULL, '
+        'usuario_id integer NULL, '
+        'PRIMARY KEY (id, fecha)'
+        ') PARTITION BY RANGE (fecha)'
+    )
+    schema_editor.execute(f'CREATE INDEX transicion_recordatorio_idx ON {tabla} (recordatorio_id, fecha)')
+    schema_editor.execute(f'CREATE INDEX transicion_fecha_idx ON {tabla} (fecha)')
+    schema_editor.execute(f'CREATE TABLE {tabla}_defecto PARTITION OF {tabla} DEFAULT')
+
+    # Particiones del mes actual y los dos siguientes; copia congelada de
+    # auditoria.asegurar_particiones. Las demás las crean el programador y vaciar()
+    zona = django.utils.timezone.get_current_timezone()
+    hoy = django.utils.timezone.localdate()
+    anio, mes = hoy.year, hoy.month
+    limites = []
+    for _ in range(4):
+        limites.append(datetime(anio, mes, 1, tzinfo=zona))
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    for inicio, fin in zip(limites, limites[1:]):
+        schema_editor.execute(
+            f'CREATE TABLE IF NOT EXISTS {tabla}_p{inicio:%Y%m} PARTITION OF {tabla} '
+            f"FOR VALUES FROM ('{inicio.isoformat()}') TO ('{fin.isoformat()}')"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recordatorios', '0010_versiones_documento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransicionRecordatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recordatorio_id', models.BigIntegerField(verbose_name='Recordatorio')),
+                ('campo', models.CharField(choices=[('estado', 'Estado'), ('prioridad', 'Prioridad'), ('revisor', 'Revisor'), ('fecha_revision', 'Fecha de Revisión'), ('fecha_proxima_revision', 'Próxima Revisión')], max_length=30, verbose_name='Campo')),
+                ('valor_anterior', models.CharField(blank=True, max_length=100, null=True, verbose_name='Valor Anterior')),
+                ('valor_nuevo', models.CharField(blank=True, max_length=100, null=True, verbose_name='Valor Nuevo')),
+                ('origen', models.CharField(choices=[('edicion', 'Edición'), ('completar', 'Completar'), ('reasignar', 'Reasignar'), ('prioridad', 'Cambio de prioridad'), ('reprogramar', 'Reprogramar')], max_length=20, verbose_name='Origen')),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Fecha')),
+                ('usuario', models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Transición de Recordatorio',
+                'verbose_name_plural': 'Transiciones de Recordatorio',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['recordatorio_id', 'fecha'], name='transicion_recordatorio_idx'), models.Index(fields=['fecha'], name='transicion_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
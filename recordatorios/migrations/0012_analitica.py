@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0011_auditoria_transiciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgregadoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('revisor', 'Revisor'), ('prioridad', 'Prioridad'), ('tipo', 'Tipo de Documento')], max_length=20, verbose_name='Dimensión')),
+                ('valor', models.CharField(blank=True, max_length=20, verbose_name='Valor')),
+                ('vencimientos', models.PositiveIntegerField(default=0, verbose_name='Vencimientos')),
+                ('a_tiempo', models.PositiveIntegerField(default=0, verbose_name='Completados a Tiempo')),
+                ('tarde', models.PositiveIntegerField(default=0, verbose_name='Completados Tarde')),
+                ('abiertos', models.PositiveIntegerField(default=0, verbose_name='Abiertos')),
+                ('completados', models.PositiveIntegerField(default=0, verbose_name='Completados')),
+                ('horas_totales', models.FloatField(default=0, verbose_name='Horas hasta Completar')),
+                ('histograma', models.JSONField(default=list, verbose_name='Histograma')),
+            ],
+            options={
+                'verbose_name': 'Agregado Diario',
+                'verbose_name_plural': 'Agregados Diarios',
+                'ordering': ['fecha', 'dimension', 'valor'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MarcaProceso',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=50, unique=True, verbose_name='Clave')),
+                ('fecha', models.DateTimeField(verbose_name='Fecha')),
+            ],
+            options={
+                'verbose_name': 'Marca de Proceso',
+                'verbose_name_plural': 'Marcas de Proceso',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(fields=['fecha_modificacion'], name='recordatorio_modificacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recordatoriorevision',
+            index=models.Index(fields=['estado', 'fecha_completado'], name='recordatorio_completado_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='agregadodiario',
+            constraint=models.UniqueConstraint(fields=('fecha', 'dimension', 'valor'), name='agregado_diario_unico'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recordatorios', '0012_analitica'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenCalendario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True, verbose_name='Token')),
+                ('fecha_creacion', models.DateTimeField(auto_now=True, verbose_name='Fecha de Creación')),
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='token_calendario', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Token de Calendario',
+                'verbose_name_plural': 'Tokens de Calendario',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recordatorios', '0013_token_calendario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Secuencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=50, unique=True, verbose_name='Clave')),
+                ('valor', models.BigIntegerField(default=0, verbose_name='Valor')),
+            ],
+            options={
+                'verbose_name': 'Secuencia',
+                'verbose_name_plural': 'Secuencias',
+            },
+        ),
+    ]
@@ -1,13 +1,16 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, datetime, timedelta
+import calendar
 
 class TipoDocumento(models.Model):
     nombre = models.CharField(max_length=100, verbose_name='Nombre')
     descripcion = models.TextField(blank=True, verbose_name='Descripción')
     activo = models.BooleanField(default=True, verbose_name='Activo')
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de Modificación')
     
     class Meta:
         verbose_name = 'Tipo de Documento'
@@ -39,6 +42,10 @@ class Documento(models.Model):
         verbose_name = 'Documento'
         verbose_name_plural = 'Documentos'
         ordering = ['-fecha_modificacion']
+        indexes = [
+            # Paginación por cursor de la lista de documentos
+            models.Index(fields=['-fecha_modificacion', 'id'], name='documento_modificacion_idx'),
+        ]
     
     def __str__(self):
         return f'{self.codigo_documento} - {self.titulo}'
@@ -46,6 +53,44 @@ class Documento(models.Model):
     def get_absolute_url(self):
         return reverse('documento_detalle', kwargs={'pk': self.pk})
 
+DIAS_PROXIMO_A_VENCER = 7
+
+
+def limites_urgencia(ahora=None):
+    """Inicio del día local de hoy y del día siguiente al último 'próximo a vencer'"""
+    hoy = timezone.localtime(ahora).replace(hour=0, minute=0, second=0, microsecond=0)
+    return hoy, hoy + timedelta(days=DIAS_PROXIMO_A_VENCER + 1)
+
+
+class RecordatorioRevisionQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create no llama a save(): reproducir sus valores por defecto
+        objs = list(objs)
+        for obj in objs:
+            obj.completar_fechas()
+        return super().bulk_create(objs, *args, **kwargs)
+    
+    def condiciones_urgencia(self, ahora=None):
+        """Condición de cada nivel de urgencia como rango sobre fecha_proxima_revision (usa índices)"""
+        hoy, limite = limites_urgencia(ahora)
+        return {
+            self.model.URGENCIA_VENCIDO: models.Q(fecha_proxima_revision__lt=hoy),
+            self.model.URGENCIA_PROXIMO: models.Q(fecha_proxima_revision__gte=hoy, fecha_proxima_revision__lt=limite),
+            self.model.URGENCIA_AL_DIA: models.Q(fecha_proxima_revision__gte=limite),
+            self.model.URGENCIA_SIN_FECHA: models.Q(fecha_proxima_revision__isnull=True),
+        }
+    
+    def filtrar_urgencia(self, urgencia, ahora=None):
+        return self.filter(self.condiciones_urgencia(ahora)[urgencia])
+    
+    def con_urgencia(self, ahora=None):
+        """Anota ``urgencia`` (0 vencido ... 3 sin fecha) para ordenar, agrupar o contar en SQL"""
+        return self.annotate(urgencia=models.Case(
+            *[models.When(condicion, then=models.Value(urgencia))
+              for urgencia, condicion in self.condiciones_urgencia(ahora).items()],
+            output_field=models.IntegerField(choices=self.model.URGENCIA_CHOICES),
+        ))
+
 class RecordatorioRevision(models.Model):
     ESTADO_CHOICES = [
         ('pendiente', 'Pendiente'),
@@ -61,6 +106,18 @@ class RecordatorioRevision(models.Model):
         ('critica', 'Crítica'),
     ]
     
+    # Niveles de urgencia según fecha_proxima_revision; el orden numérico es el de urgencia
+    URGENCIA_VENCIDO = 0
+    URGENCIA_PROXIMO = 1
+    URGENCIA_AL_DIA = 2
+    URGENCIA_SIN_FECHA = 3
+    URGENCIA_CHOICES = [
+        (URGENCIA_VENCIDO, 'Vencido'),
+        (URGENCIA_PROXIMO, 'Próximo a vencer'),
+        (URGENCIA_AL_DIA, 'Al día'),
+        (URGENCIA_SIN_FECHA, 'Sin fecha'),
+    ]
+    
     documento = models.ForeignKey(Documento, on_delete=models.CASCADE, verbose_name='Documento')
     fecha_revision = models.DateTimeField(verbose_name='Fecha de Revisión')
     fecha_proxima_revision = models.DateTimeField(blank=True, null=True, verbose_name='Próxima Revisión')
@@ -72,23 +129,55 @@ class RecordatorioRevision(models.Model):
     acciones_correctivas = models.TextField(blank=True, verbose_name='Acciones Correctivas')
     fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
     fecha_completado = models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Completado')
+    fecha_modificacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de Modificación')
+    recurrencia = models.ForeignKey('Recurrencia', on_delete=models.SET_NULL, blank=True, null=True, related_name='recordatorios', verbose_name='Recurrencia')
+    
+    objects = RecordatorioRevisionQuerySet.as_manager()
     
     class Meta:
         verbose_name = 'Recordatorio de Revisión'
         verbose_name_plural = 'Recordatorios de Revisión'
         ordering = ['-fecha_revision']
+        indexes = [
+            # Próximos / vencidos del dashboard y filtro ?vencidos=1
+            models.Index(fields=['estado', 'fecha_proxima_revision'], name='recordatorio_estado_prox_idx'),
+            models.Index(
+                fields=['fecha_proxima_revision'],
+                name='recordatorio_pendiente_idx',
+                condition=models.Q(estado='pendiente'),
+            ),
+            # Filtros de estado/prioridad ordenados por fecha de revisión
+            models.Index(fields=['estado', 'prioridad', '-fecha_revision'], name='recordatorio_est_prio_idx'),
+            # Orden de la lista y paginación por cursor
+            models.Index(fields=['-fecha_revision', 'id'], name='recordatorio_fecha_rev_idx'),
+            # Filas cambiadas y completadas por día para actualizar_analitica
+            models.Index(fields=['fecha_modificacion'], name='recordatorio_modificacion_idx'),
+            models.Index(fields=['estado', 'fecha_completado'], name='recordatorio_completado_idx'),
+        ]
+        constraints = [
+            # Una sola revisión generada por documento, recurrencia y fecha
+            models.UniqueConstraint(
+                fields=['recurrencia', 'documento', 'fecha_revision'], name='recordatorio_recurrencia_unico'
+            ),
+        ]
     
     def __str__(self):
         return f'Revisión: {self.documento.titulo} - {self.fecha_revision.strftime("%d/%m/%Y")}'
     
-    def save(self, *args, **kwargs):
+    def completar_fechas(self):
+        """Valores por defecto de fechas que aplican save() y bulk_create()"""
         if self.estado == 'completado' and not self.fecha_completado:
             self.fecha_completado = timezone.now()
         
-        # Si no hay fecha de próxima revisión, calcular automáticamente (30 días por defecto)
+        # Si no hay fecha de próxima revisión, calcularla con la recurrencia (30 días por defecto)
         if not self.fecha_proxima_revision and self.fecha_revision:
-            self.fecha_proxima_revision = self.fecha_revision + timedelta(days=30)
-        
+            if self.recurrencia_id:
+                self.fecha_proxima_revision = self.recurrencia.siguiente(self.fecha_revision)
+            else:
+                self.fecha_proxima_revision = self.fecha_revision + timedelta(days=30)
+    
+    def save(self, *args, **kwargs):
+        self.completar_fechas()
         super().save(*args, **kwargs)
     
     def get_absolute_url(self):
@@ -97,17 +186,356 @@ class RecordatorioRevision(models.Model):
     @property
     def dias_hasta_revision(self):
         if self.fecha_proxima_revision:
-            delta = self.fecha_proxima_revision.date() - timezone.now().date()
+            delta = timezone.localtime(self.fecha_proxima_revision).date() - timezone.localdate()
             return delta.days
         return None
     
+    def nivel_urgencia(self):
+        """La anotación de con_urgencia() si la hay; si no, se calcula igual en Python"""
+        if 'urgencia' in self.__dict__:
+            return self.urgencia
+        if not self.fecha_proxima_revision:
+            return self.URGENCIA_SIN_FECHA
+        dias = self.dias_hasta_revision
+        if dias < 0:
+            return self.URGENCIA_VENCIDO
+        return self.URGENCIA_PROXIMO if dias <= DIAS_PROXIMO_A_VENCER else self.URGENCIA_AL_DIA
+    
+    def get_urgencia_display(self):
+        return dict(self.URGENCIA_CHOICES)[self.nivel_urgencia()]
+    
     @property
     def es_vencido(self):
-        if self.fecha_proxima_revision:
-            return timezone.now().date() > self.fecha_proxima_revision.date()
-        return False
+        return self.nivel_urgencia() == self.URGENCIA_VENCIDO
     
     @property
     def es_proximo_a_vencer(self):
-        dias = self.dias_hasta_revision
-        return dias is not None and 0 <= dias <= 7
\ No newline at end of file
+        return self.nivel_urgencia() == self.URGENCIA_PROXIMO
+
+class Recurrencia(models.Model):
+    """Regla de revisiones periódicas de un documento o de todos los de un tipo"""
+    REGLA_CHOICES = [
+        ('dias', 'Cada N días'),
+        ('mes', 'Día de la semana cada N meses'),
+    ]
+    
+    DIA_SEMANA_CHOICES = [
+        (0, 'Lunes'),
+        (1, 'Martes'),
+        (2, 'Miércoles'),
+        (3, 'Jueves'),
+        (4, 'Viernes'),
+        (5, 'Sábado'),
+        (6, 'Domingo'),
+    ]
+    
+    SEMANA_CHOICES = [
+        (1, 'Primer'),
+        (2, 'Segundo'),
+        (3, 'Tercer'),
+        (4, 'Cuarto'),
+        (-1, 'Último'),
+    ]
+    
+    documento = models.ForeignKey(Documento, on_delete=models.CASCADE, blank=True, null=True, related_name='recurrencias', verbose_name='Documento')
+    tipo = models.ForeignKey(TipoDocumento, on_delete=models.CASCADE, blank=True, null=True, related_name='recurrencias', verbose_name='Tipo de Documento')
+    regla = models.CharField(max_length=10, choices=REGLA_CHOICES, default='dias', verbose_name='Regla')
+    intervalo = models.PositiveIntegerField(default=90, verbose_name='Intervalo', help_text='Días o meses según la regla')
+    dia_semana = models.PositiveSmallIntegerField(choices=DIA_SEMANA_CHOICES, blank=True, null=True, verbose_name='Día de la Semana')
+    semana = models.SmallIntegerField(choices=SEMANA_CHOICES, blank=True, null=True, verbose_name='Semana del Mes')
+    fecha_inicio = models.DateTimeField(default=timezone.now, verbose_name='Fecha de Inicio', help_text='Fija la hora y el primer período de la regla')
+    revisor = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, verbose_name='Revisor', help_text='Por defecto, el creador del documento')
+    prioridad = models.CharField(max_length=20, choices=RecordatorioRevision.PRIORIDAD_CHOICES, default='media', verbose_name='Prioridad')
+    activa = models.BooleanField(default=True, verbose_name='Activa')
+    
+    class Meta:
+        verbose_name = 'Recurrencia'
+        verbose_name_plural = 'Recurrencias'
+        ordering = ['tipo', 'documento']
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(documento__isnull=False, tipo__isnull=True) | models.Q(documento__isnull=True, tipo__isnull=False),
+                name='recurrencia_documento_o_tipo',
+            ),
+        ]
+    
+    def __str__(self):
+        objetivo = self.documento or self.tipo
+        if self.regla == 'mes':
+            return f'{objetivo}: {self.get_semana_display()} {self.get_dia_semana_display()} cada {self.intervalo} meses'
+        return f'{objetivo}: cada {self.intervalo} días'
+    
+    def clean(self):
+        if bool(self.documento_id) == bool(self.tipo_id):
+            raise ValidationError('Indique un documento o un tipo de documento, no ambos.')
+        if not self.intervalo:
+            raise ValidationError({'intervalo': 'El intervalo debe ser mayor que cero.'})
+        if self.regla == 'mes' and (self.dia_semana is None or self.semana is None):
+            raise ValidationError('La regla mensual requiere día de la semana y semana del mes.')
+    
+    def _dia_del_mes(self, anio, mes):
+        """Fecha del ``semana``-ésimo ``dia_semana`` del mes (semana=-1: el último)"""
+        primer_dia, dias_mes = calendar.monthrange(anio, mes)
+        if self.semana == -1:
+            ultimo = (calendar.weekday(anio, mes, dias_mes) - self.dia_semana) % 7
+            return date(anio, mes, dias_mes - ultimo)
+        return date(anio, mes, 1 + (self.dia_semana - primer_dia) % 7 + 7 * (self.semana - 1))
+    
+    def ocurrencias(self, despues_de):
+        """Genera, en orden, las fechas de revisión posteriores a ``despues_de``
+        
+        Las fechas se calculan en hora local para que el cambio de horario no mueva la hora.
+        """
+        inicio = timezone.localtime(self.fecha_inicio)
+        hora = inicio.time().replace(tzinfo=None)
+        desde = timezone.localtime(max(despues_de, self.fecha_inicio)).date()
+        
+        def en_hora(dia):
+            return timezone.make_aware(datetime.combine(dia, hora))
+        
+        if self.regla == 'mes':
+            meses = (desde.year - inicio.year) * 12 + desde.month - inicio.month
+            indice = inicio.year * 12 + inicio.month - 1 + max(0, meses - meses % self.intervalo)
+            while True:
+                fecha = en_hora(self._dia_del_mes(indice // 12, indice % 12 + 1))
+                if fecha > despues_de and fecha >= self.fecha_inicio:
+                    yield fecha
+                indice += self.intervalo
+        else:
+            dias = max(0, (desde - inicio.date()).days // self.intervalo)
+            while True:
+                fecha = en_hora(inicio.date() + timedelta(days=dias * self.intervalo))
+                if fecha > despues_de:
+                    yield fecha
+                dias += 1
+    
+    def siguiente(self, fecha):
+        """Primera ocurrencia posterior a ``fecha``"""
+        return next(self.ocurrencias(fecha))
+
+class EstadisticaDashboard(models.Model):
+    """Contadores precalculados del dashboard, mantenidos por señales"""
+    clave = models.CharField(max_length=50, unique=True, verbose_name='Clave')
+    tipo = models.ForeignKey(TipoDocumento, on_delete=models.CASCADE, blank=True, null=True, verbose_name='Tipo de Documento')
+    valor = models.IntegerField(default=0, verbose_name='Valor')
+    fecha_actualizacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')
+    
+    class Meta:
+        verbose_name = 'Estadística del Dashboard'
+        verbose_name_plural = 'Estadísticas del Dashboard'
+        ordering = ['clave']
+    
+    def __str__(self):
+        return f'{self.clave}: {self.valor}'
+
+
+class EventoRecordatorio(models.Model):
+    """Aviso emitido por el programador cuando un recordatorio vence o está por vencer"""
+    TIPO_CHOICES = [
+        ('proximo', 'Próximo a vencer'),
+        ('vencido', 'Vencido'),
+    ]
+    
+    recordatorio = models.ForeignKey(RecordatorioRevision, on_delete=models.CASCADE, related_name='eventos', verbose_name='Recordatorio')
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name='Tipo')
+    fecha_proxima_revision = models.DateTimeField(verbose_name='Próxima Revisión')
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    
+    class Meta:
+        verbose_name = 'Evento de Recordatorio'
+        verbose_name_plural = 'Eventos de Recordatorio'
+        ordering = ['-fecha_creacion']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recordatorio', 'tipo', 'fecha_proxima_revision'],
+                name='evento_recordatorio_unico',
+            ),
+        ]
+    
+    def __str__(self):
+        return f'{self.get_tipo_display()}: {self.recordatorio_id}'
+
+
+class CambioProgramacion(models.Model):
+    """Cola en base de datos de cambios de fecha que el programador debe atender"""
+    recordatorio_id = models.BigIntegerField(verbose_name='Recordatorio')
+    fecha_proxima_revision = models.DateTimeField(verbose_name='Próxima Revisión')
+    fecha_creacion = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    
+    class Meta:
+        verbose_name = 'Cambio de Programación'
+        verbose_name_plural = 'Cambios de Programación'
+        ordering = ['id']
+    
+    def __str__(self):
+        return f'{self.recordatorio_id} -> {self.fecha_proxima_revision}'
+
+
+class EnvioResumen(models.Model):
+    """Registro de resúmenes enviados; garantiza un envío por revisor y día"""
+    revisor = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='Revisor')
+    fecha = models.DateField(verbose_name='Fecha')
+    total_recordatorios = models.PositiveIntegerField(default=0, verbose_name='Total de Recordatorios')
+    fecha_envio = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Envío')
+    
+    class Meta:
+        verbose_name = 'Envío de Resumen'
+        verbose_name_plural = 'Envíos de Resumen'
+        ordering = ['-fecha_envio']
+        constraints = [
+            models.UniqueConstraint(fields=['revisor', 'fecha'], name='envio_resumen_unico'),
+        ]
+    
+    def __str__(self):
+        return f'{self.revisor} - {self.fecha:%d/%m/%Y}'
+
+
+class VersionDocumento(models.Model):
+    """Versión del historial de un documento; sólo se añaden filas
+
+    ``datos`` es JSON comprimido: el estado completo en las instantáneas y, en
+    las demás, las diferencias con la versión anterior (ver versiones.py).
+    """
+    documento = models.ForeignKey(Documento, on_delete=models.CASCADE, related_name='versiones', verbose_name='Documento')
+    numero = models.PositiveIntegerField(verbose_name='Número')
+    version = models.CharField(max_length=10, verbose_name='Versión')
+    completa = models.BooleanField(default=False, verbose_name='Instantánea completa')
+    datos = models.BinaryField(verbose_name='Datos')
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='Usuario')
+    fecha = models.DateTimeField(auto_now_add=True, verbose_name='Fecha')
+    
+    class Meta:
+        verbose_name = 'Versión de Documento'
+        verbose_name_plural = 'Versiones de Documento'
+        ordering = ['documento', '-numero']
+        constraints = [
+            # Su índice sirve para reconstruir (rango de números) y paginar el historial
+            models.UniqueConstraint(fields=['documento', 'numero'], name='version_documento_unica'),
+        ]
+    
+    def __str__(self):
+        return f'{self.documento_id} v{self.numero}'
+
+
+class TransicionRecordatorio(models.Model):
+    """Cambio de estado, prioridad, revisor o fechas de un recordatorio; sólo se añaden filas
+
+    Se escriben en lote fuera de la petición (ver auditoria.py). En PostgreSQL la
+    tabla está particionada por mes de ``fecha``.
+    """
+    CAMPO_CHOICES = [
+        ('estado', 'Estado'),
+        ('prioridad', 'Prioridad'),
+        ('revisor', 'Revisor'),
+        ('fecha_revision', 'Fecha de Revisión'),
+        ('fecha_proxima_revision', 'Próxima Revisión'),
+    ]
+    ORIGEN_CHOICES = [
+        ('edicion', 'Edición'),
+        ('completar', 'Completar'),
+        ('reasignar', 'Reasignar'),
+        ('prioridad', 'Cambio de prioridad'),
+        ('reprogramar', 'Reprogramar'),
+    ]
+    
+    # Sin FK: el registro sobrevive al recordatorio
+    recordatorio_id = models.BigIntegerField(verbose_name='Recordatorio')
+    campo = models.CharField(max_length=30, choices=CAMPO_CHOICES, verbose_name='Campo')
+    valor_anterior = models.CharField(max_length=100, null=True, blank=True, verbose_name='Valor Anterior')
+    valor_nuevo = models.CharField(max_length=100, null=True, blank=True, verbose_name='Valor Nuevo')
+    origen = models.CharField(max_length=20, choices=ORIGEN_CHOICES, verbose_name='Origen')
+    # Sin restricción ni índice en la base: no encarece la escritura en lote
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, db_constraint=False,
+                                db_index=False, verbose_name='Usuario')
+    fecha = models.DateTimeField(default=timezone.now, verbose_name='Fecha')
+    
+    class Meta:
+        verbose_name = 'Transición de Recordatorio'
+        verbose_name_plural = 'Transiciones de Recordatorio'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['recordatorio_id', 'fecha'], name='transicion_recordatorio_idx'),
+            models.Index(fields=['fecha'], name='transicion_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.recordatorio_id} {self.campo}: {self.valor_anterior} -> {self.valor_nuevo}'
+
+
+class AgregadoDiario(models.Model):
+    """Totales de un día de recordatorios para la analítica, por una sola dimensión
+
+    Los vencimientos cuentan por el día de fecha_proxima_revision y los
+    completados por el de fecha_completado. ``histograma`` tiene las horas hasta
+    completar por cubetas (analitica.CUBETAS_HORAS) para sumar días y estimar percentiles.
+    """
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('revisor', 'Revisor'),
+        ('prioridad', 'Prioridad'),
+        ('tipo', 'Tipo de Documento'),
+    ]
+    
+    fecha = models.DateField(verbose_name='Fecha')
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES, verbose_name='Dimensión')
+    # Id del revisor o del tipo, o la prioridad; vacío para el total
+    valor = models.CharField(max_length=20, blank=True, verbose_name='Valor')
+    vencimientos = models.PositiveIntegerField(default=0, verbose_name='Vencimientos')
+    a_tiempo = models.PositiveIntegerField(default=0, verbose_name='Completados a Tiempo')
+    tarde = models.PositiveIntegerField(default=0, verbose_name='Completados Tarde')
+    abiertos = models.PositiveIntegerField(default=0, verbose_name='Abiertos')
+    completados = models.PositiveIntegerField(default=0, verbose_name='Completados')
+    horas_totales = models.FloatField(default=0, verbose_name='Horas hasta Completar')
+    histograma = models.JSONField(default=list, verbose_name='Histograma')
+    
+    class Meta:
+        verbose_name = 'Agregado Diario'
+        verbose_name_plural = 'Agregados Diarios'
+        ordering = ['fecha', 'dimension', 'valor']
+        constraints = [
+            # Su índice sirve para leer un rango de fechas
+            models.UniqueConstraint(fields=['fecha', 'dimension', 'valor'], name='agregado_diario_unico'),
+        ]
+    
+    def __str__(self):
+        return f'{self.fecha} {self.dimension} {self.valor}'
+
+
+class MarcaProceso(models.Model):
+    """Hasta dónde llegó un proceso incremental (p. ej. actualizar_analitica)"""
+    clave = models.CharField(max_length=50, unique=True, verbose_name='Clave')
+    fecha = models.DateTimeField(verbose_name='Fecha')
+    
+    class Meta:
+        verbose_name = 'Marca de Proceso'
+        verbose_name_plural = 'Marcas de Proceso'
+    
+    def __str__(self):
+        return f'{self.clave}: {self.fecha}'
+
+
+class Secuencia(models.Model):
+    """Contador que se incrementa con un solo UPDATE atómico (p. ej. números de evento de tiempo_real)"""
+    clave = models.CharField(max_length=50, unique=True, verbose_name='Clave')
+    valor = models.BigIntegerField(default=0, verbose_name='Valor')
+    
+    class Meta:
+        verbose_name = 'Secuencia'
+        verbose_name_plural = 'Secuencias'
+    
+    def __str__(self):
+        return f'{self.clave}: {self.valor}'
+
+
+class TokenCalendario(models.Model):
+    """Token secreto de la URL del calendario iCalendar de un revisor"""
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, related_name='token_calendario', verbose_name='Usuario')
+    token = models.CharField(max_length=64, unique=True, verbose_name='Token')
+    fecha_creacion = models.DateTimeField(auto_now=True, verbose_name='Fecha de Creación')
+    
+    class Meta:
+        verbose_name = 'Token de Calendario'
+        verbose_name_plural = 'Tokens de Calendario'
+    
+    def __str__(self):
+        return f'Calendario de {self.usuario}'
@@ -0,0 +1,127 @@
+import logging
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import IntegrityError, transaction
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import timezone
+from .models import RecordatorioRevision, EnvioResumen
+
+logger = logging.getLogger(__name__)
+
+DIAS_ANTICIPACION = 7
+TAMANO_LOTE = 100
+
+
+def recordatorios_por_revisor(ahora):
+    """Recordatorios pendientes vencidos o por vencer, agrupados por revisor"""
+    limite = ahora + timedelta(days=DIAS_ANTICIPACION)
+    prioridades = dict(RecordatorioRevision.PRIORIDAD_CHOICES)
+    filas = RecordatorioRevision.objects.filter(
+        estado='pendiente', fecha_proxima_revision__lte=limite
+    ).order_by('revisor_id', 'fecha_proxima_revision').values(
+        'pk', 'revisor_id', 'fecha_proxima_revision', 'prioridad',
+        'documento__titulo', 'documento__codigo_documento'
+    ).iterator(chunk_size=2000)
+
+    for revisor_id, grupo in groupby(filas, key=lambda fila: fila['revisor_id']):
+        vencidos, proximos = [], []
+        for fila in grupo:
+            fila['prioridad_display'] = prioridades.get(fila['prioridad'], fila['prioridad'])
+            fila['fecha'] = timezone.localtime(fila['fecha_proxima_revision']).strftime('%d/%m/%Y %H:%M')
+            fila['url'] = settings.SITIO_URL + reverse('recordatorio_detalle', kwargs={'pk': fila['pk']})
+            (vencidos if fila['fecha_proxima_revision'] < ahora else proximos).append(fila)
+        yield revisor_id, vencidos, proximos
+
+
+def plantillas_resumen():
+    return get_template('recordatorios/email/resumen.txt'), get_template('recordatorios/email/resumen.html')
+
+
+def construir_resumen(revisor, vencidos, proximos, connection=None, plantillas=None):
+    texto, html = plantillas or plantillas_resumen()
+    contexto = {
+        'revisor': revisor,
+        'vencidos': vencidos,
+        'proximos': proximos,
+        'dias_anticipacion': DIAS_ANTICIPACION,
+        'sitio_url': settings.SITIO_URL,
+    }
+    mensaje = EmailMultiAlternatives(
+        subject=f'Resumen de revisiones: {len(vencidos)} vencidas, {len(proximos)} próximas',
+        body=texto.render(contexto),
+        to=[revisor['email']],
+        connection=connection,
+    )
+    mensaje.attach_alternative(html.render(contexto), 'text/html')
+    return mensaje
+
+
+def enviar_resumenes(fecha=None, tamano_lote=TAMANO_LOTE, connection=None):
+    """Envía un resumen por revisor y día reutilizando una sola conexión SMTP
+
+    Cada envío se reserva en EnvioResumen antes de mandar su correo y la reserva
+    se deshace si el envío falla, de modo que repetir la ejecución el mismo día
+    (también tras un fallo a mitad de lote) no duplica correos ya entregados.
+    """
+    ahora = timezone.now()
+    fecha = fecha or timezone.localdate(ahora)
+    ya_enviados = set(EnvioResumen.objects.filter(fecha=fecha).values_list('revisor_id', flat=True))
+    connection = connection or get_connection()
+    plantillas = plantillas_resumen()
+    enviados = 0
+
+    def enviar(mensaje, registro):
+        try:
+            with transaction.atomic():
+                registro.save()
+        except IntegrityError:
+            # Otra ejecución ya lo reservó
+            return 0
+        try:
+            total = connection.send_messages([mensaje]) or 0
+        except Exception:
+            registro.delete()
+            raise
+        if not total:
+            registro.delete()
+        return total
+
+    def enviar_lote(grupos):
+        revisores = {
+            usuario['pk']: usuario
+            for usuario in User.objects.filter(pk__in=[revisor_id for revisor_id, v, p in grupos])
+            .values('pk', 'username', 'first_name', 'last_name', 'email')
+        }
+        total = 0
+        for revisor_id, vencidos, proximos in grupos:
+            revisor = revisores.get(revisor_id)
+            if not revisor or not revisor['email']:
+                continue
+            total += enviar(
+                construir_resumen(revisor, vencidos, proximos, connection, plantillas),
+                EnvioResumen(revisor_id=revisor_id, fecha=fecha, total_recordatorios=len(vencidos) + len(proximos)),
+            )
+        return total
+
+    connection.open()
+    try:
+        grupos = []
+        for grupo in recordatorios_por_revisor(ahora):
+            if grupo[0] in ya_enviados:
+                continue
+            grupos.append(grupo)
+            if len(grupos) >= tamano_lote:
+                enviados += enviar_lote(grupos)
+                grupos = []
+        if grupos:
+            enviados += enviar_lote(grupos)
+    finally:
+        connection.close()
+
+    logger.info('%s resúmenes enviados para %s', enviados, fecha)
+    return enviados
@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils import timezone
+from . import auditoria, estadisticas, recurrencias
+from .models import RecordatorioRevision, CambioProgramacion
+
+TAMANO_LOTE = 1000
+
+# Se envía una vez por operación: accion='completar'|'reasignar'|'prioridad'|'reprogramar', ids=[...],
+# revisores={...} (los de antes y después de la operación)
+recordatorios_actualizados = Signal()
+
+
+def _bloquear(queryset, *campos):
+    """Lee las filas afectadas antes del UPDATE (bloqueadas donde la base lo permite)"""
+    queryset = queryset.order_by()
+    return list(queryset.select_for_update().values_list('pk', *campos))
+
+
+def _auditar(accion, cambios):
+    auditoria.registrar(auditoria.transiciones(accion, cambios))
+
+
+def _notificar(accion, ids, revisores):
+    if ids:
+        transaction.on_commit(lambda: recordatorios_actualizados.send(
+            sender=RecordatorioRevision, accion=accion, ids=ids, revisores=set(revisores)
+        ))
+
+
+@transaction.atomic
+def completar(queryset, ahora=None):
+    """Marca como completados los recordatorios con un solo UPDATE
+
+    Igual que save(), conserva una fecha_completado existente y si no la hay usa ahora.
+    Los recurrentes generan en lote su revisión siguiente.
+    """
+    ahora = ahora or timezone.now()
+    queryset = queryset.exclude(estado='completado')
+    campos = ['estado', 'documento_id', 'recurrencia_id', 'revisor_id', 'fecha_proxima_revision']
+    filas = [dict(zip(['pk'] + campos, fila)) for fila in _bloquear(queryset, *campos)]
+    total = queryset.update(
+        estado='completado', fecha_completado=Coalesce('fecha_completado', Value(ahora)), fecha_modificacion=ahora
+    )
+    pendientes = sum(1 for fila in filas if fila['estado'] == 'pendiente')
+    estadisticas.incrementar(estadisticas.RECORDATORIOS_PENDIENTES, -pendientes)
+    recurrencias.generar_siguientes(filas)
+    _auditar('completar', [(fila['pk'], 'estado', fila['estado'], 'completado') for fila in filas])
+    _notificar('completar', [fila['pk'] for fila in filas], [fila['revisor_id'] for fila in filas])
+    return total
+
+
+@transaction.atomic
+def reasignar(queryset, revisor):
+    queryset = queryset.exclude(revisor=revisor)
+    filas = _bloquear(queryset, 'revisor_id')
+    total = queryset.update(revisor=revisor, fecha_modificacion=timezone.now())
+    _auditar('reasignar', [(pk, 'revisor_id', anterior, revisor.pk) for pk, anterior in filas])
+    _notificar('reasignar', [pk for pk, anterior in filas], [anterior for pk, anterior in filas] + [revisor.pk])
+    return total
+
+
+@transaction.atomic
+def cambiar_prioridad(queryset, prioridad):
+    queryset = queryset.exclude(prioridad=prioridad)
+    filas = _bloquear(queryset, 'prioridad', 'revisor_id')
+    total = queryset.update(prioridad=prioridad, fecha_modificacion=timezone.now())
+    _auditar('prioridad', [(pk, 'prioridad', anterior, prioridad) for pk, anterior, revisor_id in filas])
+    _notificar('prioridad', [pk for pk, anterior, revisor_id in filas],
+               [revisor_id for pk, anterior, revisor_id in filas])
+    return total
+
+
+@transaction.atomic
+def reprogramar(queryset, desplazamiento=None, fecha=None):
+    """Desplaza fecha_proxima_revision o la fija en ``fecha`` con un solo UPDATE
+
+    Una fecha vacía parte del valor por defecto de save(): fecha_revision + 30 días.
+    Los pendientes se encolan en CambioProgramacion para el programador de avisos.
+    """
+    if (desplazamiento is None) == (fecha is None):
+        raise ValueError('Indique desplazamiento o fecha')
+    por_defecto = timedelta(days=30)
+    filas = _bloquear(queryset, 'estado', 'fecha_revision', 'fecha_proxima_revision', 'revisor_id')
+    if fecha is not None:
+        total = queryset.update(fecha_proxima_revision=fecha, fecha_modificacion=timezone.now())
+        nuevas = {pk: fecha for pk, estado, revision, proxima, revisor_id in filas}
+    else:
+        total = queryset.update(fecha_proxima_revision=Coalesce(
+            F('fecha_proxima_revision'), F('fecha_revision') + Value(por_defecto)
+        ) + Value(desplazamiento), fecha_modificacion=timezone.now())
+        nuevas = {
+            pk: (proxima or revision + por_defecto) + desplazamiento
+            for pk, estado, revision, proxima, revisor_id in filas
+        }
+
+    CambioProgramacion.objects.bulk_create([
+        CambioProgramacion(recordatorio_id=pk, fecha_proxima_revision=nuevas[pk])
+        for pk, estado, revision, proxima, revisor_id in filas if estado == 'pendiente'
+    ], batch_size=TAMANO_LOTE)
+    _auditar('reprogramar', [
+        (pk, 'fecha_proxima_revision', proxima, nuevas[pk]) for pk, estado, revision, proxima, revisor_id in filas
+    ])
+    _notificar('reprogramar', list(nuevas), [revisor_id for pk, estado, revision, proxima, revisor_id in filas])
+    return total
+
+
+def aplicar(queryset, accion, revisor=None, prioridad=None, dias=None):
+    """Ejecuta la acción de OperacionLoteForm; devuelve el número de filas actualizadas"""
+    if accion == 'completar':
+        return completar(queryset)
+    if accion == 'reasignar':
+        return reasignar(queryset, revisor)
+    if accion == 'prioridad':
+        return cambiar_prioridad(queryset, prioridad)
+    if accion == 'reprogramar':
+        return reprogramar(queryset, desplazamiento=timedelta(days=dias))
+    raise ValueError(f'Acción desconocida: {accion}')
@@ -0,0 +1,216 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+CONTEO_CACHE_SEGUNDOS = 300
+
+
+def codificar_cursor(valores, direccion):
+    datos = {'d': direccion, 'v': [_serializar(v) for v in valores]}
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        return [_deserializar(v) for v in datos['v']], datos['d']
+    except (ValueError, KeyError, TypeError):
+        raise Http404('Cursor de paginación inválido')
+
+
+def _serializar(valor):
+    if isinstance(valor, datetime):
+        return {'dt': valor.isoformat()}
+    if isinstance(valor, date):
+        return {'d': valor.isoformat()}
+    return valor
+
+
+def _deserializar(valor):
+    if isinstance(valor, dict):
+        if 'dt' in valor:
+            return datetime.fromisoformat(valor['dt'])
+        return date.fromisoformat(valor['d'])
+    return valor
+
+
+def estimar_total(queryset):
+    """Total aproximado de filas, cacheado por consulta"""
+    sql, params = queryset.query.sql_with_params()
+    clave = 'conteo:' + hashlib.md5(f'{sql}{params}'.encode()).hexdigest()
+    total = cache.get(clave)
+    if total is None:
+        total = _conteo_rapido(queryset)
+        cache.set(clave, total, CONTEO_CACHE_SEGUNDOS)
+    return total
+
+
+def _conteo_rapido(queryset):
+    # En PostgreSQL una tabla sin filtros se estima con las estadísticas del planificador
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            fila = cursor.fetchone()
+        if fila and fila[0] > 0:
+            return fila[0]
+    return queryset.count()
+
+
+class PaginadorEstimado(Paginator):
+    """Paginator con el total de estimar_total(): para las listas del admin"""
+
+    @cached_property
+    def count(self):
+        return estimar_total(self.object_list.order_by())
+
+
+class PaginadorCursor:
+    """Paginación por keyset sobre el orden del queryset, sin OFFSET ni COUNT"""
+
+    def __init__(self, queryset, por_pagina, contar_total=True, desempatar=True):
+        self.queryset = queryset
+        self.por_pagina = por_pagina
+        self.contar_total = contar_total
+        orden = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        # Sin desempate el orden ya es único (p. ej. número de versión dentro de un documento)
+        # y la condición del cursor queda como un solo rango sobre el índice
+        if desempatar and not any(campo.lstrip('-') in ('id', 'pk') for campo in orden):
+            orden.append('id')
+        self.campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in orden]
+
+    @cached_property
+    def count(self):
+        if not self.contar_total:
+            return None
+        return estimar_total(self.queryset.order_by())
+
+    def orden(self, invertir=False):
+        return [('-' if desc != invertir else '') + campo for campo, desc in self.campos]
+
+    def condicion(self, valores, invertir=False):
+        """Filas posteriores (o anteriores, si invertir) a la fila con ``valores``"""
+        condicion = Q()
+        iguales = {}
+        for (campo, desc), valor in zip(self.campos, valores):
+            lookup = 'gt' if desc == invertir else 'lt'
+            condicion |= Q(**iguales, **{f'{campo}__{lookup}': valor})
+            iguales[campo] = valor
+        return condicion
+
+    def valores(self, objeto):
+        # Admite instancias o filas de values()
+        if isinstance(objeto, dict):
+            return [objeto[campo] for campo, desc in self.campos]
+        return [getattr(objeto, campo) for campo, desc in self.campos]
+
+    def pagina(self, cursor=None, parametros=None):
+        direccion = 'n'
+        queryset = self.queryset
+        if cursor:
+            valores, direccion = decodificar_cursor(cursor)
+            if direccion not in ('n', 'p', 'u') or (direccion != 'u' and len(valores) != len(self.campos)):
+                raise Http404('Cursor de paginación inválido')
+            if direccion != 'u':
+                queryset = queryset.filter(self.condicion(valores, invertir=direccion == 'p'))
+
+        invertir = direccion in ('p', 'u')
+        objetos = list(queryset.order_by(*self.orden(invertir))[:self.por_pagina + 1])
+        hay_mas = len(objetos) > self.por_pagina
+        objetos = objetos[:self.por_pagina]
+        if invertir:
+            objetos.reverse()
+
+        if direccion == 'n':
+            anterior, siguiente = bool(cursor), hay_mas
+        elif direccion == 'p':
+            anterior, siguiente = hay_mas, True
+        else:
+            anterior, siguiente = hay_mas, False
+        return PaginaCursor(self, objetos, anterior, siguiente, parametros)
+
+
+class PaginaCursor:
+    """Página compatible con la navegación anterior/siguiente de las plantillas"""
+
+    def __init__(self, paginador, object_list, has_previous, has_next, parametros=None):
+        self.paginator = paginador
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+        self.parametros = parametros.copy() if parametros is not None else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    @property
+    def cursor_anterior(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return codificar_cursor(self.paginator.valores(self.object_list[0]), 'p')
+
+    @property
+    def cursor_siguiente(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return codificar_cursor(self.paginator.valores(self.object_list[-1]), 'n')
+
+    def _url(self, cursor):
+        parametros = self.parametros.copy() if self.parametros is not None else None
+        if parametros is None:
+            return f'?cursor={cursor}' if cursor else '?'
+        parametros.pop('cursor', None)
+        parametros.pop('page', None)
+        if cursor:
+            parametros['cursor'] = cursor
+        return '?' + parametros.urlencode()
+
+    @property
+    def url_primera(self):
+        return self._url(None)
+
+    @property
+    def url_anterior(self):
+        return self._url(self.cursor_anterior)
+
+    @property
+    def url_siguiente(self):
+        return self._url(self.cursor_siguiente)
+
+    @property
+    def url_ultima(self):
+        return self._url(codificar_cursor([], 'u'))
+
+
+class PaginacionCursorMixin:
+    """Sustituye el Paginator de ListView por paginación por cursor"""
+    contar_total = True
+    desempatar = True
+
+    def paginate_queryset(self, queryset, page_size):
+        paginador = PaginadorCursor(queryset, page_size, contar_total=self.contar_total, desempatar=self.desempatar)
+        pagina = paginador.pagina(self.request.GET.get('cursor'), self.request.GET)
+        return paginador, pagina, pagina.object_list, pagina.has_other_pages()
@@ -0,0 +1,175 @@
+import heapq
+import logging
+import time
+from datetime import timedelta
+
+from django.db import DatabaseError
+from django.db.models import Q
+from django.dispatch import Signal
+from django.utils import timezone
+from .auditoria import asegurar_particiones
+from .models import RecordatorioRevision, EventoRecordatorio, CambioProgramacion
+
+logger = logging.getLogger(__name__)
+
+# Anticipación con la que se emite cada aviso respecto a fecha_proxima_revision
+AVISOS = {
+    'proximo': timedelta(days=7),
+    'vencido': timedelta(0),
+}
+
+# Se envía una vez por lote con los ids avisados: tipo='proximo'|'vencido', ids=[...]
+recordatorios_avisados = Signal()
+
+
+class ColaAvisos:
+    """Min-heap de un tipo de aviso, cargado por lotes en orden de fecha"""
+
+    def __init__(self, tipo, anticipacion, lote, desde=None):
+        self.tipo = tipo
+        self.anticipacion = anticipacion
+        self.lote = lote
+        self.heap = []
+        # Última (fecha, id) cargada: todo lo no cargado vence después del heap
+        self.marca = (desde, 0) if desde else None
+        self.agotada = False
+
+    def cargar(self):
+        queryset = RecordatorioRevision.objects.filter(estado='pendiente', fecha_proxima_revision__isnull=False)
+        if self.marca:
+            fecha, pk = self.marca
+            queryset = queryset.filter(
+                Q(fecha_proxima_revision__gt=fecha) | Q(fecha_proxima_revision=fecha, pk__gt=pk)
+            )
+        filas = list(
+            queryset.order_by('fecha_proxima_revision', 'pk').values_list('pk', 'fecha_proxima_revision')[:self.lote]
+        )
+        for pk, fecha in filas:
+            heapq.heappush(self.heap, (fecha - self.anticipacion, pk, fecha))
+        if filas:
+            pk, fecha = filas[-1]
+            self.marca = (fecha, pk)
+        self.agotada = len(filas) < self.lote
+
+    def siguiente(self):
+        """Momento del próximo aviso, o None si la cola está vacía"""
+        if not self.heap and not self.agotada:
+            self.cargar()
+        return self.heap[0][0] if self.heap else None
+
+    def extraer_vencidos(self, ahora):
+        entradas = []
+        while len(entradas) < self.lote:
+            momento = self.siguiente()
+            if momento is None or momento > ahora:
+                break
+            momento, pk, fecha = heapq.heappop(self.heap)
+            entradas.append((pk, fecha))
+        return entradas
+
+    def agregar(self, pk, fecha):
+        if self.marca and (fecha, pk) <= self.marca:
+            heapq.heappush(self.heap, (fecha - self.anticipacion, pk, fecha))
+        else:
+            # Quedará dentro de una carga posterior
+            self.agotada = False
+
+
+class Programador:
+    """Emite avisos de recordatorios próximos y vencidos usando la base de datos como cola"""
+
+    def __init__(self, lote=1000, intervalo=1.0):
+        self.lote = lote
+        self.intervalo = intervalo
+        self.ultimo_cambio = 0
+        self.particiones_revisadas = None
+        ahora = timezone.now()
+        self.colas = [
+            # Los avisos de 'próximo' anteriores a ahora ya no tienen sentido
+            ColaAvisos(tipo, anticipacion, lote, desde=ahora if anticipacion else None)
+            for tipo, anticipacion in AVISOS.items()
+        ]
+        # La carga inicial ya refleja el estado actual; los cambios anteriores sobran
+        CambioProgramacion.objects.all().delete()
+
+    def atender_cambios(self):
+        cambios = list(
+            CambioProgramacion.objects.filter(pk__gt=self.ultimo_cambio)
+            .values_list('pk', 'recordatorio_id', 'fecha_proxima_revision')[:self.lote]
+        )
+        for pk, recordatorio_id, fecha in cambios:
+            for cola in self.colas:
+                cola.agregar(recordatorio_id, fecha)
+        if cambios:
+            self.ultimo_cambio = cambios[-1][0]
+            CambioProgramacion.objects.filter(pk__lte=self.ultimo_cambio).delete()
+        return len(cambios)
+
+    def disparar(self, cola, entradas):
+        """Valida las entradas contra la base de datos y registra los avisos nuevos"""
+        ahora = timezone.now()
+        ids = {pk for pk, fecha in entradas}
+        vigentes = dict(
+            RecordatorioRevision.objects.filter(pk__in=ids, estado='pendiente')
+            .values_list('pk', 'fecha_proxima_revision')
+        )
+
+        def vigente(pk, fecha):
+            if vigentes.get(pk) != fecha:
+                return False
+            # 'próximo' sólo mientras la fecha siga en el futuro
+            return fecha > ahora if cola.anticipacion else fecha <= ahora
+
+        validas = {(pk, fecha) for pk, fecha in entradas if vigente(pk, fecha)}
+        existentes = set(
+            EventoRecordatorio.objects.filter(tipo=cola.tipo, recordatorio_id__in=ids)
+            .values_list('recordatorio_id', 'fecha_proxima_revision')
+        )
+        nuevas = sorted(validas - existentes)
+        EventoRecordatorio.objects.bulk_create([
+            EventoRecordatorio(recordatorio_id=pk, tipo=cola.tipo, fecha_proxima_revision=fecha)
+            for pk, fecha in nuevas
+        ], ignore_conflicts=True)
+        if nuevas:
+            recordatorios_avisados.send(sender=self.__class__, tipo=cola.tipo, ids=[pk for pk, fecha in nuevas])
+            logger.info('%s avisos "%s" emitidos', len(nuevas), cola.tipo)
+        return len(nuevas)
+
+    def revisar_particiones(self):
+        """Una vez al día, particiones de los próximos meses para el registro de transiciones"""
+        hoy = timezone.localdate()
+        if self.particiones_revisadas == hoy:
+            return
+        try:
+            asegurar_particiones()
+        except DatabaseError:
+            logger.exception('No se pudieron crear las particiones de transiciones')
+        self.particiones_revisadas = hoy
+
+    def ejecutar_pendientes(self):
+        """Emite todos los avisos cuyo momento ya pasó"""
+        self.revisar_particiones()
+        self.atender_cambios()
+        total = 0
+        for cola in self.colas:
+            while True:
+                entradas = cola.extraer_vencidos(timezone.now())
+                if not entradas:
+                    break
+                total += self.disparar(cola, entradas)
+        return total
+
+    def espera(self):
+        """Segundos hasta el próximo aviso, acotados por el intervalo de sondeo"""
+        momentos = [m for m in (cola.siguiente() for cola in self.colas) if m is not None]
+        if not momentos:
+            return self.intervalo
+        segundos = (min(momentos) - timezone.now()).total_seconds()
+        return max(0, min(segundos, self.intervalo))
+
+    def ejecutar(self, una_vez=False):
+        while True:
+            self.ejecutar_pendientes()
+            if una_vez:
+                return
+            time.sleep(self.espera())
@@ -0,0 +1,154 @@
+import logging
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from . import cacheo, calendario, estadisticas, tiempo_real
+from .models import Documento, RecordatorioRevision, Recurrencia, CambioProgramacion
+
+logger = logging.getLogger(__name__)
+
+HORIZONTE_DIAS = 365
+TAMANO_LOTE = 2000
+
+
+def crear_recordatorios(recordatorios):
+    """bulk_create de recordatorios pendientes con su cola de avisos y contadores"""
+    if not recordatorios:
+        return 0
+    with transaction.atomic():
+        RecordatorioRevision.objects.bulk_create(recordatorios)
+        ids = [r.pk for r in recordatorios if r.pk]
+        if ids:
+            encolar_cambios(min(ids), max(ids))
+        estadisticas.incrementar(estadisticas.TOTAL_RECORDATORIOS, len(recordatorios))
+        estadisticas.incrementar(estadisticas.RECORDATORIOS_PENDIENTES, len(recordatorios))
+        tiempo_real.publicar('creado', ids)
+    cacheo.invalidar(cacheo.RECORDATORIOS)
+    calendario.invalidar(r.revisor_id for r in recordatorios)
+    return len(recordatorios)
+
+
+def encolar_cambios(desde_id, hasta_id):
+    """Encola en CambioProgramacion los pendientes del rango de ids con un INSERT ... SELECT
+
+    Evita instanciar una fila de la cola por recordatorio; si el rango incluye
+    recordatorios ajenos al lote no pasa nada, el programador valida cada aviso.
+    """
+    cola = connection.ops.quote_name(CambioProgramacion._meta.db_table)
+    tabla = connection.ops.quote_name(RecordatorioRevision._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {cola} (recordatorio_id, fecha_proxima_revision, fecha_creacion) '
+            f'SELECT id, fecha_proxima_revision, %s FROM {tabla} '
+            f'WHERE id BETWEEN %s AND %s AND estado = %s AND fecha_proxima_revision IS NOT NULL',
+            [connection.ops.adapt_datetimefield_value(timezone.now()), desde_id, hasta_id, 'pendiente']
+        )
+
+
+def documentos_de(recurrencia):
+    """Documentos aprobados a los que aplica la recurrencia
+
+    Una recurrencia propia del documento tiene prioridad sobre la de su tipo.
+    """
+    documentos = Documento.objects.filter(estado='aprobado')
+    if recurrencia.documento_id:
+        return documentos.filter(pk=recurrencia.documento_id)
+    return documentos.filter(tipo_id=recurrencia.tipo_id).exclude(
+        pk__in=Recurrencia.objects.filter(activa=True, documento__isnull=False).values('documento_id')
+    )
+
+
+def generar_recordatorios(horizonte=None, maximo=None, ahora=None, recurrencias=None, tamano_lote=TAMANO_LOTE):
+    """Materializa las revisiones de las recurrencias activas hasta ahora + horizonte
+
+    Cada documento continúa desde su última revisión generada, de modo que repetir
+    la ejecución (p. ej. a diario) sólo añade las fechas que entran en el horizonte.
+    ``maximo`` limita las revisiones futuras por documento.
+    """
+    ahora = ahora or timezone.now()
+    limite = ahora + (horizonte if horizonte is not None else timedelta(days=HORIZONTE_DIAS))
+    if recurrencias is None:
+        recurrencias = Recurrencia.objects.all()
+    total = 0
+    pendientes = []
+
+    for recurrencia in recurrencias.filter(activa=True):
+        # Las fechas son las mismas para todos los documentos: se calculan una vez,
+        # con una de más para la próxima revisión de la última
+        fechas = []
+        for fecha in recurrencia.ocurrencias(ahora):
+            fechas.append(fecha)
+            if fecha > limite:
+                break
+        ultimas = dict(
+            RecordatorioRevision.objects.filter(recurrencia=recurrencia, fecha_revision__gt=ahora)
+            .values('documento_id').annotate(ultima=Max('fecha_revision')).values_list('documento_id', 'ultima')
+        )
+
+        filas = documentos_de(recurrencia).values_list('pk', 'creado_por_id').iterator(chunk_size=tamano_lote)
+        for documento_id, creado_por_id in filas:
+            ultima = ultimas.get(documento_id)
+            inicio = bisect_right(fechas, ultima) if ultima else 0
+            fin = len(fechas) - 1
+            if maximo is not None:
+                fin = min(fin, maximo)
+            for indice in range(inicio, fin):
+                if fechas[indice] > limite:
+                    break
+                pendientes.append(RecordatorioRevision(
+                    documento_id=documento_id,
+                    recurrencia_id=recurrencia.pk,
+                    revisor_id=recurrencia.revisor_id or creado_por_id,
+                    prioridad=recurrencia.prioridad,
+                    fecha_revision=fechas[indice],
+                    fecha_proxima_revision=fechas[indice + 1],
+                ))
+            if len(pendientes) >= tamano_lote:
+                total += crear_recordatorios(pendientes)
+                pendientes = []
+
+    total += crear_recordatorios(pendientes)
+    logger.info('%s recordatorios generados hasta %s', total, limite)
+    return total
+
+
+def generar_siguientes(completados, tamano_lote=TAMANO_LOTE):
+    """Crea la revisión siguiente de cada recordatorio recurrente completado
+
+    ``completados`` son dicts con documento_id, recurrencia_id, revisor_id y
+    fecha_proxima_revision; la nueva revisión empieza en esa fecha.
+    """
+    completados = [c for c in completados if c['recurrencia_id'] and c['fecha_proxima_revision']]
+    if not completados:
+        return 0
+    recurrencias = Recurrencia.objects.filter(activa=True).in_bulk({c['recurrencia_id'] for c in completados})
+    total = 0
+    for desde in range(0, len(completados), tamano_lote):
+        lote = completados[desde:desde + tamano_lote]
+        # Superconjunto por columnas; la coincidencia exacta se comprueba en memoria
+        existentes = set(
+            RecordatorioRevision.objects.filter(
+                recurrencia_id__in={c['recurrencia_id'] for c in lote},
+                documento_id__in={c['documento_id'] for c in lote},
+                fecha_revision__in={c['fecha_proxima_revision'] for c in lote},
+            ).values_list('recurrencia_id', 'documento_id', 'fecha_revision')
+        )
+        nuevos = {}
+        for c in lote:
+            recurrencia = recurrencias.get(c['recurrencia_id'])
+            clave = (c['recurrencia_id'], c['documento_id'], c['fecha_proxima_revision'])
+            if recurrencia is None or clave in existentes:
+                continue
+            nuevos[clave] = RecordatorioRevision(
+                documento_id=c['documento_id'],
+                recurrencia_id=recurrencia.pk,
+                revisor_id=recurrencia.revisor_id or c['revisor_id'],
+                prioridad=recurrencia.prioridad,
+                fecha_revision=c['fecha_proxima_revision'],
+                fecha_proxima_revision=recurrencia.siguiente(c['fecha_proxima_revision']),
+            )
+        total += crear_recordatorios(list(nuevos.values()))
+    return total
@@ -0,0 +1,145 @@
+import json
+import statistics
+import subprocess
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.urls import reverse
+from . import calendario, urls
+from .models import Documento, RecordatorioRevision, TipoDocumento
+
+# Rutas que modifican datos: en las mediciones se ejecutan dentro de una transacción revertida
+ESCRITURAS = {'recordatorio_lote', 'recordatorio_completar'}
+
+
+def peticiones(tipo, documento, recordatorio):
+    """(nombre, método, url, datos) de cada ruta de recordatorios/urls.py
+
+    Las exportaciones se filtran para que el tiempo no dependa del tamaño de la base.
+    """
+    objetos = {
+        'api_tipo': tipo,
+        'documento_detalle': documento, 'documento_editar': documento, 'api_documento': documento,
+        'documento_historial': documento, 'documento_version': documento,
+        'recordatorio_detalle': recordatorio, 'recordatorio_editar': recordatorio,
+        'recordatorio_completar': recordatorio, 'api_recordatorio': recordatorio,
+    }
+    parametros = {
+        'documento_exportar': f'?search={documento.codigo_documento}',
+        'documento_autocompletar': f'?q={documento.codigo_documento[:5]}',
+        'recordatorio_exportar': f'?documento={documento.pk}',
+        'recordatorio_lote': f'?documento={documento.pk}',
+    }
+    resultado = []
+    for patron in urls.urlpatterns:
+        nombre = patron.name
+        kwargs = {'pk': objetos[nombre].pk} if nombre in objetos else None
+        if nombre == 'documento_version':
+            # La última versión existente: con un número fijo se mediría un 404
+            kwargs['numero'] = documento.versiones.order_by('-numero').values_list('numero', flat=True).first() or 1
+        elif nombre == 'calendario_feed':
+            kwargs = {'token': calendario.token_de(recordatorio.revisor_id)}
+        url = reverse(nombre, kwargs=kwargs)
+        url += parametros.get(nombre, '')
+        if nombre == 'recordatorio_lote':
+            resultado.append((nombre, 'post', url, {'accion': 'prioridad', 'prioridad': 'alta', 'todos': '1'}))
+        else:
+            resultado.append((nombre, 'get', url, None))
+    return resultado
+
+
+def changelists():
+    """(nombre, 'get', url, None) de la lista del admin de cada modelo registrado"""
+    return [
+        (f'admin:{modelo._meta.label_lower}', 'get',
+         reverse(f'admin:{modelo._meta.app_label}_{modelo._meta.model_name}_changelist'), None)
+        for modelo in admin.site._registry
+    ]
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def medir(cliente, metodo, url, datos, repeticiones, escritura=False):
+    """Primera petición con la caché vacía y luego ``repeticiones`` con la caché caliente"""
+    tiempos = []
+    consultas = []
+    estado = None
+    cache.clear()
+    for _ in range(repeticiones + 1):
+        with transaction.atomic() if escritura else nullcontext():
+            inicio = time.perf_counter()
+            respuesta = getattr(cliente, metodo)(url, datos) if datos else getattr(cliente, metodo)(url)
+            registro = respuesta.consultas
+            if respuesta.streaming:
+                with registro:
+                    b''.join(respuesta.streaming_content)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(registro.total)
+            estado = respuesta.status_code
+            if escritura:
+                transaction.set_rollback(True)
+    fria, calientes = tiempos[0], tiempos[1:] or tiempos
+    return {
+        'estado': estado,
+        'consultas_fria': consultas[0],
+        'consultas': consultas[-1],
+        'fria_ms': round(fria, 2),
+        'p50_ms': round(percentil(calientes, 50), 2),
+        'p95_ms': round(percentil(calientes, 95), 2),
+        'p99_ms': round(percentil(calientes, 99), 2),
+        'media_ms': round(statistics.mean(calientes), 2),
+    }
+
+
+def volumen():
+    return {
+        'tipos': TipoDocumento.objects.count(),
+        'documentos': Documento.objects.count(),
+        'recordatorios': RecordatorioRevision.objects.count(),
+    }
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=settings.BASE_DIR).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def informe(resultados, repeticiones):
+    return {
+        'commit': commit_actual(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'base': connection.vendor,
+        'repeticiones': repeticiones,
+        'volumen': volumen(),
+        'resultados': resultados,
+    }
+
+
+def comparar(previo, actual, umbral=1.2):
+    """Rutas cuyo p50 empeoró más de ``umbral`` veces o que hacen más consultas"""
+    regresiones = []
+    for nombre, medida in actual['resultados'].items():
+        anterior = previo['resultados'].get(nombre)
+        if anterior is None:
+            continue
+        if medida['consultas'] > anterior['consultas']:
+            regresiones.append(f'{nombre}: {anterior["consultas"]} -> {medida["consultas"]} consultas')
+        # Por debajo de 5 ms el ruido domina
+        if medida['p50_ms'] > max(anterior['p50_ms'], 5) * umbral:
+            regresiones.append(f'{nombre}: p50 {anterior["p50_ms"]} -> {medida["p50_ms"]} ms')
+    return regresiones
+
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
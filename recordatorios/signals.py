@@ -0,0 +1,237 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.signals import request_finished
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import TipoDocumento, Documento, RecordatorioRevision, CambioProgramacion
+from . import auditoria, cacheo, calendario, estadisticas, recurrencias, tiempo_real
+from .operaciones import recordatorios_actualizados
+from .programador import recordatorios_avisados
+from .busqueda import obtener_backend
+
+
+def _valores_previos(sender, instance, campos):
+    """Lee de la base de datos los valores guardados antes de esta escritura"""
+    if instance._state.adding or instance.pk is None:
+        return None
+    return sender.objects.filter(pk=instance.pk).values(*campos).first()
+
+
+# Ajustes de SQLite para escrituras concurrentes de varios workers
+
+@receiver(connection_created)
+def configurar_sqlite(sender, connection, **kwargs):
+    # Las bases abiertas en sólo lectura (copiar_sqlite) se dejan como están
+    if connection.vendor != 'sqlite' or 'mode=ro' in str(connection.settings_dict['NAME']):
+        return
+    with connection.cursor() as cursor:
+        # WAL: las lecturas no bloquean a la escritura ni al revés
+        cursor.execute('PRAGMA journal_mode=WAL')
+        # Con WAL, NORMAL sólo arriesga la última transacción ante un corte de luz
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(connection.settings_dict["OPTIONS"].get("timeout", 5) * 1000)}')
+
+
+# Estadísticas del dashboard
+
+@receiver(pre_save, sender=Documento)
+def documento_pre_save(sender, instance, **kwargs):
+    instance._valores_previos = _valores_previos(
+        sender, instance, ['estado', 'tipo_id', 'titulo', 'codigo_documento']
+    )
+
+
+@receiver(post_save, sender=Documento)
+def documento_post_save(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_valores_previos', None)
+    if created or previo is None:
+        estadisticas.incrementar(estadisticas.TOTAL_DOCUMENTOS, 1)
+        estadisticas.incrementar(estadisticas.DOCUMENTOS_ACTIVOS, int(instance.estado == 'aprobado'))
+        estadisticas.incrementar(estadisticas.clave_tipo(instance.tipo_id), 1, instance.tipo_id)
+        return
+
+    activo_antes = previo['estado'] == 'aprobado'
+    activo_ahora = instance.estado == 'aprobado'
+    estadisticas.incrementar(estadisticas.DOCUMENTOS_ACTIVOS, int(activo_ahora) - int(activo_antes))
+    if previo['tipo_id'] != instance.tipo_id:
+        estadisticas.incrementar(estadisticas.clave_tipo(previo['tipo_id']), -1, previo['tipo_id'])
+        estadisticas.incrementar(estadisticas.clave_tipo(instance.tipo_id), 1, instance.tipo_id)
+
+
+@receiver(post_delete, sender=Documento)
+def documento_post_delete(sender, instance, **kwargs):
+    estadisticas.incrementar(estadisticas.TOTAL_DOCUMENTOS, -1)
+    estadisticas.incrementar(estadisticas.DOCUMENTOS_ACTIVOS, -int(instance.estado == 'aprobado'))
+    estadisticas.incrementar(estadisticas.clave_tipo(instance.tipo_id), -1, instance.tipo_id)
+
+
+@receiver(pre_save, sender=RecordatorioRevision)
+def recordatorio_pre_save(sender, instance, **kwargs):
+    instance._valores_previos = _valores_previos(sender, instance, list(auditoria.CAMPOS))
+
+
+@receiver(post_save, sender=RecordatorioRevision)
+def recordatorio_post_save(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_valores_previos', None)
+    pendiente_ahora = instance.estado == 'pendiente'
+    if created or previo is None:
+        estadisticas.incrementar(estadisticas.TOTAL_RECORDATORIOS, 1)
+        estadisticas.incrementar(estadisticas.RECORDATORIOS_PENDIENTES, int(pendiente_ahora))
+        return
+
+    pendiente_antes = previo['estado'] == 'pendiente'
+    estadisticas.incrementar(estadisticas.RECORDATORIOS_PENDIENTES, int(pendiente_ahora) - int(pendiente_antes))
+
+
+@receiver(post_delete, sender=RecordatorioRevision)
+def recordatorio_post_delete(sender, instance, **kwargs):
+    estadisticas.incrementar(estadisticas.TOTAL_RECORDATORIOS, -1)
+    estadisticas.incrementar(estadisticas.RECORDATORIOS_PENDIENTES, -int(instance.estado == 'pendiente'))
+
+
+# Índice de búsqueda de documentos
+
+@receiver(post_save, sender=Documento)
+def documento_indexar(sender, instance, **kwargs):
+    obtener_backend().indexar([instance])
+
+
+@receiver(post_delete, sender=Documento)
+def documento_desindexar(sender, instance, **kwargs):
+    obtener_backend().eliminar([instance.pk])
+
+
+# Cola de cambios para el programador de avisos
+
+@receiver(post_save, sender=RecordatorioRevision)
+def recordatorio_programar(sender, instance, created, **kwargs):
+    if instance.estado != 'pendiente' or not instance.fecha_proxima_revision:
+        return
+    previo = getattr(instance, '_valores_previos', None)
+    if not created and previo is not None and (previo['estado'], previo['fecha_proxima_revision']) == (
+        instance.estado, instance.fecha_proxima_revision
+    ):
+        return
+    CambioProgramacion.objects.create(
+        recordatorio_id=instance.pk, fecha_proxima_revision=instance.fecha_proxima_revision
+    )
+
+
+# Revisión siguiente de los recordatorios recurrentes
+
+@receiver(post_save, sender=RecordatorioRevision)
+def recordatorio_recurrencia(sender, instance, created, **kwargs):
+    if instance.estado != 'completado' or not instance.recurrencia_id:
+        return
+    previo = getattr(instance, '_valores_previos', None)
+    if previo is not None and previo['estado'] == 'completado':
+        return
+    recurrencias.generar_siguientes([{
+        'documento_id': instance.documento_id,
+        'recurrencia_id': instance.recurrencia_id,
+        'revisor_id': instance.revisor_id,
+        'fecha_proxima_revision': instance.fecha_proxima_revision,
+    }])
+
+
+# Invalidación de la caché de páginas y fragmentos
+
+@receiver(post_save, sender=TipoDocumento)
+@receiver(post_delete, sender=TipoDocumento)
+def tipo_invalidar_cache(sender, **kwargs):
+    cacheo.invalidar(cacheo.TIPOS)
+
+
+@receiver(post_save, sender=Documento)
+@receiver(post_delete, sender=Documento)
+def documento_invalidar_cache(sender, **kwargs):
+    cacheo.invalidar(cacheo.DOCUMENTOS)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def usuario_invalidar_cache(sender, update_fields=None, **kwargs):
+    # Cada inicio de sesión guarda last_login: no cambia nada publicado
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    cacheo.invalidar(cacheo.USUARIOS)
+
+
+@receiver(post_save, sender=RecordatorioRevision)
+@receiver(post_delete, sender=RecordatorioRevision)
+@receiver(recordatorios_actualizados)
+def recordatorio_invalidar_cache(sender, **kwargs):
+    cacheo.invalidar(cacheo.RECORDATORIOS)
+
+
+# Eventos en tiempo real (SSE y sondeo)
+
+@receiver(post_save, sender=RecordatorioRevision)
+def recordatorio_publicar(sender, instance, created, **kwargs):
+    if created:
+        tiempo_real.publicar('creado', [instance.pk])
+        return
+    previo = getattr(instance, '_valores_previos', None)
+    if instance.estado == 'completado' and previo is not None and previo['estado'] != 'completado':
+        tiempo_real.publicar('completado', [instance.pk])
+
+
+@receiver(recordatorios_actualizados)
+def operacion_publicar(sender, accion, ids, **kwargs):
+    if accion == 'completar':
+        tiempo_real.publicar('completado', ids)
+
+
+@receiver(recordatorios_avisados)
+def aviso_publicar(sender, tipo, ids, **kwargs):
+    tiempo_real.publicar(tipo, ids)
+
+
+# Calendarios iCalendar de los revisores
+
+@receiver(post_save, sender=RecordatorioRevision)
+def recordatorio_calendario(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_valores_previos', None)
+    calendario.invalidar([instance.revisor_id] + ([previo['revisor_id']] if previo else []))
+
+
+@receiver(post_delete, sender=RecordatorioRevision)
+def recordatorio_calendario_borrado(sender, instance, **kwargs):
+    calendario.invalidar([instance.revisor_id])
+
+
+@receiver(recordatorios_actualizados)
+def operacion_calendario(sender, revisores, **kwargs):
+    calendario.invalidar(revisores)
+
+
+@receiver(post_save, sender=Documento)
+def documento_calendario(sender, instance, created, **kwargs):
+    # El título y el código aparecen en los eventos de sus recordatorios abiertos
+    previo = getattr(instance, '_valores_previos', None)
+    if previo is None or (previo['titulo'], previo['codigo_documento']) == (instance.titulo, instance.codigo_documento):
+        return
+    calendario.invalidar(
+        RecordatorioRevision.objects.filter(documento=instance, estado__in=calendario.ESTADOS)
+        .values_list('revisor_id', flat=True).distinct()
+    )
+
+
+# Registro de transiciones
+
+@receiver(post_save, sender=RecordatorioRevision)
+def recordatorio_auditar(sender, instance, created, **kwargs):
+    previo = getattr(instance, '_valores_previos', None)
+    if created or previo is None:
+        return
+    auditoria.registrar(auditoria.transiciones('edicion', [
+        (instance.pk, atributo, previo[atributo], getattr(instance, atributo)) for atributo in auditoria.CAMPOS
+    ]))
+
+
+@receiver(request_finished)
+def auditoria_vaciar(sender, **kwargs):
+    # Tras enviar la respuesta: la escritura no se suma al tiempo de la petición
+    if not settings.AUDITORIA_HILO:
+        auditoria.vaciar()
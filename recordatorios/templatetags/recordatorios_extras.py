@@ -0,0 +1,87 @@
+import calendar
+import datetime
+
+from django import template
+from django.db import models
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+@register.filter
+def abs_value(valor):
+    """Valor absoluto; deja sin cambios lo que no es numérico"""
+    try:
+        return abs(valor)
+    except TypeError:
+        return valor
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def jerarquia_fechas(cl):
+    """date_hierarchy del admin sin SELECT DISTINCT de años, meses o días
+
+    Las opciones salen del rango Min/Max del campo (dos búsquedas en su
+    índice); puede haber años, meses o días sin filas.
+    """
+    campo = cl.date_hierarchy
+    campo_anio, campo_mes, campo_dia = f'{campo}__year', f'{campo}__month', f'{campo}__day'
+    anio, mes, dia = (cl.params.get(nombre) for nombre in (campo_anio, campo_mes, campo_dia))
+
+    def enlace(filtros):
+        return cl.get_query_string(filtros, [f'{campo}__'])
+
+    rango = cl.queryset.select_related(None).order_by().aggregate(primera=models.Min(campo), ultima=models.Max(campo))
+    primera, ultima = rango['primera'], rango['ultima']
+    if primera is None or ultima is None:
+        return {'show': False}
+    if isinstance(primera, datetime.datetime):
+        primera, ultima = (timezone.localtime(v) if timezone.is_aware(v) else v for v in (primera, ultima))
+    if not (anio or mes or dia) and primera.year == ultima.year:
+        anio = primera.year
+        if primera.month == ultima.month:
+            mes = primera.month
+
+    if anio and mes and dia:
+        fecha = datetime.date(int(anio), int(mes), int(dia))
+        return {
+            'show': True,
+            'back': {'link': enlace({campo_anio: anio, campo_mes: mes}),
+                     'title': capfirst(formats.date_format(fecha, 'YEAR_MONTH_FORMAT'))},
+            'choices': [{'title': capfirst(formats.date_format(fecha, 'MONTH_DAY_FORMAT'))}],
+        }
+    if anio and mes:
+        anio, mes = int(anio), int(mes)
+        dias = range(1, calendar.monthrange(anio, mes)[1] + 1)
+        return {
+            'show': True,
+            'back': {'link': enlace({campo_anio: anio}), 'title': str(anio)},
+            'choices': [
+                {'link': enlace({campo_anio: anio, campo_mes: mes, campo_dia: d}),
+                 'title': capfirst(formats.date_format(datetime.date(anio, mes, d), 'MONTH_DAY_FORMAT'))}
+                for d in dias
+                if (primera.year, primera.month, primera.day) <= (anio, mes, d) <= (ultima.year, ultima.month, ultima.day)
+            ],
+        }
+    if anio:
+        anio = int(anio)
+        return {
+            'show': True,
+            'back': {'link': enlace({}), 'title': _('All dates')},
+            'choices': [
+                {'link': enlace({campo_anio: anio, campo_mes: m}),
+                 'title': capfirst(formats.date_format(datetime.date(anio, m, 1), 'YEAR_MONTH_FORMAT'))}
+                for m in range(1, 13)
+                if (primera.year, primera.month) <= (anio, m) <= (ultima.year, ultima.month)
+            ],
+        }
+    return {
+        'show': True,
+        'back': None,
+        'choices': [
+            {'link': enlace({campo_anio: a}), 'title': str(a)}
+            for a in range(primera.year, ultima.year + 1)
+        ],
+    }
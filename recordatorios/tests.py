@@ -1,3 +1,1220 @@
+import asyncio
+import csv
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.http import Http404
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .busqueda import buscar_documentos
+from .estadisticas import calcular_estadisticas, obtener_estadisticas
+from .importacion import ImportadorDocumentos, ImportadorRecordatorios
+from .models import (
+    Documento, RecordatorioRevision, TipoDocumento, EnvioResumen, CambioProgramacion, Recurrencia, TransicionRecordatorio,
+    EventoRecordatorio, EstadisticaDashboard, Secuencia,
+)
+from .notificaciones import enviar_resumenes
+from .paginacion import PaginadorCursor, codificar_cursor
+from .programador import ColaAvisos, Programador
+from . import (
+    analitica, api, auditoria, calendario, exportacion, operaciones, recurrencias, rendimiento, tiempo_real, versiones,
+)
+from .consultas import PresupuestoConsultasMixin
+
+
+# Los tests no ejecutan collectstatic: sin staticfiles.json el almacenamiento con
+# manifiesto no puede resolver {% static %}, así que se usa el normal
+_sin_manifiesto = override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+def setUpModule():
+    _sin_manifiesto.enable()
+
+
+def tearDownModule():
+    _sin_manifiesto.disable()
+
+
+class IndicesRecordatorioTests(TestCase):
+    """Comprueba con EXPLAIN que las consultas frecuentes usan sus índices"""
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user('revisor', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Ensayo de tracción', codigo_documento='LAB-DOC-001', tipo=tipo, creado_por=usuario
+        )
+        ahora = timezone.now()
+        for dias in range(-5, 5):
+            RecordatorioRevision.objects.create(
+                documento=documento, revisor=usuario, fecha_revision=ahora + timedelta(days=dias)
+            )
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Con tablas tan pequeñas el planificador prefiere un seq scan
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertUsaIndice(self, queryset, indices):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            self.skipTest(f'EXPLAIN no verificado en {connection.vendor}')
+        plan = queryset.explain()
+        self.assertTrue(any(indice in plan for indice in indices), plan)
+
+    def test_recordatorios_proximos(self):
+        queryset = RecordatorioRevision.objects.filter(
+            fecha_proxima_revision__lte=timezone.now() + timedelta(days=7),
+            estado='pendiente'
+        ).order_by('fecha_proxima_revision')[:5]
+        self.assertUsaIndice(queryset, ['recordatorio_pendiente_idx', 'recordatorio_estado_prox_idx'])
+
+    def test_recordatorios_vencidos(self):
+        queryset = RecordatorioRevision.objects.filter(
+            fecha_proxima_revision__lt=timezone.now(),
+            estado='pendiente'
+        ).order_by('fecha_proxima_revision')[:5]
+        self.assertUsaIndice(queryset, ['recordatorio_pendiente_idx', 'recordatorio_estado_prox_idx'])
+
+    def test_filtro_vencidos_lista(self):
+        queryset = RecordatorioRevision.objects.filter(
+            fecha_proxima_revision__lt=timezone.now(),
+            estado='pendiente'
+        ).order_by('-fecha_revision')
+        self.assertUsaIndice(queryset, ['recordatorio_pendiente_idx', 'recordatorio_estado_prox_idx'])
+
+    def test_filtro_estado_prioridad(self):
+        queryset = RecordatorioRevision.objects.filter(
+            estado='pendiente', prioridad='alta'
+        ).order_by('-fecha_revision')[:20]
+        self.assertUsaIndice(queryset, ['recordatorio_est_prio_idx'])
+
+    def test_lista_por_fecha_revision(self):
+        queryset = RecordatorioRevision.objects.order_by('-fecha_revision')[:20]
+        self.assertUsaIndice(queryset, ['recordatorio_fecha_rev_idx'])
+
+    def test_urgencia_en_sql(self):
+        ahora = timezone.now()
+        pks = list(RecordatorioRevision.objects.order_by('pk').values_list('pk', flat=True))
+        for pk, dias in zip(pks, [-3, 0, 3, 7, 8, 30]):
+            RecordatorioRevision.objects.filter(pk=pk).update(fecha_proxima_revision=ahora + timedelta(days=dias))
+        RecordatorioRevision.objects.filter(pk=pks[-1]).update(fecha_proxima_revision=None)
+        # La anotación coincide con el cálculo en Python de cada fila
+        for recordatorio in RecordatorioRevision.objects.con_urgencia():
+            self.assertEqual(recordatorio.urgencia, RecordatorioRevision.objects.get(pk=recordatorio.pk).nivel_urgencia())
+        self.assertEqual(
+            RecordatorioRevision.objects.filtrar_urgencia(RecordatorioRevision.URGENCIA_VENCIDO).count(), 1
+        )
+        queryset = RecordatorioRevision.objects.filter(estado='pendiente').filtrar_urgencia(
+            RecordatorioRevision.URGENCIA_PROXIMO
+        ).order_by('fecha_proxima_revision')[:5]
+        self.assertUsaIndice(queryset, ['recordatorio_pendiente_idx', 'recordatorio_estado_prox_idx'])
+
+
+class EstadisticasDashboardTests(TestCase):
+    """Los contadores que mantienen las señales coinciden con un recálculo completo"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        cls.procedimiento = TipoDocumento.objects.create(nombre='Procedimiento')
+        cls.norma = TipoDocumento.objects.create(nombre='Norma')
+
+    def assertContadores(self):
+        valores, por_tipo = calcular_estadisticas()
+        estadisticas = obtener_estadisticas()
+        self.assertEqual({clave: estadisticas[clave] for clave in valores}, valores)
+        self.assertEqual(
+            {tipo.pk: tipo.total_documentos for tipo in estadisticas['documentos_por_tipo']},
+            {pk: total for pk, total in por_tipo.items() if total}
+        )
+
+    def test_crear_cambiar_y_borrar(self):
+        documento = Documento.objects.create(
+            titulo='Ensayo de tracción', codigo_documento='LAB-EST-1', tipo=self.procedimiento,
+            creado_por=self.usuario
+        )
+        recordatorio = RecordatorioRevision.objects.create(
+            documento=documento, revisor=self.usuario, fecha_revision=timezone.now()
+        )
+        self.assertContadores()
+
+        documento.estado = 'aprobado'
+        documento.tipo = self.norma
+        documento.save()
+        recordatorio.estado = 'completado'
+        recordatorio.save()
+        self.assertContadores()
+        self.assertEqual(obtener_estadisticas()['documentos_activos'], 1)
+
+        recordatorio.delete()
+        documento.delete()
+        self.assertContadores()
+        self.assertEqual(obtener_estadisticas()['total_documentos'], 0)
+
+    def test_tabla_sin_inicializar(self):
+        Documento.objects.create(
+            titulo='Ensayo de dureza', codigo_documento='LAB-EST-2', tipo=self.norma, creado_por=self.usuario
+        )
+        # Base existente sin contadores: la primera escritura no deja una fila parcial
+        EstadisticaDashboard.objects.all().delete()
+        RecordatorioRevision.objects.create(
+            documento=Documento.objects.get(), revisor=self.usuario, fecha_revision=timezone.now()
+        )
+        self.assertContadores()
+        self.assertEqual(obtener_estadisticas()['total_documentos'], 1)
+
+
+class ResumenesCorreoTests(TestCase):
+    """Resúmenes por revisor enviados con el backend locmem"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = User.objects.create_user('ana', email='ana@laboratorio.com', password='secreta123')
+        cls.luis = User.objects.create_user('luis', email='luis@laboratorio.com', password='secreta123')
+        sin_correo = User.objects.create_user('sincorreo', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Ensayo de dureza', codigo_documento='LAB-DOC-002', tipo=tipo, creado_por=cls.ana
+        )
+        ahora = timezone.now()
+        for revisor, dias in [(cls.ana, -2), (cls.ana, 3), (cls.luis, 5), (cls.luis, 30), (sin_correo, 1)]:
+            RecordatorioRevision.objects.create(
+                documento=documento, revisor=revisor, fecha_revision=ahora,
+                fecha_proxima_revision=ahora + timedelta(days=dias)
+            )
+
+    def test_un_resumen_por_revisor(self):
+        self.assertEqual(enviar_resumenes(), 2)
+        destinatarios = sorted(mensaje.to[0] for mensaje in mail.outbox)
+        self.assertEqual(destinatarios, ['ana@laboratorio.com', 'luis@laboratorio.com'])
+        resumen_ana = next(m for m in mail.outbox if m.to == ['ana@laboratorio.com'])
+        self.assertIn('Recordatorios vencidos (1)', resumen_ana.body)
+        self.assertIn('LAB-DOC-002', resumen_ana.body)
+
+    def test_envio_idempotente(self):
+        enviar_resumenes()
+        self.assertEqual(enviar_resumenes(), 0)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(EnvioResumen.objects.count(), 2)
+
+    def test_fallo_a_mitad_de_lote(self):
+        conexion = mail.get_connection()
+        enviar = conexion.send_messages
+        fallos = iter([None, ConnectionError('SMTP caído')])
+
+        def enviar_o_fallar(mensajes):
+            error = next(fallos)
+            if error:
+                raise error
+            return enviar(mensajes)
+
+        with mock.patch.object(conexion, 'send_messages', side_effect=enviar_o_fallar):
+            with self.assertRaises(ConnectionError):
+                enviar_resumenes(connection=conexion)
+        # El primer correo quedó registrado; el que falló no
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(list(EnvioResumen.objects.values_list('revisor__email', flat=True)), mail.outbox[0].to)
+
+        self.assertEqual(enviar_resumenes(), 1)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['ana@laboratorio.com', 'luis@laboratorio.com'])
+
+        # Un envío que no entrega nada no se registra
+        EnvioResumen.objects.all().delete()
+        with mock.patch.object(conexion, 'send_messages', return_value=0):
+            self.assertEqual(enviar_resumenes(connection=conexion), 0)
+        self.assertFalse(EnvioResumen.objects.exists())
+
+
+class OperacionesLoteTests(TestCase):
+    """Operaciones en lote con un solo UPDATE"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = User.objects.create_user('ana', password='secreta123')
+        cls.luis = User.objects.create_user('luis', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Ensayo de impacto', codigo_documento='LAB-DOC-003', tipo=tipo, creado_por=cls.ana
+        )
+        cls.ahora = timezone.now()
+        cls.completado_antes = cls.ahora - timedelta(days=10)
+        for estado in ['pendiente', 'pendiente', 'en_proceso']:
+            RecordatorioRevision.objects.create(
+                documento=documento, revisor=cls.ana, fecha_revision=cls.ahora, estado=estado
+            )
+        RecordatorioRevision.objects.create(
+            documento=documento, revisor=cls.ana, fecha_revision=cls.ahora, estado='cancelado',
+            fecha_completado=cls.completado_antes
+        )
+
+    def test_completar_conserva_fecha_completado(self):
+        obtener_estadisticas()
+        with CaptureQueriesContext(connection) as consultas:
+            total = operaciones.completar(RecordatorioRevision.objects.all())
+        actualizaciones = [
+            c['sql'] for c in consultas.captured_queries
+            if c['sql'].startswith('UPDATE "recordatorios_recordatoriorevision"')
+        ]
+        self.assertEqual(len(actualizaciones), 1)
+        self.assertEqual(total, 4)
+        self.assertFalse(RecordatorioRevision.objects.exclude(estado='completado').exists())
+        self.assertFalse(RecordatorioRevision.objects.filter(fecha_completado__isnull=True).exists())
+        self.assertTrue(RecordatorioRevision.objects.filter(fecha_completado=self.completado_antes).exists())
+        self.assertEqual(obtener_estadisticas()['recordatorios_pendientes'], 0)
+
+    def test_reprogramar_encola_pendientes(self):
+        CambioProgramacion.objects.all().delete()
+        total = operaciones.reprogramar(RecordatorioRevision.objects.all(), desplazamiento=timedelta(days=5))
+        self.assertEqual(total, 4)
+        esperada = self.ahora + timedelta(days=35)
+        self.assertEqual(
+            set(RecordatorioRevision.objects.values_list('fecha_proxima_revision', flat=True)), {esperada}
+        )
+        self.assertEqual(CambioProgramacion.objects.filter(fecha_proxima_revision=esperada).count(), 2)
+
+    def test_guardar_sin_cambio_de_fecha_no_encola(self):
+        recordatorio = RecordatorioRevision.objects.filter(estado='pendiente').first()
+        CambioProgramacion.objects.all().delete()
+        recordatorio.observaciones = 'Revisar la norma nueva'
+        recordatorio.prioridad = 'alta'
+        recordatorio.save()
+        self.assertFalse(CambioProgramacion.objects.exists())
+        recordatorio.fecha_proxima_revision += timedelta(days=1)
+        recordatorio.save()
+        self.assertEqual(CambioProgramacion.objects.get().fecha_proxima_revision, recordatorio.fecha_proxima_revision)
+
+    def test_reasignar(self):
+        total = operaciones.reasignar(RecordatorioRevision.objects.filter(estado='pendiente'), self.luis)
+        self.assertEqual(total, 2)
+        self.assertEqual(RecordatorioRevision.objects.filter(revisor=self.luis).count(), 2)
+
+
+class ImportacionCSVTests(TestCase):
+    """Importación por lotes desde un CSV en memoria"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        cls.tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        Documento.objects.create(
+            titulo='Ensayo de tracción', codigo_documento='LAB-IMP-1', tipo=cls.tipo, creado_por=cls.usuario,
+            estado='aprobado'
+        )
+
+    def csv(self, *lineas):
+        return StringIO('\n'.join(lineas) + '\n')
+
+    def documentos(self):
+        return self.csv(
+            'codigo_documento,titulo,descripcion,tipo,version,estado,creado_por',
+            'LAB-IMP-1,Ensayo de tracción v2,Revisado,procedimiento,2.0,aprobado,',
+            'LAB-IMP-2,Ensayo de dureza,,Procedimiento,,,ana',
+            'LAB-IMP-3,Ensayo de fatiga,,Procedimiento,,,',
+            'LAB-IMP-4,Sin tipo,,Inexistente,,,',
+            'LAB-IMP-5,Sin usuario,,Procedimiento,,,nadie',
+        )
+
+    def test_crea_y_actualiza_por_codigo(self):
+        resultado = ImportadorDocumentos(usuario=self.usuario).importar(self.documentos())
+        self.assertEqual((resultado.creados, resultado.actualizados), (2, 1))
+        self.assertEqual([fila for fila, mensaje in resultado.errores], [5, 6])
+        actualizado = Documento.objects.get(codigo_documento='LAB-IMP-1')
+        self.assertEqual((actualizado.titulo, actualizado.version), ('Ensayo de tracción v2', '2.0'))
+        self.assertEqual(Documento.objects.count(), 3)
+
+    def test_dry_run_valida_sin_escribir(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resultado = ImportadorDocumentos(usuario=self.usuario, dry_run=True).importar(self.documentos())
+        self.assertEqual(resultado.validos, 3)
+        self.assertEqual((resultado.creados, resultado.actualizados), (0, 0))
+        self.assertEqual(resultado.errores, [
+            (5, 'Tipo de documento inexistente: Inexistente'),
+            (6, 'Usuario inexistente: nadie'),
+        ])
+        self.assertFalse(any(
+            c['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')) for c in consultas.captured_queries
+        ))
+        self.assertEqual(Documento.objects.get(codigo_documento='LAB-IMP-1').titulo, 'Ensayo de tracción')
+
+    def test_lotes_y_valores_por_defecto(self):
+        importador = ImportadorDocumentos(usuario=self.usuario, tamano_lote=2)
+        with mock.patch.object(Documento.objects, 'bulk_create', wraps=Documento.objects.bulk_create) as bulk_create:
+            importador.importar(self.documentos())
+        # Cinco filas en lotes de dos: el primero trae la actualización de LAB-IMP-1
+        self.assertEqual([len(llamada.args[0]) for llamada in bulk_create.call_args_list], [1, 1])
+        nuevo = Documento.objects.get(codigo_documento='LAB-IMP-3')
+        self.assertEqual((nuevo.version, nuevo.estado, nuevo.creado_por), ('1.0', 'borrador', self.usuario))
+
+        ahora = timezone.now()
+        resultado = ImportadorRecordatorios(usuario=self.usuario, tamano_lote=2).importar(self.csv(
+            'codigo_documento,fecha_revision,fecha_proxima_revision,revisor,estado,prioridad,observaciones',
+            f'LAB-IMP-1,{ahora:%Y-%m-%d %H:%M},{ahora + timedelta(days=30):%Y-%m-%d %H:%M},,,,Anual',
+            f'LAB-IMP-3,{ahora:%Y-%m-%d %H:%M},,,,,Documento en borrador',
+        ))
+        self.assertEqual(resultado.creados, 1)
+        self.assertEqual(resultado.errores, [(3, 'Documento inexistente o no aprobado: LAB-IMP-3')])
+        recordatorio = RecordatorioRevision.objects.get()
+        self.assertEqual(
+            (recordatorio.estado, recordatorio.prioridad, recordatorio.revisor), ('pendiente', 'media', self.usuario)
+        )
+        self.assertTrue(CambioProgramacion.objects.filter(recordatorio_id=recordatorio.pk).exists())
+
+
+class ExportacionCSVTests(TestCase):
+    """CSV en streaming con los filtros de la lista"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Calibración')
+        for codigo, titulo, estado in [
+            ('LAB-EXP-1', 'Ensayo de tracción', 'aprobado'),
+            ('LAB-EXP-2', 'Módulo "E", acero', 'aprobado'),
+            ('LAB-EXP-3', 'Borrador de dureza', 'borrador'),
+        ]:
+            Documento.objects.create(
+                titulo=titulo, codigo_documento=codigo, descripcion='Línea 1\nLínea 2', tipo=tipo,
+                creado_por=cls.usuario, estado=estado
+            )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def exportar(self, **parametros):
+        respuesta = self.client.get('/documentos/exportar/', parametros)
+        self.assertTrue(respuesta.streaming)
+        return respuesta, b''.join(respuesta.streaming_content)
+
+    def test_cabecera_filas_y_codificacion(self):
+        respuesta, contenido = self.exportar(estado='aprobado')
+        self.assertEqual(respuesta['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertRegex(respuesta['Content-Disposition'], r'^attachment; filename="documentos_\d{8}\.csv"$')
+        filas = list(csv.reader(StringIO(contenido.decode('utf-8'))))
+        self.assertEqual(filas[0], [nombre for nombre, campo in exportacion.COLUMNAS_DOCUMENTOS])
+        por_codigo = {fila[0]: dict(zip(filas[0], fila)) for fila in filas[1:]}
+        # Sólo los aprobados; comillas, comas, saltos de línea y acentos sobreviven al ida y vuelta
+        self.assertEqual(set(por_codigo), {'LAB-EXP-1', 'LAB-EXP-2'})
+        fila = por_codigo['LAB-EXP-2']
+        self.assertEqual((fila['titulo'], fila['descripcion']), ('Módulo "E", acero', 'Línea 1\nLínea 2'))
+        self.assertEqual((fila['tipo'], fila['creado_por']), ('Calibración', 'ana'))
+        fecha = timezone.localtime(Documento.objects.get(codigo_documento='LAB-EXP-2').fecha_creacion)
+        self.assertEqual(fila['fecha_creacion'], fecha.strftime('%Y-%m-%d %H:%M'))
+
+    def test_bloques_y_formato_desconocido(self):
+        with mock.patch.object(exportacion, 'TAMANO_LOTE', 1):
+            respuesta = self.client.get('/documentos/exportar/')
+            bloques = list(respuesta.streaming_content)
+        # La cabecera va sola, luego un bloque por fila
+        self.assertEqual(len(bloques), 4)
+        self.assertEqual(self.client.get('/documentos/exportar/', {'formato': 'xml'}).status_code, 404)
+
+
+class RecurrenciasTests(TestCase):
+    """Generación de revisiones periódicas por tipo de documento"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        cls.tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        for numero in range(3):
+            Documento.objects.create(
+                titulo=f'Ensayo {numero}', codigo_documento=f'LAB-REC-{numero}', tipo=cls.tipo,
+                creado_por=cls.usuario, estado='aprobado'
+            )
+        cls.recurrencia = Recurrencia.objects.create(
+            tipo=cls.tipo, regla='mes', intervalo=3, dia_semana=0, semana=1,
+            fecha_inicio=timezone.make_aware(datetime(2025, 1, 1, 9, 0))
+        )
+
+    def test_primer_lunes_del_trimestre(self):
+        fechas = self.recurrencia.ocurrencias(timezone.make_aware(datetime(2025, 2, 1)))
+        dias = [timezone.localtime(next(fechas)).date().isoformat() for i in range(3)]
+        self.assertEqual(dias, ['2025-04-07', '2025-07-07', '2025-10-06'])
+
+    def test_generar_y_continuar(self):
+        ahora = timezone.make_aware(datetime(2025, 2, 1))
+        self.assertEqual(recurrencias.generar_recordatorios(ahora=ahora), 12)
+        # Repetir no duplica; ampliar el horizonte sólo añade lo nuevo
+        self.assertEqual(recurrencias.generar_recordatorios(ahora=ahora), 0)
+        self.assertEqual(recurrencias.generar_recordatorios(ahora=ahora, horizonte=timedelta(days=450)), 3)
+        ultima = RecordatorioRevision.objects.order_by('-fecha_revision').first()
+        self.assertEqual(ultima.fecha_proxima_revision, self.recurrencia.siguiente(ultima.fecha_revision))
+
+    def test_completar_crea_la_siguiente(self):
+        primera = self.recurrencia.siguiente(timezone.now())
+        recordatorio = RecordatorioRevision.objects.create(
+            documento=Documento.objects.first(), revisor=self.usuario, recurrencia=self.recurrencia,
+            fecha_revision=primera
+        )
+        operaciones.completar(RecordatorioRevision.objects.filter(pk=recordatorio.pk))
+        siguiente = RecordatorioRevision.objects.get(estado='pendiente')
+        self.assertEqual(siguiente.fecha_revision, recordatorio.fecha_proxima_revision)
+        self.assertEqual(siguiente.recurrencia, self.recurrencia)
+
+
+class CacheVistasTests(TestCase):
+    """Fragmentos cacheados e invalidación por generaciones"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        cls.documento = Documento.objects.create(
+            titulo='Ensayo de fatiga', codigo_documento='LAB-CACHE-1', tipo=tipo, creado_por=cls.usuario
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+
+    def test_lista_cacheada_e_invalidada(self):
+        self.client.get('/documentos/')
+        with CaptureQueriesContext(connection) as consultas:
+            self.client.get('/documentos/')
+        self.assertFalse(any('recordatorios_documento' in c['sql'] for c in consultas.captured_queries))
+
+        self.documento.titulo = 'Ensayo de fluencia'
+        self.documento.save()
+        self.assertContains(self.client.get('/documentos/'), 'Ensayo de fluencia')
+
+    def test_renombrar_usuario_invalida_fragmentos(self):
+        self.documento.estado = 'aprobado'
+        self.documento.save()
+        # Un revisor distinto del usuario de la sesión, cuyo nombre no sale en la barra
+        revisor = User.objects.create_user('luis', password='secreta123')
+        recordatorio = RecordatorioRevision.objects.create(
+            documento=self.documento, revisor=revisor, fecha_revision=timezone.now()
+        )
+        for url in ['/recordatorios/', f'/recordatorios/{recordatorio.pk}/']:
+            self.client.get(url)
+        revisor.first_name, revisor.last_name = 'Luis', 'Beltrán'
+        revisor.save()
+        for url in ['/recordatorios/', f'/recordatorios/{recordatorio.pk}/']:
+            with self.subTest(url):
+                self.assertContains(self.client.get(url), 'Luis Beltrán')
+
+
+class PaginacionCursorTests(TestCase):
+    """Keyset sobre el orden del modelo con desempate por id"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Ensayo de impacto', codigo_documento='LAB-PAG-1', tipo=tipo, creado_por=cls.usuario
+        )
+        ahora = timezone.now()
+        # Cinco filas con la misma fecha: sólo el id las distingue
+        for dias in [0, 0, 0, 0, 0, -1, -2]:
+            RecordatorioRevision.objects.create(
+                documento=documento, revisor=cls.usuario, fecha_revision=ahora + timedelta(days=dias)
+            )
+        cls.esperado = list(RecordatorioRevision.objects.order_by('-fecha_revision', 'id').values_list('pk', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def paginador(self, **kwargs):
+        return PaginadorCursor(RecordatorioRevision.objects.all(), 3, **kwargs)
+
+    def pks(self, pagina):
+        return [recordatorio.pk for recordatorio in pagina]
+
+    def test_siguiente_anterior_y_ultima(self):
+        primera = self.paginador().pagina()
+        self.assertEqual(self.pks(primera), self.esperado[:3])
+        self.assertFalse(primera.has_previous())
+        self.assertIsNone(primera.cursor_anterior)
+
+        segunda = self.paginador().pagina(primera.cursor_siguiente)
+        tercera = self.paginador().pagina(segunda.cursor_siguiente)
+        self.assertEqual(self.pks(segunda), self.esperado[3:6])
+        self.assertEqual(self.pks(tercera), self.esperado[6:])
+        self.assertTrue(tercera.has_previous())
+        self.assertFalse(tercera.has_next())
+
+        anterior = self.paginador().pagina(tercera.cursor_anterior)
+        self.assertEqual(self.pks(anterior), self.esperado[3:6])
+        self.assertTrue(anterior.has_previous())
+        self.assertTrue(anterior.has_next())
+
+        ultima = self.paginador().pagina(codificar_cursor([], 'u'))
+        self.assertEqual(self.pks(ultima), self.esperado[-3:])
+        self.assertTrue(ultima.has_previous())
+        self.assertFalse(ultima.has_next())
+
+    def test_desempate_por_id(self):
+        # El cursor a mitad del grupo de fechas iguales no salta ni repite filas
+        paginador = PaginadorCursor(RecordatorioRevision.objects.all(), 2)
+        self.assertEqual(paginador.campos, [('fecha_revision', True), ('id', False)])
+        vistos, pagina = [], paginador.pagina()
+        while True:
+            vistos += self.pks(pagina)
+            if not pagina.has_next():
+                break
+            pagina = paginador.pagina(pagina.cursor_siguiente)
+        self.assertEqual(vistos, self.esperado)
+
+    def test_cursor_invalido(self):
+        valido = self.paginador().pagina().cursor_siguiente
+        for cursor in ['basura!', valido[:-4], codificar_cursor([1], 'n'), codificar_cursor([1, 2], 'x')]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(Http404):
+                    self.paginador().pagina(cursor)
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get('/recordatorios/', {'cursor': 'basura!'}).status_code, 404)
+
+    def test_total_estimado(self):
+        self.assertEqual(self.paginador().count, 7)
+        self.assertIsNone(self.paginador(contar_total=False).count)
+        # El total se cachea por consulta: una fila nueva no se cuenta hasta que caduca
+        RecordatorioRevision.objects.create(
+            documento=Documento.objects.get(), revisor=self.usuario, fecha_revision=timezone.now()
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.paginador().count, 7)
+        cache.clear()
+        self.assertEqual(self.paginador().count, 8)
+
+
+class APITests(TestCase):
+    """API de sólo lectura: campos a elección, cursor y GET condicional"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        for i in range(3):
+            Documento.objects.create(
+                titulo=f'Documento {i}', codigo_documento=f'LAB-API-{i}', tipo=tipo, creado_por=cls.usuario
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_autenticacion_y_paginacion(self):
+        self.assertEqual(self.client.get('/api/v1/documentos/').status_code, 401)
+        self.client.force_login(self.usuario)
+        datos = self.client.get('/api/v1/documentos/?limite=2&campos=id,codigo_documento').json()
+        self.assertEqual(datos['total'], 3)
+        self.assertEqual(set(datos['resultados'][0]), {'id', 'codigo_documento'})
+        siguiente = self.client.get(datos['siguiente']).json()
+        codigos = {d['codigo_documento'] for d in datos['resultados'] + siguiente['resultados']}
+        self.assertEqual(len(codigos), 3)
+        self.assertIsNone(siguiente['siguiente'])
+        self.assertEqual(self.client.get('/api/v1/documentos/?campos=clave').status_code, 400)
+
+    def test_get_condicional(self):
+        self.client.force_login(self.usuario)
+        respuesta = self.client.get('/api/v1/documentos/')
+        etag = respuesta['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get('/api/v1/documentos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertFalse(any('recordatorios_documento' in c['sql'] for c in consultas.captured_queries))
+
+        Documento.objects.filter(codigo_documento='LAB-API-0').get().save()
+        self.assertEqual(self.client.get('/api/v1/documentos/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_cambia_con_tablas_relacionadas(self):
+        self.client.force_login(self.usuario)
+        documento = Documento.objects.first()
+        urls = ['/api/v1/documentos/', f'/api/v1/documentos/{documento.pk}/']
+        for cambio in [
+            lambda: TipoDocumento.objects.filter(pk=documento.tipo_id).get().save(),
+            lambda: User.objects.filter(pk=self.usuario.pk).get().save(),
+        ]:
+            etags = [self.client.get(url)['ETag'] for url in urls]
+            cambio()
+            for url, etag in zip(urls, etags):
+                with self.subTest(url):
+                    self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        # Iniciar sesión sólo guarda last_login
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.client.login(username='ana', password='secreta123')
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_last_modified_sigue_al_etag(self):
+        self.client.force_login(self.usuario)
+        url = f'/api/v1/documentos/{Documento.objects.first().pk}/'
+        fecha = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=fecha).status_code, 304)
+        # Un cambio sólo en una tabla relacionada también adelanta la fecha
+        despues = time.time() + 5
+        with mock.patch.object(api, 'time', mock.Mock(time=lambda: despues)):
+            User.objects.filter(pk=self.usuario.pk).get().save()
+            respuesta = self.client.get(url, HTTP_IF_MODIFIED_SINCE=fecha)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Last-Modified'], http_date(int(despues)))
+
+
+class BusquedaDocumentosTests(TestCase):
+    """Índice de texto completo (FTS5 en SQLite): raíces, acentos, rango y prefijo de código"""
+
+    @classmethod
+    def setUpTestData(cls):
+        usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        for codigo, titulo, descripcion in [
+            ('LAB-BUS-1', 'Calibración de balanzas', ''),
+            ('LAB-BUS-2', 'Ensayo de tracción', 'Incluye la calibración del extensómetro'),
+            ('LAB-BUS-3', 'Ensayos de dureza', 'Escala Rockwell'),
+            ('PRO-7', 'Manual de calidad', ''),
+        ]:
+            Documento.objects.create(titulo=titulo, codigo_documento=codigo, descripcion=descripcion,
+                                     tipo=tipo, creado_por=usuario)
+
+    def codigos(self, termino, relevancia=True):
+        return [d.codigo_documento for d in buscar_documentos(Documento.objects.all(), termino, relevancia)]
+
+    def test_raices_acentos_y_rango(self):
+        self.assertEqual(connection.vendor, 'sqlite')
+        # Sin acento y en plural; el título pesa más que la descripción
+        self.assertEqual(self.codigos('calibraciones'), ['LAB-BUS-1', 'LAB-BUS-2'])
+        self.assertEqual(sorted(self.codigos('ensayo')), ['LAB-BUS-2', 'LAB-BUS-3'])
+        # Prefijo de la última palabra, como al escribir
+        self.assertEqual(self.codigos('rockw'), ['LAB-BUS-3'])
+        self.assertEqual(self.codigos('ensayo', relevancia=False), ['LAB-BUS-3', 'LAB-BUS-2'])
+        self.assertEqual(self.codigos('inexistente'), [])
+
+    def test_prefijo_de_codigo(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.codigos('LAB-BUS'), ['LAB-BUS-1', 'LAB-BUS-2', 'LAB-BUS-3'])
+        self.assertFalse(any('_fts' in c['sql'] for c in consultas.captured_queries))
+        # Con forma de código pero sin coincidencias: se busca como texto
+        self.assertEqual(self.codigos('PRO-'), ['PRO-7'])
+        self.assertEqual(self.codigos('MAN-1'), [])
+
+    def test_indice_al_guardar_y_borrar(self):
+        documento = Documento.objects.get(codigo_documento='PRO-7')
+        documento.titulo = 'Manual de metrología'
+        documento.save()
+        self.assertEqual(self.codigos('metrologia'), ['PRO-7'])
+        self.assertEqual(self.codigos('calidad'), [])
+        documento.delete()
+        self.assertEqual(self.codigos('metrologia'), [])
+
+
+class AutocompletarDocumentosTests(TestCase):
+    """El select de documento sólo lleva la opción elegida; el resto se busca por páginas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        for i in range(25):
+            cls.documento = Documento.objects.create(
+                titulo=f'Ensayo {i}', codigo_documento=f'LAB-AUT-{i:02d}', tipo=tipo, creado_por=cls.usuario,
+                estado='aprobado'
+            )
+        Documento.objects.create(titulo='Borrador', codigo_documento='LAB-AUT-99', tipo=tipo, creado_por=cls.usuario)
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_busqueda_paginada(self):
+        url = reverse('documento_autocompletar')
+        datos = self.client.get(url, {'q': 'LAB-AUT'}).json()
+        self.assertEqual(len(datos['resultados']), 20)
+        self.assertTrue(datos['mas'])
+        datos = self.client.get(url, {'q': 'LAB-AUT', 'pagina': 2}).json()
+        self.assertEqual([r['texto'] for r in datos['resultados']][-1], 'LAB-AUT-24 - Ensayo 24')
+        self.assertFalse(datos['mas'])
+
+    def test_formulario_sin_catalogo(self):
+        respuesta = self.client.get(reverse('recordatorio_crear'), {'documento_id': self.documento.pk})
+        self.assertContains(respuesta, f'<option value="{self.documento.pk}" selected>')
+        self.assertNotContains(respuesta, 'LAB-AUT-00')
+        # La validación sigue limitada a documentos aprobados
+        borrador = Documento.objects.get(codigo_documento='LAB-AUT-99')
+        respuesta = self.client.post(reverse('recordatorio_crear'), {
+            'documento': borrador.pk, 'fecha_revision': '2024-01-01T10:00', 'estado': 'pendiente', 'prioridad': 'media'
+        })
+        self.assertFormError(
+            respuesta.context['form'], 'documento', 'Escoja una opción válida. Esa opción no está entre las disponibles.'
+        )
+
+
+class VersionesDocumentoTests(TestCase):
+    """Historial en diferencias comprimidas con instantáneas periódicas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        cls.tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def editar(self, documento, **cambios):
+        datos = {campo: getattr(documento, campo) for campo in versiones.CAMPOS}
+        datos['tipo'] = datos.pop('tipo_id')
+        datos.update(cambios)
+        respuesta = self.client.post(reverse('documento_editar', args=[documento.pk]), datos)
+        self.assertEqual(respuesta.status_code, 302)
+
+    def test_reconstruir_versiones(self):
+        # Creado sin formulario: la primera edición guarda también el estado previo
+        documento = Documento.objects.create(
+            titulo='Ensayo de tracción', codigo_documento='LAB-VER-1', tipo=self.tipo, creado_por=self.usuario,
+            descripcion='\n'.join(f'Paso {i}: medir la probeta.' for i in range(200)),
+        )
+        esperados = [versiones.estado(documento)]
+        for i in range(45):
+            lineas = esperados[-1]['descripcion'].split('\n')
+            lineas[i * 3] = f'Paso {i * 3}: medir la probeta con calibrador {i}.'
+            self.editar(documento, descripcion='\n'.join(lineas), version=f'1.{i + 1}')
+            documento.refresh_from_db()
+            esperados.append(versiones.estado(documento))
+        # Guardar sin cambios no añade versión
+        self.editar(documento)
+
+        filas = list(documento.versiones.order_by('numero'))
+        self.assertEqual([v.numero for v in filas], list(range(1, 47)))
+        self.assertEqual([v.numero for v in filas if v.completa], [1, 21, 41])
+        self.assertLess(len(filas[1].datos) * 5, len(filas[0].datos))
+        for numero, esperado in enumerate(esperados, start=1):
+            with self.assertNumQueries(1):
+                self.assertEqual(versiones.reconstruir(documento.pk, numero), esperado)
+
+        respuesta = self.client.get(reverse('documento_historial', args=[documento.pk]))
+        self.assertEqual([v.numero for v in respuesta.context['versiones']], list(range(46, 26, -1)))
+        respuesta = self.client.get(reverse('documento_version', args=[documento.pk, 1]))
+        self.assertContains(respuesta, 'Paso 0: medir la probeta.')
+
+
+class AuditoriaTests(TestCase):
+    """Transiciones encoladas al confirmar y escritas en lote fuera de la petición"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        cls.otro = User.objects.create_user('luis', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Ensayo de dureza', codigo_documento='LAB-AUD-1', tipo=tipo, creado_por=cls.usuario,
+            estado='aprobado',
+        )
+        # Sin segundos, como los envía el formulario
+        cls.recordatorio = RecordatorioRevision.objects.create(
+            documento=documento, revisor=cls.usuario, fecha_revision=timezone.now().replace(second=0, microsecond=0)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_transiciones(self):
+        recordatorio = self.recordatorio
+        datos = {
+            'documento': recordatorio.documento_id, 'estado': 'en_proceso',
+            'prioridad': 'alta', 'fecha_revision': timezone.localtime(recordatorio.fecha_revision).strftime('%Y-%m-%dT%H:%M'),
+            'fecha_proxima_revision': timezone.localtime(recordatorio.fecha_proxima_revision).strftime('%Y-%m-%dT%H:%M'),
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            respuesta = self.client.post(reverse('recordatorio_editar', args=[recordatorio.pk]), datos)
+        self.assertEqual(respuesta.status_code, 302)
+        # Encoladas al confirmar (aquí después de la petición): aún sin escribir
+        self.assertFalse(TransicionRecordatorio.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            # El final de esta petición escribe las dos anteriores
+            self.client.post(reverse('recordatorio_completar', args=[recordatorio.pk]))
+            self.assertEqual(TransicionRecordatorio.objects.count(), 2)
+            operaciones.reasignar(RecordatorioRevision.objects.filter(pk=recordatorio.pk), self.otro)
+        self.assertEqual(auditoria.vaciar(), 2)
+
+        filas = TransicionRecordatorio.objects.filter(recordatorio_id=recordatorio.pk).order_by('pk')
+        self.assertEqual(
+            [(t.campo, t.valor_anterior, t.valor_nuevo, t.origen, t.usuario_id) for t in filas],
+            [
+                ('estado', 'pendiente', 'en_proceso', 'edicion', self.usuario.pk),
+                ('prioridad', 'media', 'alta', 'edicion', self.usuario.pk),
+                ('estado', 'en_proceso', 'completado', 'completar', self.usuario.pk),
+                ('revisor', str(self.usuario.pk), str(self.otro.pk), 'reasignar', None),
+            ]
+        )
+
+    def test_vaciar_no_pierde_filas(self):
+        auditoria._encolar(auditoria.transiciones('prioridad', [(self.recordatorio.pk, 'prioridad', 'media', 'alta')]))
+        # Un error que no es de la base también devuelve las filas a la cola
+        with mock.patch.object(TransicionRecordatorio.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertLogs('recordatorios.auditoria', 'ERROR'):
+                self.assertEqual(auditoria.vaciar(), 0)
+
+        # Dentro de un bucle de eventos no toca el ORM
+        async def vaciar_en_bucle():
+            return auditoria.vaciar()
+        self.assertEqual(asyncio.run(vaciar_en_bucle()), 0)
+        self.assertEqual(auditoria.vaciar(), 1)
+
+    def test_cola_llena_registra_descartadas(self):
+        auditoria.vaciar()
+        filas = auditoria.transiciones('prioridad', [
+            (self.recordatorio.pk, 'prioridad', 'media', 'alta'),
+            (self.recordatorio.pk, 'estado', 'pendiente', 'en_proceso'),
+            (self.recordatorio.pk, 'prioridad', 'alta', 'baja'),
+        ])
+        auditoria._encolar(filas)
+        with mock.patch.object(auditoria, 'MAXIMO_PENDIENTES', 2), \
+                mock.patch.object(TransicionRecordatorio.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertLogs('recordatorios.auditoria', 'ERROR') as registros:
+                auditoria.vaciar()
+        # Se descarta la más antigua y queda entera en el log
+        self.assertIn(repr(filas[0]), registros.output[-1])
+        self.assertEqual(auditoria._pendientes, filas[1:])
+        self.assertEqual(auditoria.vaciar(), 2)
+
+    def test_particiones_a_demanda(self):
+        auditoria.vaciar()
+        auditoria._meses_con_particion.clear()
+        fila = auditoria.transiciones('prioridad', [(self.recordatorio.pk, 'prioridad', 'media', 'alta')])
+        with mock.patch.object(auditoria, 'crear_particiones') as crear:
+            auditoria._encolar(fila)
+            auditoria.vaciar()
+            auditoria._encolar(fila)
+            auditoria.vaciar()
+        ahora = timezone.localtime(fila[0][-1])
+        crear.assert_called_once_with({(ahora.year, ahora.month)})
+
+
+class AnaliticaTests(TestCase):
+    """Agregados diarios incrementales y percentiles por histograma"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Ensayo de fatiga', codigo_documento='LAB-ANA-1', tipo=tipo, creado_por=cls.usuario
+        )
+        inicio = timezone.now() - timedelta(days=30)
+        # (estado, prioridad, días hasta la próxima revisión, horas hasta completar)
+        for estado, prioridad, dias, horas in [
+            ('completado', 'alta', 10, 48),     # a tiempo
+            ('completado', 'media', 5, 300),    # tarde
+            ('pendiente', 'media', 7, None),    # vencido
+            ('pendiente', 'baja', 40, None),    # aún no vence
+            ('cancelado', 'alta', 3, None),     # no cuenta
+        ]:
+            cls.recordatorio = RecordatorioRevision.objects.create(
+                documento=documento, revisor=cls.usuario, estado=estado, prioridad=prioridad,
+                fecha_revision=inicio, fecha_proxima_revision=inicio + timedelta(days=dias),
+                fecha_completado=inicio + timedelta(hours=horas) if horas else None,
+            )
+            if dias == 7:
+                cls.vencido = cls.recordatorio
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_agregados_e_informe(self):
+        self.assertEqual(analitica.actualizar(), 39)
+        informe = analitica.informe(*analitica.periodo({}))
+        self.assertEqual(informe['general'], {
+            'completados': 2, 'horas_media': 174.0, 'horas_p50': 48.0, 'horas_p90': 316.8,
+            'vencimientos': 3, 'vencidos': 2, 'tasa_vencidos': 0.667,
+        })
+        self.assertEqual([(fila['nombre'], fila['vencidos']) for fila in informe['prioridades']],
+                         [('Media', 2), ('Alta', 0)])
+        self.assertEqual(informe['revisores'][0]['nombre'], 'ana')
+
+        # Incremental: el día anterior del recordatorio reprogramado sale de la auditoría
+        with self.captureOnCommitCallbacks(execute=True):
+            operaciones.reprogramar(RecordatorioRevision.objects.filter(pk=self.vencido.pk),
+                                    fecha=timezone.now() + timedelta(days=60))
+        auditoria.vaciar()
+        analitica.actualizar()
+        respuesta = self.client.get(reverse('api_analitica'))
+        self.assertEqual(respuesta.json()['general']['vencidos'], 1)
+        self.assertEqual(self.client.get(reverse('api_analitica'), HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(reverse('api_analitica'), {'desde': 'ayer'}).status_code, 400)
+
+
+class ProgramadorTests(TestCase):
+    """Colas de avisos en heap cargadas por lotes y la cola de cambios en base de datos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        cls.documento = Documento.objects.create(
+            titulo='Ensayo de flexión', codigo_documento='LAB-PRG-1', tipo=tipo, creado_por=cls.usuario
+        )
+        cls.ahora = timezone.now()
+
+    def crear(self, dias, estado='pendiente'):
+        return RecordatorioRevision.objects.create(
+            documento=self.documento, revisor=self.usuario, fecha_revision=self.ahora - timedelta(days=60),
+            fecha_proxima_revision=self.ahora + timedelta(days=dias), estado=estado,
+        )
+
+    def eventos(self, tipo):
+        return sorted(EventoRecordatorio.objects.filter(tipo=tipo).values_list('recordatorio_id', 'fecha_proxima_revision'))
+
+    def test_carga_por_lotes_en_orden(self):
+        vencidos = [self.crear(-dias) for dias in (5, 1, 4, 2, 3)]
+        futuro = self.crear(10)
+        self.crear(-6, estado='completado')
+        cola = ColaAvisos('vencido', timedelta(0), lote=2)
+        extraidos = []
+        while True:
+            entradas = cola.extraer_vencidos(timezone.now())
+            if not entradas:
+                break
+            self.assertLessEqual(len(entradas), 2)
+            extraidos += entradas
+        esperados = sorted(vencidos, key=lambda r: r.fecha_proxima_revision)
+        self.assertEqual(extraidos, [(r.pk, r.fecha_proxima_revision) for r in esperados])
+        self.assertEqual(cola.siguiente(), futuro.fecha_proxima_revision)
+
+        # Un cambio anterior a lo ya cargado entra al heap; uno posterior espera a su carga
+        cola.agregar(vencidos[0].pk, self.ahora - timedelta(days=1))
+        self.assertEqual(cola.extraer_vencidos(timezone.now()), [(vencidos[0].pk, self.ahora - timedelta(days=1))])
+
+    def test_cambios_reprogramacion_e_idempotencia(self):
+        vencido = self.crear(-1)
+        movido = self.crear(-2)
+        programador = Programador(lote=10)
+        self.assertFalse(CambioProgramacion.objects.exists())
+
+        # Reprogramado a 3 días antes de disparar: la entrada vieja ya no vale
+        movido.fecha_proxima_revision = self.ahora + timedelta(days=3)
+        movido.save()
+        self.assertEqual(programador.ejecutar_pendientes(), 2)
+        self.assertEqual(self.eventos('vencido'), [(vencido.pk, vencido.fecha_proxima_revision)])
+        self.assertEqual(self.eventos('proximo'), [(movido.pk, movido.fecha_proxima_revision)])
+        self.assertFalse(CambioProgramacion.objects.exists())
+
+        # Repetir no duplica avisos, ni aunque se vuelvan a encolar las mismas fechas
+        self.assertEqual(programador.ejecutar_pendientes(), 0)
+        CambioProgramacion.objects.create(recordatorio_id=vencido.pk, fecha_proxima_revision=vencido.fecha_proxima_revision)
+        self.assertEqual(programador.ejecutar_pendientes(), 0)
+
+        # Un recordatorio nuevo ya vencido llega por la cola de cambios
+        nuevo = self.crear(-3)
+        self.assertEqual(programador.ejecutar_pendientes(), 1)
+        self.assertIn((nuevo.pk, nuevo.fecha_proxima_revision), self.eventos('vencido'))
+        self.assertEqual(Programador(lote=10).ejecutar_pendientes(), 0)
+
+
+class CalendarioTests(TestCase):
+    """Calendario iCalendar por revisor con validación condicional"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        documento = Documento.objects.create(
+            titulo='Calibración, balanzas; sala 2', codigo_documento='LAB-CAL-1', tipo=tipo, creado_por=cls.usuario
+        )
+        ahora = timezone.now()
+        cls.recordatorio = RecordatorioRevision.objects.create(
+            documento=documento, revisor=cls.usuario, fecha_revision=ahora,
+            fecha_proxima_revision=ahora + timedelta(days=10),
+        )
+        RecordatorioRevision.objects.create(
+            documento=documento, revisor=cls.usuario, estado='completado', fecha_revision=ahora,
+            fecha_proxima_revision=ahora + timedelta(days=20),
+        )
+
+    def test_feed(self):
+        url = reverse('calendario_feed', args=[calendario.token_de(self.usuario.pk)])
+        respuesta = self.client.get(url)
+        contenido = b''.join(respuesta.streaming_content).decode()
+        self.assertEqual(contenido.count('BEGIN:VEVENT'), 1)
+        self.assertIn(f'UID:recordatorio-{self.recordatorio.pk}@', contenido)
+        self.assertIn('Calibración\\, balanzas\\; sala 2', contenido)
+        self.assertTrue(all(len(linea.encode()) <= 75 for linea in contenido.split('\r\n')))
+
+        # Sin cambios: 304 con una sola consulta; luego, desde la caché
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(url).content.decode(), contenido)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            operaciones.cambiar_prioridad(RecordatorioRevision.objects.filter(pk=self.recordatorio.pk), 'alta')
+        nueva = self.client.get(url, HTTP_IF_NONE_MATCH=respuesta['ETag'])
+        self.assertEqual(nueva.status_code, 200)
+        self.assertIn('Prioridad: Alta', b''.join(nueva.streaming_content).decode())
+        self.assertEqual(self.client.get('/calendario/otro.ics').status_code, 404)
+
+
+class TiempoRealTests(TestCase):
+    """Eventos de recordatorios por SSE y por sondeo"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('ana', password='secreta123')
+        tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        cls.documento = Documento.objects.create(
+            titulo='Ensayo de dureza', codigo_documento='LAB-SSE-1', tipo=tipo, creado_por=cls.usuario
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.async_client.force_login(self.usuario)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recordatorio = RecordatorioRevision.objects.create(
+                documento=self.documento, revisor=self.usuario, fecha_revision=timezone.now()
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            operaciones.completar(RecordatorioRevision.objects.filter(pk=self.recordatorio.pk))
+
+    def test_sondeo(self):
+        self.assertEqual(self.client.get('/eventos/').status_code, 204)
+        datos = self.client.get('/eventos/recientes/?desde=0').json()
+        self.assertEqual([e['tipo'] for e in datos['eventos']], ['creado', 'completado'])
+        self.assertEqual(self.client.get(f'/eventos/recientes/?desde={datos["ultimo"]}').json()['eventos'], [])
+
+    async def test_flujo_repite_eventos_perdidos(self):
+        respuesta = await self.async_client.get('/eventos/', headers={'Last-Event-ID': '1'})
+        self.assertEqual(respuesta['Content-Type'], 'text/event-stream')
+        flujo = respuesta.streaming_content
+        self.assertTrue((await anext(flujo)).startswith(b'retry:'))
+        evento = await anext(flujo)
+        self.assertIn(b'event: completado', evento)
+        self.assertIn(f'"recordatorios": [{self.recordatorio.pk}]'.encode(), evento)
+        await flujo.aclose()
+
+    def test_numeros_de_la_base(self):
+        # La secuencia no depende de la caché: vaciarla no reutiliza números
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            tiempo_real.publicar('proximo', [self.recordatorio.pk])
+        self.assertEqual(Secuencia.objects.get(clave=tiempo_real.SECUENCIA).valor, 3)
+        self.assertEqual(tiempo_real.ultimo(), 3)
+        # Un contador de la caché que quedó atrás se corrige con los eventos siguientes
+        cache.set(tiempo_real.SECUENCIA, 1, None)
+        cache.set(tiempo_real._clave_evento(2), {'id': 2, 'tipo': 'completado', 'recordatorios': []})
+        self.assertEqual(tiempo_real.ultimo(), 3)
+        self.assertEqual([e['id'] for e in tiempo_real.leer(1, tiempo_real.ultimo())], [2, 3])
+
+
+class EstaticosTests(TestCase):
+    """Las páginas no dependen de hojas ni scripts externos"""
+
+    def test_sin_cdn(self):
+        self.client.force_login(User.objects.create_user('ana', password='secreta123'))
+        for url in [reverse('dashboard'), reverse('login')]:
+            with self.subTest(url):
+                html = self.client.get(url).content.decode()
+                self.assertNotRegex(html, r'(href|src)="(https?:)?//')
+                self.assertIn('/static/vendor/bootstrap/css/bootstrap.min.css', html)
+        self.assertIn('<style>/* CSS crítico', self.client.get(reverse('dashboard')).content.decode())
+
+
+class PresupuestoConsultasTests(PresupuestoConsultasMixin, TestCase):
+    """Máximo de consultas de cada URL de recordatorios/urls.py, con la caché vacía"""
+    
+    # nombre de la URL -> consultas permitidas
+    PRESUPUESTOS = {
+        'dashboard': 5,
+        'documento_list': 4,
+        # Con ?search= de rendimiento.peticiones: el EXISTS del atajo por prefijo de código
+        'documento_exportar': 4,
+        'documento_detalle': 4,
+        'documento_autocompletar': 4,
+        'documento_historial': 4,
+        'documento_version': 6,
+        'documento_crear': 3,
+        'documento_editar': 5,
+        'recordatorio_list': 4,
+        'recordatorio_lote': 6,
+        'recordatorio_exportar': 3,
+        'recordatorio_detalle': 3,
+        'recordatorio_crear': 3,
+        'recordatorio_editar': 4,
+        'recordatorio_completar': 8,
+        'eventos': 2,
+        'eventos_recientes': 2,
+        'calendario': 6,
+        'calendario_feed': 2,
+        'analitica': 5,
+        'metricas_cache': 2,
+        'api_tipos': 4,
+        'api_tipo': 3,
+        'api_documentos': 4,
+        'api_documento': 3,
+        'api_recordatorios': 4,
+        'api_recordatorio': 3,
+        'api_analitica': 6,
+    }
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_superuser('ana', password='secreta123')
+        revisores = [User.objects.create_user(f'revisor{i}') for i in range(3)]
+        cls.tipo = TipoDocumento.objects.create(nombre='Procedimiento')
+        ahora = timezone.now()
+        for i in range(6):
+            cls.documento = Documento.objects.create(
+                titulo=f'Documento {i}', codigo_documento=f'LAB-PRE-{i}', tipo=cls.tipo, creado_por=revisores[i % 3]
+            )
+            for j in range(3):
+                cls.recordatorio = RecordatorioRevision.objects.create(
+                    documento=cls.documento, revisor=revisores[j], fecha_revision=ahora - timedelta(days=40),
+                    fecha_proxima_revision=ahora + timedelta(days=3 * j - 3),
+                )
+        versiones.registrar(cls.documento, cls.usuario)
+        analitica.actualizar()
+    
+    def setUp(self):
+        self.client.force_login(self.usuario)
+    
+    def test_presupuesto_por_url(self):
+        rutas = rendimiento.peticiones(self.tipo, self.documento, self.recordatorio)
+        self.assertEqual({nombre for nombre, metodo, url, datos in rutas}, set(self.PRESUPUESTOS))
+        for nombre, metodo, url, datos in rutas:
+            with self.subTest(nombre):
+                cache.clear()
+                self.assertPresupuesto(url, self.PRESUPUESTOS[nombre], metodo, data=datos)
+
+    def test_presupuesto_exige_respuesta_correcta(self):
+        with self.assertRaisesMessage(AssertionError, 'respuesta 404'):
+            self.assertPresupuesto(reverse('documento_version', kwargs={'pk': self.documento.pk, 'numero': 99}), 10)
+        self.assertPresupuesto(reverse('documento_detalle', kwargs={'pk': 0}), 10, estado=404)
+    
+    def test_listas_admin(self):
+        # Con la caché caliente: sesión, usuario, opciones de los filtros por FK, página y rango de fechas
+        for nombre, metodo, url, datos in rendimiento.changelists():
+            with self.subTest(nombre):
+                self.client.get(url)
+                respuesta = self.assertPresupuesto(url, 6)
+                self.assertEqual(respuesta.status_code, 200)
+        respuesta = self.client.get(reverse('admin:recordatorios_recordatoriorevision_changelist'))
+        self.assertContains(respuesta, 'Pendiente (18)')
+
+    def test_busqueda_y_fechas_admin(self):
+        url = reverse('admin:recordatorios_recordatoriorevision_changelist')
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url, {'q': 'Documento'})
+        self.assertEqual(respuesta.context['cl'].result_count, 18)
+        sql = ' '.join(c['sql'] for c in consultas.captured_queries)
+        # Ni icontains sobre observaciones, ni rango de relevancia, ni SELECT DISTINCT de la jerarquía de fechas
+        self.assertNotIn('"observaciones" LIKE', sql)
+        self.assertNotIn('bm25', sql)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertContains(respuesta, 'Importar CSV')
 
-# Create your tests here.
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('admin:recordatorios_documento_changelist'), {'q': 'Documento'})
+        self.assertEqual(respuesta.context['cl'].result_count, 6)
+        self.assertFalse(any('bm25' in c['sql'] for c in consultas.captured_queries))
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection, transaction
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.contrib.auth.decorators import login_required
+from .models import Secuencia
+
+logger = logging.getLogger(__name__)
+
+# Registro de eventos en la caché compartida: un contador y una entrada por
+# evento. Así llegan a todos los workers los cambios hechos en otro proceso
+# (otro worker, el programador, un comando de gestión). Los números salen de la
+# tabla Secuencia: cache.incr sólo es atómico en algunos backends (no en
+# FileBasedCache ni en DatabaseCache) y dos eventos con el mismo número se pisarían.
+SECUENCIA = 'tiempo_real:secuencia'
+RETENCION_SEGUNDOS = 300
+MAXIMO_ATRASO = 1000
+
+INTERVALO = 1.0           # sondeo del registro, uno por worker
+LATIDO = 15.0             # comentario SSE para mantener viva la conexión
+DURACION_MAXIMA = 600.0   # el navegador reconecta solo con Last-Event-ID
+COLA_MAXIMA = 100         # eventos sin enviar antes de descartar al cliente lento
+REINTENTO_MS = 5000
+
+
+def _clave_evento(numero):
+    return f'tiempo_real:evento:{numero}'
+
+
+def _siguiente_numero():
+    # UPDATE ... RETURNING (PostgreSQL y SQLite >= 3.35): leer y sumar en una sola sentencia
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {Secuencia._meta.db_table} SET valor = valor + 1 WHERE clave = %s RETURNING valor',
+            [SECUENCIA]
+        )
+        fila = cursor.fetchone()
+    if fila is None:
+        Secuencia.objects.get_or_create(clave=SECUENCIA)
+        return _siguiente_numero()
+    return fila[0]
+
+
+def publicar(tipo, ids, **datos):
+    """Registra un evento para los recordatorios ``ids`` al confirmar la transacción
+
+    tipo: 'creado' | 'completado' | 'proximo' | 'vencido'. Un evento por
+    operación, no por fila: las operaciones en lote envían todos los ids juntos.
+    """
+    if not ids:
+        return
+
+    def escribir():
+        numero = _siguiente_numero()
+        cache.set(_clave_evento(numero), {'id': numero, 'tipo': tipo, 'recordatorios': list(ids), **datos},
+                  RETENCION_SEGUNDOS)
+        if numero > cache.get(SECUENCIA, 0):
+            cache.set(SECUENCIA, numero, None)
+    transaction.on_commit(escribir)
+
+
+def leer(desde, hasta):
+    """Eventos registrados con número en (desde, hasta]; None si ya expiraron"""
+    if hasta - desde > MAXIMO_ATRASO:
+        return None
+    claves = [_clave_evento(numero) for numero in range(desde + 1, hasta + 1)]
+    valores = cache.get_many(claves)
+    if len(valores) < len(claves) and _clave_evento(desde + 1) not in valores:
+        return None
+    return [valores[clave] for clave in claves if clave in valores]
+
+
+def ultimo():
+    """Número del último evento registrado
+
+    Dos publicadores a la vez pueden dejar el contador de la caché en el menor de
+    sus números: se avanza mientras exista el evento siguiente.
+    """
+    numero = cache.get(SECUENCIA, 0)
+    for _ in range(MAXIMO_ATRASO):
+        if cache.get(_clave_evento(numero + 1)) is None:
+            break
+        numero += 1
+    return numero
+
+
+class Suscripcion:
+    def __init__(self):
+        self.cola = asyncio.Queue(COLA_MAXIMA)
+        self.desbordada = False
+
+
+class Central:
+    """Difusión en memoria a las conexiones de un event loop
+
+    Una sola tarea por worker sondea el registro y reparte cada evento a las
+    colas de los suscriptores; un cliente que no consume lo bastante rápido
+    llena su cola y se le pide resincronizar en lugar de acumular memoria.
+    """
+
+    def __init__(self):
+        self.suscripciones = set()
+        self.numero = None
+        self.tarea = None
+
+    def suscribir(self):
+        suscripcion = Suscripcion()
+        self.suscripciones.add(suscripcion)
+        if self.tarea is None or self.tarea.done():
+            self.tarea = asyncio.get_running_loop().create_task(self.sondear())
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        self.suscripciones.discard(suscripcion)
+        if not self.suscripciones and self.tarea is not None:
+            self.tarea.cancel()
+            self.tarea = None
+
+    def difundir(self, evento):
+        for suscripcion in list(self.suscripciones):
+            try:
+                suscripcion.cola.put_nowait(evento)
+            except asyncio.QueueFull:
+                suscripcion.desbordada = True
+                self.suscripciones.discard(suscripcion)
+                # Despierta al consumidor bloqueado en get()
+                suscripcion.cola.get_nowait()
+                suscripcion.cola.put_nowait(None)
+
+    async def sondear(self):
+        self.numero = await sync_to_async(ultimo)()
+        while True:
+            await asyncio.sleep(INTERVALO)
+            try:
+                numero = await sync_to_async(ultimo)()
+                if numero <= self.numero:
+                    continue
+                eventos = await sync_to_async(leer)(self.numero, numero)
+                self.numero = numero
+                for evento in eventos if eventos is not None else [{'id': numero, 'tipo': 'recargar'}]:
+                    self.difundir(evento)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Error al leer el registro de eventos')
+
+
+_centrales = weakref.WeakKeyDictionary()
+
+
+def central():
+    """Central del event loop actual (uno por worker ASGI)"""
+    loop = asyncio.get_running_loop()
+    if loop not in _centrales:
+        _centrales[loop] = Central()
+    return _centrales[loop]
+
+
+def formatear(evento):
+    return f'id: {evento["id"]}\nevent: {evento["tipo"]}\ndata: {json.dumps(evento)}\n\n'
+
+
+async def flujo(desde):
+    """Generador SSE: repite lo perdido desde ``desde`` y luego los eventos en vivo"""
+    loop = asyncio.get_running_loop()
+    centro = central()
+    # Suscribirse antes de leer el registro para no perder eventos entre ambos pasos
+    suscripcion = centro.suscribir()
+    try:
+        yield f'retry: {REINTENTO_MS}\n\n'
+        numero = await sync_to_async(ultimo)()
+        if desde is not None and desde < numero:
+            perdidos = await sync_to_async(leer)(desde, numero)
+            if perdidos is None:
+                yield formatear({'id': numero, 'tipo': 'recargar'})
+                return
+            for evento in perdidos:
+                yield formatear(evento)
+        else:
+            yield f'id: {numero}\n\n'
+
+        fin = loop.time() + DURACION_MAXIMA
+        while loop.time() < fin:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), LATIDO)
+            except asyncio.TimeoutError:
+                yield ': latido\n\n'
+                continue
+            if evento is None:
+                yield formatear({'id': centro.numero, 'tipo': 'recargar'})
+                return
+            if evento['id'] > numero:
+                yield formatear(evento)
+    finally:
+        centro.cancelar(suscripcion)
+
+
+def _ultimo_visto(request):
+    valor = request.headers.get('Last-Event-ID') or request.GET.get('desde') or ''
+    return int(valor) if valor.isdigit() else None
+
+
+async def eventos(request):
+    """Flujo SSE de cambios de recordatorios; sólo bajo ASGI
+
+    Bajo WSGI cada conexión ocuparía un worker: se responde 204, el
+    EventSource se cierra y custom.js pasa a consultar eventos_recientes.
+    """
+    autenticado = await sync_to_async(lambda: request.user.is_authenticated)()
+    if not autenticado:
+        return HttpResponse(status=401)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    respuesta = StreamingHttpResponse(flujo(_ultimo_visto(request)), content_type='text/event-stream')
+    respuesta['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule el flujo en su buffer
+    respuesta['X-Accel-Buffering'] = 'no'
+    return respuesta
+
+
+@login_required
+def eventos_recientes(request):
+    """Alternativa por sondeo: eventos posteriores a ?desde=<id>"""
+    numero = ultimo()
+    desde = _ultimo_visto(request)
+    if desde is None or desde >= numero:
+        return JsonResponse({'ultimo': numero, 'eventos': []})
+    perdidos = leer(desde, numero)
+    if perdidos is None:
+        perdidos = [{'id': numero, 'tipo': 'recargar'}]
+    return JsonResponse({'ultimo': numero, 'eventos': perdidos})
@@ -1,19 +1,48 @@
 from django.urls import path
-from . import views
+from . import api, calendario, tiempo_real, views
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     
     # URLs para documentos
-    path('documentos/', views.DocumentoListView.as_view(), name='documento_list'),
+    path('documentos/', views.DocumentoListAsyncView.as_view(), name='documento_list'),
+    path('documentos/exportar/', views.DocumentoExportView.as_view(), name='documento_exportar'),
     path('documentos/<int:pk>/', views.DocumentoDetailView.as_view(), name='documento_detalle'),
+    path('documentos/autocompletar/', views.documento_autocompletar, name='documento_autocompletar'),
     path('documentos/nuevo/', views.DocumentoCreateView.as_view(), name='documento_crear'),
     path('documentos/<int:pk>/editar/', views.DocumentoUpdateView.as_view(), name='documento_editar'),
+    path('documentos/<int:pk>/historial/', views.DocumentoHistorialView.as_view(), name='documento_historial'),
+    path('documentos/<int:pk>/historial/<int:numero>/', views.documento_version, name='documento_version'),
     
     # URLs para recordatorios
-    path('recordatorios/', views.RecordatorioListView.as_view(), name='recordatorio_list'),
+    path('recordatorios/', views.RecordatorioListAsyncView.as_view(), name='recordatorio_list'),
+    path('recordatorios/lote/', views.RecordatorioOperacionLoteView.as_view(), name='recordatorio_lote'),
+    path('recordatorios/exportar/', views.RecordatorioExportView.as_view(), name='recordatorio_exportar'),
     path('recordatorios/<int:pk>/', views.RecordatorioDetailView.as_view(), name='recordatorio_detalle'),
     path('recordatorios/nuevo/', views.RecordatorioCreateView.as_view(), name='recordatorio_crear'),
     path('recordatorios/<int:pk>/editar/', views.RecordatorioUpdateView.as_view(), name='recordatorio_editar'),
     path('recordatorios/<int:pk>/completar/', views.marcar_completado, name='recordatorio_completar'),
+    
+    # Eventos en tiempo real
+    path('eventos/', tiempo_real.eventos, name='eventos'),
+    path('eventos/recientes/', tiempo_real.eventos_recientes, name='eventos_recientes'),
+    
+    # Calendario iCalendar por revisor
+    path('calendario/', calendario.enlace, name='calendario'),
+    path('calendario/<str:token>.ics', calendario.feed, name='calendario_feed'),
+    
+    # Analítica
+    path('analitica/', views.analitica_revisores, name='analitica'),
+    
+    # Métricas
+    path('metricas/cache/', views.metricas_cache, name='metricas_cache'),
+    
+    # API de sólo lectura
+    path('api/v1/tipos/', api.TipoDocumentoAPI.as_view(), name='api_tipos'),
+    path('api/v1/tipos/<int:pk>/', api.TipoDocumentoAPI.as_view(), name='api_tipo'),
+    path('api/v1/documentos/', api.DocumentoAPI.as_view(), name='api_documentos'),
+    path('api/v1/documentos/<int:pk>/', api.DocumentoAPI.as_view(), name='api_documento'),
+    path('api/v1/recordatorios/', api.RecordatorioAPI.as_view(), name='api_recordatorios'),
+    path('api/v1/recordatorios/<int:pk>/', api.RecordatorioAPI.as_view(), name='api_recordatorio'),
+    path('api/v1/analitica/', api.AnaliticaAPI.as_view(), name='api_analitica'),
 ]
\ No newline at end of file
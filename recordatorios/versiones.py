@@ -0,0 +1,111 @@
+import difflib
+import json
+import zlib
+
+from django.db import transaction
+from .models import Documento, VersionDocumento
+
+# Campos de DocumentoForm que se guardan en el historial
+CAMPOS = ['titulo', 'codigo_documento', 'descripcion', 'tipo_id', 'version', 'estado']
+# Cada cuántas versiones se guarda el estado completo: reconstruir lee como mucho este número de filas
+INSTANTANEA_CADA = 20
+
+
+def estado(documento):
+    return {campo: getattr(documento, campo) for campo in CAMPOS}
+
+
+def comprimir(datos):
+    return zlib.compress(json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode())
+
+
+def descomprimir(datos):
+    return json.loads(zlib.decompress(bytes(datos)))
+
+
+def diferencias(anterior, actual):
+    """Cambios de ``anterior`` a ``actual``
+
+    Los textos se comparan por líneas: [i, j] copia las líneas i:j del texto
+    anterior y una cadena es texto nuevo. El resto de campos guarda el valor.
+    """
+    textos, valores = {}, {}
+    for campo in CAMPOS:
+        antes, despues = anterior.get(campo), actual.get(campo)
+        if antes == despues:
+            continue
+        if isinstance(antes, str) and isinstance(despues, str):
+            lineas_antes = antes.splitlines(keepends=True)
+            lineas_despues = despues.splitlines(keepends=True)
+            operaciones = []
+            comparador = difflib.SequenceMatcher(None, lineas_antes, lineas_despues, autojunk=False)
+            for operacion, i1, i2, j1, j2 in comparador.get_opcodes():
+                if operacion == 'equal':
+                    operaciones.append([i1, i2])
+                elif j1 < j2:
+                    operaciones.append(''.join(lineas_despues[j1:j2]))
+            textos[campo] = operaciones
+        else:
+            valores[campo] = despues
+    return {'t': textos, 'v': valores}
+
+
+def aplicar(anterior, delta):
+    actual = dict(anterior)
+    for campo, operaciones in delta['t'].items():
+        lineas = anterior[campo].splitlines(keepends=True)
+        actual[campo] = ''.join(
+            ''.join(lineas[op[0]:op[1]]) if isinstance(op, list) else op for op in operaciones
+        )
+    actual.update(delta['v'])
+    return actual
+
+
+def reconstruir(documento_id, numero):
+    """Estado del documento en la versión ``numero``: una consulta de a lo sumo INSTANTANEA_CADA filas"""
+    desde = numero - (numero - 1) % INSTANTANEA_CADA
+    filas = VersionDocumento.objects.filter(
+        documento_id=documento_id, numero__range=(desde, numero)
+    ).order_by('numero').values_list('numero', 'completa', 'datos')
+    resultado = None
+    for numero_fila, completa, datos in filas:
+        if completa:
+            resultado = descomprimir(datos)
+        elif resultado is None:
+            raise ValueError(f'Falta la instantánea previa a la versión {numero_fila}')
+        else:
+            resultado = aplicar(resultado, descomprimir(datos))
+    if resultado is None or numero_fila != numero:
+        raise VersionDocumento.DoesNotExist(f'No existe la versión {numero}')
+    return resultado
+
+
+def _crear(documento, numero, actual, previo, usuario):
+    completa = (numero - 1) % INSTANTANEA_CADA == 0
+    return VersionDocumento.objects.create(
+        documento=documento, numero=numero, version=actual['version'], completa=completa,
+        datos=comprimir(actual if completa else diferencias(previo, actual)), usuario=usuario,
+    )
+
+
+def registrar(documento, usuario=None, anterior=None):
+    """Añade una versión con el estado actual de ``documento`` si cambió
+
+    ``anterior`` es el estado antes de editar: si el documento aún no tiene
+    historial (se creó antes que él) se guarda primero como versión 1.
+    """
+    actual = estado(documento)
+    with transaction.atomic():
+        # Serializa las versiones de un mismo documento
+        Documento.objects.select_for_update().filter(pk=documento.pk).values('pk').get()
+        ultima = documento.versiones.order_by('-numero').values_list('numero', flat=True).first()
+        if ultima is None:
+            if anterior is None or anterior == actual:
+                return _crear(documento, 1, actual, None, usuario)
+            _crear(documento, 1, anterior, None, None)
+            ultima, previo = 1, anterior
+        else:
+            previo = reconstruir(documento.pk, ultima)
+        if previo == actual:
+            return None
+        return _crear(documento, ultima + 1, actual, previo, usuario)
@@ -1,14 +1,28 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
-from django.urls import reverse_lazy
-from django.db.models import Q, Count
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from datetime import timedelta
-from .models import Documento, RecordatorioRevision, TipoDocumento
-from .forms import DocumentoForm, RecordatorioRevisionForm, CustomUserCreationForm
+from .models import Documento, RecordatorioRevision, TipoDocumento, VersionDocumento
+from .busqueda import buscar_documentos
+from .forms import (
+    DocumentoForm, RecordatorioRevisionForm, CustomUserCreationForm, OperacionLoteForm, documentos_seleccionables
+)
+from .estadisticas import obtener_estadisticas
+from .filtros import filtrar_documentos, filtrar_recordatorios
+from .paginacion import PaginacionCursorMixin
+from .exportacion import ExportacionMixin, COLUMNAS_DOCUMENTOS, COLUMNAS_RECORDATORIOS
+from . import analitica, cacheo, operaciones, versiones
 
 def registro(request):
     """Vista para registro de nuevos usuarios"""
@@ -22,91 +36,90 @@ def registro(request):
         form = CustomUserCreationForm()
     
     return render(request, 'registration/registro.html', {'form': form})
-@login_required
-def dashboard(request):
-    """Vista principal del dashboard"""
-    # Estadísticas generales
-    total_documentos = Documento.objects.count()
-    documentos_activos = Documento.objects.filter(estado='aprobado').count()
-    total_recordatorios = RecordatorioRevision.objects.count()
-    recordatorios_pendientes = RecordatorioRevision.objects.filter(estado='pendiente').count()
-    
-    # Recordatorios próximos a vencer (próximos 7 días)
-    fecha_limite = timezone.now() + timedelta(days=7)
-    recordatorios_proximos = RecordatorioRevision.objects.filter(
-        fecha_proxima_revision__lte=fecha_limite,
-        estado='pendiente'
-    ).order_by('fecha_proxima_revision')[:5]
+async def _listar(queryset):
+    return [objeto async for objeto in queryset]
+
+async def dashboard(request):
+    """Vista principal del dashboard
+    
+    Asíncrona: las estadísticas y las dos listas se piden a la vez con el ORM
+    asíncrono y, bajo ASGI, la espera no ocupa un hilo del worker.
+    """
+    if not await sync_to_async(lambda: request.user.is_authenticated)():
+        return redirect_to_login(request.get_full_path())
     
-    # Recordatorios vencidos
-    recordatorios_vencidos = RecordatorioRevision.objects.filter(
-        fecha_proxima_revision__lt=timezone.now(),
+    ahora = timezone.now()
+    pendientes = RecordatorioRevision.objects.select_related('documento').filter(
         estado='pendiente'
-    ).order_by('fecha_proxima_revision')[:5]
+    ).order_by('fecha_proxima_revision')
     
-    # Documentos por tipo
-    documentos_por_tipo = TipoDocumento.objects.annotate(
-        total_documentos=Count('documento')
-    ).filter(total_documentos__gt=0)
+    estadisticas, recordatorios_proximos, recordatorios_vencidos = await asyncio.gather(
+        # Estadísticas generales (tabla resumen mantenida por señales)
+        sync_to_async(obtener_estadisticas)(),
+        # Recordatorios próximos a vencer (próximos 7 días)
+        _listar(pendientes.filter(fecha_proxima_revision__lte=ahora + timedelta(days=7))[:5]),
+        # Recordatorios vencidos
+        _listar(pendientes.filter(fecha_proxima_revision__lt=ahora)[:5]),
+    )
     
     context = {
-        'total_documentos': total_documentos,
-        'documentos_activos': documentos_activos,
-        'total_recordatorios': total_recordatorios,
-        'recordatorios_pendientes': recordatorios_pendientes,
+        'total_documentos': estadisticas['total_documentos'],
+        'documentos_activos': estadisticas['documentos_activos'],
+        'total_recordatorios': estadisticas['total_recordatorios'],
+        'recordatorios_pendientes': estadisticas['recordatorios_pendientes'],
         'recordatorios_proximos': recordatorios_proximos,
         'recordatorios_vencidos': recordatorios_vencidos,
-        'documentos_por_tipo': documentos_por_tipo,
+        'documentos_por_tipo': estadisticas['documentos_por_tipo'],
     }
     
-    return render(request, 'recordatorios/dashboard.html', context)
+    return await sync_to_async(render)(request, 'recordatorios/dashboard.html', context)
 
-class DocumentoListView(LoginRequiredMixin, ListView):
+class DocumentoListView(LoginRequiredMixin, cacheo.CacheListaMixin, PaginacionCursorMixin, ListView):
     model = Documento
     template_name = 'recordatorios/documento_list.html'
     context_object_name = 'documentos'
     paginate_by = 20
+    nombre_cache = 'fragmento_documentos'
+    areas_cache = [cacheo.DOCUMENTOS, cacheo.TIPOS, cacheo.USUARIOS]
+    plantilla_fragmento = 'recordatorios/fragmentos/documento_lista.html'
     
     def get_queryset(self):
         queryset = Documento.objects.select_related('tipo', 'creado_por')
-        
-        # Filtro por búsqueda
-        search = self.request.GET.get('search')
-        if search:
-            queryset = queryset.filter(
-                Q(titulo__icontains=search) |
-                Q(codigo_documento__icontains=search) |
-                Q(descripcion__icontains=search)
-            )
-        
-        # Filtro por tipo
-        tipo = self.request.GET.get('tipo')
-        if tipo:
-            queryset = queryset.filter(tipo_id=tipo)
-        
-        # Filtro por estado
-        estado = self.request.GET.get('estado')
-        if estado:
-            queryset = queryset.filter(estado=estado)
-        
-        return queryset
+        return filtrar_documentos(queryset, self.request.GET)
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['tipos_documento'] = TipoDocumento.objects.filter(activo=True)
-        context['estados'] = Documento.ESTADO_CHOICES
-        return context
+    def get_contexto_exterior(self):
+        return {
+            'tipos_documento': cacheo.tipos_activos(),
+            'estados': Documento.ESTADO_CHOICES,
+        }
 
-class DocumentoDetailView(LoginRequiredMixin, DetailView):
+class DocumentoListAsyncView(cacheo.CacheListaAsyncMixin, DocumentoListView):
+    """DocumentoListView para ASGI"""
+
+class DocumentoExportView(ExportacionMixin, DocumentoListView):
+    """Exporta en CSV/JSON la lista de documentos con los mismos filtros"""
+    columnas_exportacion = COLUMNAS_DOCUMENTOS
+    nombre_exportacion = 'documentos'
+
+class DocumentoDetailView(LoginRequiredMixin, cacheo.CacheDetalleMixin, DetailView):
     model = Documento
     template_name = 'recordatorios/documento_detail.html'
     context_object_name = 'documento'
+    nombre_cache = 'detalle_documento'
+    areas_cache = [cacheo.DOCUMENTOS, cacheo.RECORDATORIOS, cacheo.TIPOS, cacheo.USUARIOS]
+    plantilla_fragmento = 'recordatorios/fragmentos/documento_detalle.html'
+    
+    def get_queryset(self):
+        return Documento.objects.select_related('tipo', 'creado_por')
+    
+    def titulo_cache(self, documento):
+        return documento.titulo
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['recordatorios'] = RecordatorioRevision.objects.filter(
             documento=self.object
-        ).order_by('-fecha_revision')
+        ).select_related('revisor').order_by('-fecha_revision')
         return context
 
 class DocumentoCreateView(LoginRequiredMixin, CreateView):
@@ -115,6 +128,9 @@ class DocumentoCreateView(LoginRequiredMixin, CreateView):
     template_name = 'recordatorios/documento_form.html'
     success_url = reverse_lazy('documento_list')
     
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), 'usuario': self.request.user}
+    
     def form_valid(self, form):
         form.instance.creado_por = self.request.user
         messages.success(self.request, 'Documento creado exitosamente.')
@@ -125,47 +141,110 @@ class DocumentoUpdateView(LoginRequiredMixin, UpdateView):
     form_class = DocumentoForm
     template_name = 'recordatorios/documento_form.html'
     
+    def get_form_kwargs(self):
+        return {**super().get_form_kwargs(), 'usuario': self.request.user}
+    
     def form_valid(self, form):
         messages.success(self.request, 'Documento actualizado exitosamente.')
         return super().form_valid(form)
 
-class RecordatorioListView(LoginRequiredMixin, ListView):
+class DocumentoHistorialView(LoginRequiredMixin, PaginacionCursorMixin, ListView):
+    """Versiones de un documento, de la más reciente a la primera, sin descomprimir datos"""
+    template_name = 'recordatorios/documento_historial.html'
+    context_object_name = 'versiones'
+    paginate_by = 20
+    contar_total = False
+    # El número ya es único dentro del documento
+    desempatar = False
+    
+    def get_queryset(self):
+        self.documento = get_object_or_404(Documento, pk=self.kwargs['pk'])
+        return VersionDocumento.objects.filter(documento=self.documento).select_related('usuario').defer(
+            'datos'
+        ).order_by('-numero')
+    
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(documento=self.documento, **kwargs)
+
+@login_required
+def documento_version(request, pk, numero):
+    """Estado de un documento en una versión de su historial"""
+    documento = get_object_or_404(Documento, pk=pk)
+    version = get_object_or_404(
+        VersionDocumento.objects.select_related('usuario').defer('datos'), documento=documento, numero=numero
+    )
+    datos = versiones.reconstruir(documento.pk, numero)
+    return render(request, 'recordatorios/documento_version.html', {
+        'documento': documento,
+        'version': version,
+        'datos': datos,
+        'tipo': TipoDocumento.objects.filter(pk=datos['tipo_id']).first(),
+        'estado': dict(Documento.ESTADO_CHOICES).get(datos['estado'], datos['estado']),
+    })
+
+class RecordatorioListView(LoginRequiredMixin, cacheo.CacheListaMixin, PaginacionCursorMixin, ListView):
     model = RecordatorioRevision
     template_name = 'recordatorios/recordatorio_list.html'
     context_object_name = 'recordatorios'
     paginate_by = 20
+    nombre_cache = 'fragmento_recordatorios'
+    areas_cache = [cacheo.RECORDATORIOS, cacheo.DOCUMENTOS, cacheo.USUARIOS]
+    plantilla_fragmento = 'recordatorios/fragmentos/recordatorio_lista.html'
     
     def get_queryset(self):
-        queryset = RecordatorioRevision.objects.select_related('documento', 'revisor')
-        
-        # Filtros
-        estado = self.request.GET.get('estado')
-        if estado:
-            queryset = queryset.filter(estado=estado)
-        
-        prioridad = self.request.GET.get('prioridad')
-        if prioridad:
-            queryset = queryset.filter(prioridad=prioridad)
-        
-        # Filtro especial para vencidos
-        if self.request.GET.get('vencidos') == '1':
-            queryset = queryset.filter(
-                fecha_proxima_revision__lt=timezone.now(),
-                estado='pendiente'
-            )
-        
-        return queryset.order_by('-fecha_revision')
+        # La urgencia se calcula en la consulta: la plantilla no evalúa fechas por fila
+        queryset = RecordatorioRevision.objects.select_related('documento', 'revisor').con_urgencia()
+        return filtrar_recordatorios(queryset, self.request.GET).order_by('-fecha_revision')
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['estados'] = RecordatorioRevision.ESTADO_CHOICES
-        context['prioridades'] = RecordatorioRevision.PRIORIDAD_CHOICES
-        return context
+    def get_contexto_exterior(self):
+        return {
+            'estados': RecordatorioRevision.ESTADO_CHOICES,
+            'prioridades': RecordatorioRevision.PRIORIDAD_CHOICES,
+            'urgencias': RecordatorioRevision.URGENCIA_CHOICES,
+            'operacion_form': OperacionLoteForm(),
+        }
+
+class RecordatorioListAsyncView(cacheo.CacheListaAsyncMixin, RecordatorioListView):
+    """RecordatorioListView para ASGI"""
+
+class RecordatorioExportView(ExportacionMixin, RecordatorioListView):
+    """Exporta en CSV/JSON la lista de recordatorios con los mismos filtros"""
+    columnas_exportacion = COLUMNAS_RECORDATORIOS
+    nombre_exportacion = 'recordatorios'
+
+class RecordatorioOperacionLoteView(RecordatorioListView):
+    """Aplica una operación a los recordatorios marcados o a todo el filtro actual"""
+    http_method_names = ['post']
+    
+    def post(self, request, *args, **kwargs):
+        form = OperacionLoteForm(request.POST)
+        if form.is_valid():
+            datos = form.cleaned_data
+            queryset = self.get_queryset() if datos['todos'] else datos['seleccion']
+            total = operaciones.aplicar(
+                queryset, datos['accion'], revisor=datos['revisor'], prioridad=datos['prioridad'], dias=datos['dias']
+            )
+            messages.success(request, f'{total} recordatorios actualizados.')
+        else:
+            for errores in form.errors.values():
+                messages.error(request, ' '.join(errores))
+        # Volver a la lista con los mismos filtros
+        url = reverse('recordatorio_list')
+        return redirect(f'{url}?{request.GET.urlencode()}' if request.GET else url)
 
-class RecordatorioDetailView(LoginRequiredMixin, DetailView):
+class RecordatorioDetailView(LoginRequiredMixin, cacheo.CacheDetalleMixin, DetailView):
     model = RecordatorioRevision
     template_name = 'recordatorios/recordatorio_detail.html'
     context_object_name = 'recordatorio'
+    nombre_cache = 'detalle_recordatorio'
+    areas_cache = [cacheo.RECORDATORIOS, cacheo.DOCUMENTOS, cacheo.USUARIOS]
+    plantilla_fragmento = 'recordatorios/fragmentos/recordatorio_detalle.html'
+    
+    def get_queryset(self):
+        return RecordatorioRevision.objects.select_related('documento__tipo', 'revisor')
+    
+    def titulo_cache(self, recordatorio):
+        return recordatorio.documento.titulo
 
 class RecordatorioCreateView(LoginRequiredMixin, CreateView):
     model = RecordatorioRevision
@@ -198,9 +277,59 @@ class RecordatorioUpdateView(LoginRequiredMixin, UpdateView):
 def marcar_completado(request, pk):
     """Vista para marcar un recordatorio como completado"""
     recordatorio = get_object_or_404(RecordatorioRevision, pk=pk)
-    recordatorio.estado = 'completado'
-    recordatorio.fecha_completado = timezone.now()
-    recordatorio.save()
+    operaciones.completar(RecordatorioRevision.objects.filter(pk=recordatorio.pk))
     
     messages.success(request, 'Recordatorio marcado como completado.')
-    return redirect('recordatorio_detail', pk=pk)
\ No newline at end of file
+    return redirect('recordatorio_detalle', pk=pk)
+
+AUTOCOMPLETAR_POR_PAGINA = 20
+
+@login_required
+def documento_autocompletar(request):
+    """Documentos seleccionables que coinciden con ``q`` (prefijo de código o texto), en JSON
+    
+    Alimenta el select de documento del formulario de recordatorios, que así no
+    renderiza todo el catálogo. ``pagina`` empieza en 1.
+    """
+    termino = request.GET.get('q', '').strip()
+    pagina = request.GET.get('pagina', '1')
+    pagina = int(pagina) if pagina.isdigit() and int(pagina) > 0 else 1
+    if termino:
+        # Sin relevancia: el rango se calcularía para cada coincidencia y no sólo para la página
+        queryset = buscar_documentos(documentos_seleccionables(), termino, relevancia=False)
+    else:
+        queryset = documentos_seleccionables().order_by('codigo_documento')
+    inicio = (pagina - 1) * AUTOCOMPLETAR_POR_PAGINA
+    filas = list(queryset.values_list('pk', 'codigo_documento', 'titulo')[inicio:inicio + AUTOCOMPLETAR_POR_PAGINA + 1])
+    return JsonResponse({
+        'resultados': [
+            {'id': pk, 'texto': f'{codigo} - {titulo}'} for pk, codigo, titulo in filas[:AUTOCOMPLETAR_POR_PAGINA]
+        ],
+        'mas': len(filas) > AUTOCOMPLETAR_POR_PAGINA,
+    }, json_dumps_params={'ensure_ascii': False})
+
+@login_required
+def analitica_revisores(request):
+    """Carga de trabajo y cumplimiento por revisor, prioridad y tipo, desde los agregados diarios"""
+    try:
+        desde, hasta = analitica.periodo(request.GET)
+    except ValueError as e:
+        messages.warning(request, str(e))
+        desde, hasta = analitica.periodo({})
+    return render(request, 'recordatorios/analitica.html', {'informe': analitica.informe(desde, hasta)})
+
+def metricas_cache(request):
+    """Aciertos y fallos de la caché en el formato de texto de Prometheus"""
+    token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    autorizado = request.user.is_staff or (
+        settings.METRICAS_TOKEN and constant_time_compare(token, settings.METRICAS_TOKEN)
+    )
+    if not autorizado:
+        return HttpResponseForbidden()
+    lineas = []
+    for tipo in ('aciertos', 'fallos'):
+        lineas.append(f'# TYPE recordatorios_cache_{tipo}_total counter')
+        for (tipo_metrica, nombre), valor in cacheo.metricas(cacheo.NOMBRES).items():
+            if tipo_metrica == tipo:
+                lineas.append(f'recordatorios_cache_{tipo}_total{{nombre="{nombre}"}} {valor}')
+    return HttpResponse('\n'.join(lineas) + '\n', content_type='text/plain; version=0.0.4')
@@ -50,4 +50,178 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    updateRecordatorioStatus();
+    setInterval(updateRecordatorioStatus, 60 * 1000);
+
+    // Cambios hechos por otros usuarios: SSE bajo ASGI, sondeo bajo WSGI
+    const eventosUrl = document.body.getAttribute('data-eventos-url');
+    const recientesUrl = document.body.getAttribute('data-eventos-recientes-url');
+
+    function filaRecordatorio(id) {
+        return document.querySelector('[data-recordatorio="' + id + '"]');
+    }
+
+    function avisoNuevos() {
+        const tabla = document.querySelector('[data-recordatorio]');
+        if (!tabla || document.getElementById('aviso-nuevos')) {
+            return;
+        }
+        const aviso = document.createElement('div');
+        aviso.id = 'aviso-nuevos';
+        aviso.className = 'alert alert-info';
+        aviso.innerHTML = 'Hay recordatorios nuevos. <a href="" class="alert-link">Recargar</a>';
+        tabla.closest('.card').before(aviso);
+    }
+
+    function aplicarEvento(tipo, datos) {
+        if (tipo === 'recargar' || tipo === 'creado') {
+            avisoNuevos();
+            return;
+        }
+        datos.recordatorios.forEach(function(id) {
+            const fila = filaRecordatorio(id);
+            if (!fila) {
+                return;
+            }
+            if (tipo === 'completado') {
+                fila.removeAttribute('data-fecha-proxima');
+                fila.classList.remove('table-danger', 'table-warning');
+                const estado = fila.querySelector('[data-estado]');
+                if (estado) {
+                    estado.className = 'badge bg-success';
+                    estado.textContent = 'Completado';
+                }
+            } else if (tipo === 'vencido') {
+                fila.classList.remove('table-warning');
+                fila.classList.add('table-danger');
+            } else if (tipo === 'proximo' && !fila.classList.contains('table-danger')) {
+                fila.classList.add('table-warning');
+            }
+        });
+    }
+
+    let ultimoEvento = null;
+
+    function sondearEventos() {
+        const url = recientesUrl + (ultimoEvento !== null ? '?desde=' + ultimoEvento : '');
+        fetch(url, {credentials: 'same-origin'})
+            .then(function(respuesta) { return respuesta.ok ? respuesta.json() : null; })
+            .then(function(datos) {
+                if (!datos) {
+                    return;
+                }
+                if (ultimoEvento !== null) {
+                    datos.eventos.forEach(function(evento) { aplicarEvento(evento.tipo, evento); });
+                }
+                ultimoEvento = datos.ultimo;
+            })
+            .catch(function() {});
+    }
+
+    function iniciarSondeo() {
+        sondearEventos();
+        setInterval(sondearEventos, 30 * 1000);
+    }
+
+    if (eventosUrl && document.querySelector('[data-recordatorio]')) {
+        if (window.EventSource) {
+            const fuente = new EventSource(eventosUrl);
+            ['creado', 'completado', 'proximo', 'vencido', 'recargar'].forEach(function(tipo) {
+                fuente.addEventListener(tipo, function(e) {
+                    aplicarEvento(tipo, JSON.parse(e.data));
+                });
+            });
+            fuente.onerror = function() {
+                // 204 (servidor WSGI) o error definitivo: el navegador no reintenta
+                if (fuente.readyState === EventSource.CLOSED) {
+                    iniciarSondeo();
+                }
+            };
+        } else {
+            iniciarSondeo();
+        }
+    }
+
+    // Selects con muchas opciones: se piden al servidor mientras se escribe
+    document.querySelectorAll('select[data-autocompletar]').forEach(function(select) {
+        const url = select.getAttribute('data-autocompletar');
+        const buscador = document.createElement('input');
+        buscador.type = 'search';
+        buscador.className = 'form-control form-control-sm mb-1';
+        buscador.placeholder = 'Buscar por código o título';
+        buscador.setAttribute('aria-label', 'Buscar opciones');
+        select.before(buscador);
+
+        let termino = '';
+        let espera = null;
+        let anterior = select.value;
+
+        function opcion(valor, texto) {
+            const elemento = document.createElement('option');
+            elemento.value = valor;
+            elemento.textContent = texto;
+            return elemento;
+        }
+
+        function cargar(pagina) {
+            const consulta = termino;
+            fetch(url + '?q=' + encodeURIComponent(consulta) + '&pagina=' + pagina, {credentials: 'same-origin'})
+                .then(function(respuesta) { return respuesta.ok ? respuesta.json() : null; })
+                .then(function(datos) {
+                    // Una respuesta de un término ya cambiado se descarta
+                    if (!datos || consulta !== termino) {
+                        return;
+                    }
+                    const mas = select.querySelector('[data-pagina]');
+                    if (mas) {
+                        mas.remove();
+                    }
+                    if (pagina === 1) {
+                        // Se conservan la opción vacía y la elegida
+                        Array.from(select.options).forEach(function(elemento) {
+                            if (elemento.value && !elemento.selected) {
+                                elemento.remove();
+                            }
+                        });
+                    }
+                    datos.resultados.forEach(function(resultado) {
+                        if (!select.querySelector('option[value="' + resultado.id + '"]')) {
+                            select.append(opcion(resultado.id, resultado.texto));
+                        }
+                    });
+                    if (datos.mas) {
+                        const siguiente = opcion('', 'Cargar más resultados…');
+                        siguiente.setAttribute('data-pagina', pagina + 1);
+                        select.append(siguiente);
+                    }
+                })
+                .catch(function() {});
+        }
+
+        buscador.addEventListener('input', function() {
+            clearTimeout(espera);
+            espera = setTimeout(function() {
+                termino = buscador.value.trim();
+                cargar(1);
+            }, 250);
+        });
+
+        select.addEventListener('change', function() {
+            const elegida = select.options[select.selectedIndex];
+            if (elegida && elegida.hasAttribute('data-pagina')) {
+                select.value = anterior;
+                cargar(parseInt(elegida.getAttribute('data-pagina'), 10));
+                return;
+            }
+            anterior = select.value;
+        });
+
+        // Primera página al abrir el select sin haber buscado
+        select.addEventListener('focus', function() {
+            if (select.options.length <= 2 && !termino) {
+                cargar(1);
+            }
+        }, {once: true});
+    });
+
 })
\ No newline at end of file